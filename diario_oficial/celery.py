@@ -1,16 +1,40 @@
 from __future__ import absolute_import
 import os
+import sys
 from celery import Celery
+from celery.signals import worker_process_init, worker_ready
 from django.conf import settings
 
-# Configurações específicas para Windows
-os.environ.setdefault('FORKED_BY_MULTIPROCESSING', '1')
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'diario_oficial.settings')
 
 app = Celery('diario_oficial')
 
-# Usar 'solo' como pool no Windows
-app.conf.worker_pool = 'solo'  # Ou 'threads' para múltiplas threads
+if sys.platform == 'win32':
+	# Configurações específicas para Windows: prefork não funciona, um worker 'solo' consome todas as filas
+	os.environ.setdefault('FORKED_BY_MULTIPROCESSING', '1')
+	app.conf.worker_pool = 'solo'
+
+# Filas por perfil de carga (comandos dos workers no README):
+# - 'io': navegação, downloads e gravações (pool threads ou gevent, alta concorrência);
+# - 'cpu': extração de texto, NLP e classificação (pool prefork, um processo por núcleo);
+# - 'celery' (padrão): orquestração e callbacks dos chords.
+FILA_IO = 'io'
+FILA_CPU = 'cpu'
+app.conf.task_routes = {
+	'monitor.utils.tasks.descobrir_documentos': {'queue': FILA_IO},
+	'monitor.utils.tasks.baixar_documento': {'queue': FILA_IO},
+	'monitor.utils.tasks.gravar_documento': {'queue': FILA_IO},
+	'monitor.utils.tasks.verificar_normas_agendadas': {'queue': FILA_IO},
+	'monitor.utils.tasks.sincronizar_catalogo_sefaz': {'queue': FILA_IO},
+	'monitor.utils.tasks.extrair_documento': {'queue': FILA_CPU},
+	'monitor.utils.tasks.processar_lote_documentos': {'queue': FILA_CPU},
+	'monitor.utils.tasks.consolidar_processamento': {'queue': FILA_CPU},
+	'monitor.utils.tasks.classificar_documentos_pendentes': {'queue': FILA_CPU},
+}
+# Tarefas longas: cada processo/thread reserva só a próxima, sem represar a fila
+app.conf.worker_prefetch_multiplier = 1
+# Recicla processos prefork para devolver a memória dos modelos de NLP
+app.conf.worker_max_tasks_per_child = 200
 
 # Desativar soft timeouts
 app.conf.worker_disable_rate_limits = True
@@ -19,6 +43,23 @@ app.conf.worker_enable_remote_control = False
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks(['monitor', 'monitor.utils'])
 
+
+@worker_process_init.connect
+def aquecer_caches_do_processo(**kwargs):
+	# prefork: cada processo filho carrega o índice de normas antes da primeira tarefa
+	from monitor.utils.indice_normas import aquecer_indice_normas
+	aquecer_indice_normas()
+
+
+@worker_ready.connect
+def aquecer_caches_do_worker(sender=None, **kwargs):
+	# pools 'solo'/'threads' executam as tarefas no processo principal
+	pool = getattr(sender, 'pool', None)
+	if pool is not None and type(pool).__module__.endswith('prefork'):
+		return
+	from monitor.utils.indice_normas import aquecer_indice_normas
+	aquecer_indice_normas()
+
 # Palavras-chave para busca de notícias relevantes
 CONTABEIS_KEYWORDS = [
 	"tributário", "fiscal", "trabalhista", "previdência", "contabilidade", "empresarial", "economia", "tecnologia", "carreira", "imposto", "reforma tributária", "INSS", "Simples Nacional", "NF-e", "IR", "Receita Federal",
@@ -136,6 +136,68 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'America/Sao_Paulo' # Ou seu timezone local
 CELERY_ENABLE_UTC = True # Recomendado para lidar com fusos horários
 
+# Caches locais dos workers (termos monitorados etc.) versionados via Redis
+MONITOR_REDIS_URL = os.getenv('MONITOR_REDIS_URL', 'redis://localhost:6379/1')
+MONITOR_CACHE_INTERVALO_VERIFICACAO = int(os.getenv('MONITOR_CACHE_INTERVALO_VERIFICACAO', '5'))  # segundos entre consultas da versão no Redis
+MONITOR_CACHE_TTL = int(os.getenv('MONITOR_CACHE_TTL', '300'))  # recarga forçada mesmo sem invalidação
+
+# Score mínimo (prioridade dos termos x ocorrências) para gerar resumo/impacto fiscal
+MONITOR_SCORE_MINIMO_RESUMO = float(os.getenv('MONITOR_SCORE_MINIMO_RESUMO', '1.0'))
+
+# Classificador zero-shot local (carregado uma vez por processo do worker)
+MONITOR_CLASSIFICADOR_MODELO = os.getenv('MONITOR_CLASSIFICADOR_MODELO', 'pierreguillou/bert-base-cased-pt-br')
+MONITOR_CLASSIFICADOR_LOTE = int(os.getenv('MONITOR_CLASSIFICADOR_LOTE', '16'))  # parágrafos por lote
+MONITOR_TORCH_THREADS = int(os.getenv('MONITOR_TORCH_THREADS', '0')) or None  # None = padrão do torch
+MONITOR_CLASSIFICADOR_BACKEND = os.getenv('MONITOR_CLASSIFICADOR_BACKEND', 'torch')  # 'torch', 'int8' ou 'onnx'
+MONITOR_CLASSIFICADOR_ONNX_DIR = os.getenv('MONITOR_CLASSIFICADOR_ONNX_DIR', str(BASE_DIR / 'modelos' / 'onnx'))
+MONITOR_CLASSIFICACAO_LOCAL_ATIVA = os.getenv('MONITOR_CLASSIFICACAO_LOCAL_ATIVA', '1') == '1'  # etapa em lote no fim da coleta
+MONITOR_CLASSIFICACAO_LOTE_GLOBAL = int(os.getenv('MONITOR_CLASSIFICACAO_LOTE_GLOBAL', '64'))  # parágrafos por lote entre documentos
+MONITOR_CLASSIFICACAO_DOCUMENTOS_POR_ETAPA = int(os.getenv('MONITOR_CLASSIFICACAO_DOCUMENTOS_POR_ETAPA', '200'))
+
+# spaCy (carregado sob demanda): extração de normas/entidades via nlp.pipe
+MONITOR_SPACY_BATCH_SIZE = int(os.getenv('MONITOR_SPACY_BATCH_SIZE', '50'))
+MONITOR_SPACY_N_PROCESS = int(os.getenv('MONITOR_SPACY_N_PROCESS', '1'))
+MONITOR_SPACY_LOTE_ATIVO = os.getenv('MONITOR_SPACY_LOTE_ATIVO', '1') == '1'  # processar_lote_documentos extrai normas/entidades do lote via nlp.pipe
+
+# Boilerplate: parágrafos vistos em mais de N documentos são descartados da análise
+MONITOR_BOILERPLATE_ATIVO = os.getenv('MONITOR_BOILERPLATE_ATIVO', '1') == '1'
+MONITOR_BOILERPLATE_LIMIAR = int(os.getenv('MONITOR_BOILERPLATE_LIMIAR', '5'))
+
+# Quase duplicatas (SimHash 64 bits): distância de Hamming máxima para reaproveitar a análise
+MONITOR_DUPLICATAS_ATIVO = os.getenv('MONITOR_DUPLICATAS_ATIVO', '1') == '1'
+MONITOR_DUPLICATA_DISTANCIA_MAXIMA = int(os.getenv('MONITOR_DUPLICATA_DISTANCIA_MAXIMA', '6'))  # até 7 com recall garantido
+
+# Índice de identidade de normas (tipo, numero, ano) -> id, local a cada processo do worker
+MONITOR_INDICE_NORMAS_ATIVO = os.getenv('MONITOR_INDICE_NORMAS_ATIVO', '1') == '1'
+MONITOR_INDICE_NORMAS_TTL = int(os.getenv('MONITOR_INDICE_NORMAS_TTL', '3600'))  # recarga completa mesmo sem invalidação
+
+# Mudanças de situação de normas: reavaliação dos documentos/relatórios afetados
+MONITOR_REAVALIACAO_ASSINCRONA = os.getenv('MONITOR_REAVALIACAO_ASSINCRONA', '1') == '1'  # 0 = executa no próprio save
+MONITOR_REAVALIACAO_RELATORIOS_DIAS = int(os.getenv('MONITOR_REAVALIACAO_RELATORIOS_DIAS', '90'))  # relatórios mais antigos não são marcados
+
+# Verificação agendada de vigências (a cada 30 min): top N normas por prioridade dentro do orçamento
+MONITOR_VERIFICACAO_MAX_NORMAS = int(os.getenv('MONITOR_VERIFICACAO_MAX_NORMAS', '30'))
+MONITOR_VERIFICACAO_ORCAMENTO_SEGUNDOS = float(os.getenv('MONITOR_VERIFICACAO_ORCAMENTO_SEGUNDOS', '600'))
+MONITOR_VERIFICACAO_INTERVALO_SEGUNDOS = float(os.getenv('MONITOR_VERIFICACAO_INTERVALO_SEGUNDOS', '5'))  # pausa entre consultas ao portal
+MONITOR_VERIFICACAO_INTERVALO_MINIMO_HORAS = float(os.getenv('MONITOR_VERIFICACAO_INTERVALO_MINIMO_HORAS', '24'))  # não reverifica antes disso
+
+# Espelho local do catálogo do portal da legislação (check_norm_status consulta antes do portal)
+MONITOR_CATALOGO_SEFAZ_ATIVO = os.getenv('MONITOR_CATALOGO_SEFAZ_ATIVO', '1') == '1'
+MONITOR_CATALOGO_SEFAZ_VALIDADE_DIAS = int(os.getenv('MONITOR_CATALOGO_SEFAZ_VALIDADE_DIAS', '30'))  # registros mais antigos vão ao portal
+MONITOR_CATALOGO_SEFAZ_MARGEM_DIAS = int(os.getenv('MONITOR_CATALOGO_SEFAZ_MARGEM_DIAS', '7'))  # sobreposição da sincronização incremental
+MONITOR_CATALOGO_SEFAZ_ORDENADO_POR_DATA = os.getenv('MONITOR_CATALOGO_SEFAZ_ORDENADO_POR_DATA', '0') == '1'  # só com URL ordenada por data: a incremental para cedo
+MONITOR_CATALOGO_SEFAZ_PAGINAS_SEM_NOVIDADE = int(os.getenv('MONITOR_CATALOGO_SEFAZ_PAGINAS_SEM_NOVIDADE', '10'))  # a incremental para depois dessas páginas seguidas sem norma nova
+MONITOR_CATALOGO_SEFAZ_TAMANHO_PAGINA = int(os.getenv('MONITOR_CATALOGO_SEFAZ_TAMANHO_PAGINA', '100'))
+MONITOR_CATALOGO_SEFAZ_PAGINAS_MAX = int(os.getenv('MONITOR_CATALOGO_SEFAZ_PAGINAS_MAX', '500'))
+MONITOR_CATALOGO_SEFAZ_INTERVALO_SEGUNDOS = float(os.getenv('MONITOR_CATALOGO_SEFAZ_INTERVALO_SEGUNDOS', '1'))
+
+# Processamento paralelo dos documentos coletados: lotes disparados como chord do Celery
+MONITOR_PROCESSAMENTO_TAMANHO_LOTE = int(os.getenv('MONITOR_PROCESSAMENTO_TAMANHO_LOTE', '20'))
+
+# Coleta em fluxo num só processo (ex.: worker 'solo' no Windows): cada PDF é analisado assim que baixado
+MONITOR_COLETA_EM_FLUXO = os.getenv('MONITOR_COLETA_EM_FLUXO', '0') == '1'
+MONITOR_COLETA_FLUXO_FILA = int(os.getenv('MONITOR_COLETA_FLUXO_FILA', '4'))  # PDFs baixados aguardando análise (limita a memória)
+
 
 
 
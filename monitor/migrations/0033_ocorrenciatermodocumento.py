@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-19 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0032_documento_docs_sefaz'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OcorrenciaTermoDocumento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_publicacao', models.DateField(help_text='Cópia de Documento.data_publicacao para consultas por período', verbose_name='Data de Publicação')),
+                ('contagem', models.PositiveIntegerField(default=0, verbose_name='Número de Ocorrências')),
+                ('posicoes', models.JSONField(blank=True, default=list, help_text='Primeiras posições (offsets) do termo no texto original')),
+                ('documento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ocorrencias_termos', to='monitor.documento')),
+                ('termo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ocorrencias', to='monitor.termomonitorado')),
+            ],
+            options={
+                'verbose_name': 'Ocorrência de Termo',
+                'verbose_name_plural': 'Ocorrências de Termos',
+                'indexes': [models.Index(fields=['termo', 'data_publicacao'], name='monitor_oco_termo_i_34f14d_idx')],
+                'unique_together': {('documento', 'termo')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-19 10:05
+
+from django.db import migrations
+
+INDICE = 'monitor_doc_fulltext_idx'
+COLUNAS = 'titulo, texto_completo, resumo_ia, assunto'
+
+
+def criar_indice_fulltext(apps, schema_editor):
+    # FULLTEXT só existe no MySQL; nos demais bancos a busca usa o fallback por icontains
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(f"ALTER TABLE monitor_documento ADD FULLTEXT INDEX {INDICE} ({COLUNAS})")
+
+
+def remover_indice_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(f"ALTER TABLE monitor_documento DROP INDEX {INDICE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0033_ocorrenciatermodocumento'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_fulltext, remover_indice_fulltext),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0034_documento_fulltext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documento',
+            name='score_relevancia',
+            field=models.FloatField(default=0, help_text='Soma ponderada pela prioridade dos termos monitorados encontrados', verbose_name='Score de Relevância'),
+        ),
+        migrations.AddIndex(
+            model_name='documento',
+            index=models.Index(fields=['score_relevancia'], name='monitor_doc_score_r_49c993_idx'),
+        ),
+    ]
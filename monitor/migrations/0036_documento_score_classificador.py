@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0035_documento_score_relevancia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documento',
+            name='score_classificador',
+            field=models.FloatField(blank=True, help_text="Maior score 'relevante' entre os parágrafos (vazio = ainda não classificado)", null=True, verbose_name='Score do Classificador Local'),
+        ),
+    ]
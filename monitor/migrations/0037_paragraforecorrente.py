@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0036_documento_score_classificador'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParagrafoRecorrente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('impressao', models.CharField(help_text='SHA-1 do parágrafo normalizado (sem acentos, caixa, espaços extras e com dígitos trocados por 0)', max_length=40, unique=True)),
+                ('ocorrencias', models.PositiveIntegerField(default=0, verbose_name='Documentos em que apareceu')),
+                ('boilerplate', models.BooleanField(db_index=True, default=False, verbose_name='Boilerplate')),
+                ('amostra', models.TextField(blank=True, verbose_name='Amostra do Parágrafo')),
+                ('primeira_ocorrencia', models.DateTimeField(auto_now_add=True)),
+                ('ultima_ocorrencia', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Parágrafo Recorrente',
+                'verbose_name_plural': 'Parágrafos Recorrentes',
+                'ordering': ['-ocorrencias'],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0037_paragraforecorrente'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documento',
+            name='documento_canonico',
+            field=models.ForeignKey(blank=True, help_text='Preenchido quando o documento é quase duplicata de outro (análise reaproveitada)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicatas', to='monitor.documento', verbose_name='Documento Canônico'),
+        ),
+        migrations.CreateModel(
+            name='AssinaturaDocumento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('simhash', models.BigIntegerField(help_text='SimHash em complemento de dois (64 bits)')),
+                ('banda_0', models.PositiveSmallIntegerField(db_index=True)),
+                ('banda_1', models.PositiveSmallIntegerField(db_index=True)),
+                ('banda_2', models.PositiveSmallIntegerField(db_index=True)),
+                ('banda_3', models.PositiveSmallIntegerField(db_index=True)),
+                ('banda_4', models.PositiveSmallIntegerField(db_index=True)),
+                ('banda_5', models.PositiveSmallIntegerField(db_index=True)),
+                ('banda_6', models.PositiveSmallIntegerField(db_index=True)),
+                ('banda_7', models.PositiveSmallIntegerField(db_index=True)),
+                ('documento', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='assinatura', to='monitor.documento')),
+            ],
+            options={
+                'verbose_name': 'Assinatura de Documento',
+                'verbose_name_plural': 'Assinaturas de Documentos',
+            },
+        ),
+    ]
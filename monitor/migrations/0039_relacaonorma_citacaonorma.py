@@ -0,0 +1,62 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copiar_relacoes_existentes(apps, schema_editor):
+    """Cada norma já relacionada a um documento vira uma citação com 1 menção."""
+    Documento = apps.get_model('monitor', 'Documento')
+    CitacaoNorma = apps.get_model('monitor', 'CitacaoNorma')
+    Relacao = Documento.normas_relacionadas.through
+    lote = []
+    for documento_id, norma_id in Relacao.objects.values_list('documento_id', 'normavigente_id').iterator(chunk_size=5000):
+        lote.append(CitacaoNorma(documento_id=documento_id, norma_id=norma_id, mencoes=1))
+        if len(lote) >= 5000:
+            CitacaoNorma.objects.bulk_create(lote, ignore_conflicts=True)
+            lote = []
+    if lote:
+        CitacaoNorma.objects.bulk_create(lote, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0038_documento_canonico_assinaturadocumento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelacaoNorma',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('ALTERA', 'Altera'), ('REVOGA', 'Revoga'), ('REGULAMENTA', 'Regulamenta')], max_length=12)),
+                ('fonte', models.CharField(choices=[('SEFAZ', 'SEFAZ'), ('DIARIO', 'Diário Oficial')], default='SEFAZ', max_length=10)),
+                ('data_cadastro', models.DateTimeField(auto_now_add=True)),
+                ('destino', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relacoes_entrada', to='monitor.normavigente')),
+                ('origem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relacoes_saida', to='monitor.normavigente')),
+            ],
+            options={
+                'verbose_name': 'Relação entre Normas',
+                'verbose_name_plural': 'Relações entre Normas',
+                'indexes': [models.Index(fields=['destino', 'tipo'], name='monitor_rel_destino_fa0a09_idx')],
+                'unique_together': {('origem', 'destino', 'tipo')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CitacaoNorma',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mencoes', models.PositiveIntegerField(default=1, verbose_name='Número de Menções')),
+                ('documento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='citacoes_normas', to='monitor.documento')),
+                ('norma', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='citacoes', to='monitor.normavigente')),
+            ],
+            options={
+                'verbose_name': 'Citação de Norma',
+                'verbose_name_plural': 'Citações de Normas',
+                'indexes': [models.Index(fields=['norma', 'documento'], name='monitor_cit_norma_i_99d810_idx')],
+                'unique_together': {('documento', 'norma')},
+            },
+        ),
+        migrations.RunPython(copiar_relacoes_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-19 16:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0039_relacaonorma_citacaonorma'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoricoSituacaoNorma',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('situacao_anterior', models.CharField(blank=True, choices=[('VIGENTE', 'Vigente'), ('REVOGADA', 'Revogada'), ('IRREGULAR', 'Irregular'), ('A_VERIFICAR', 'A verificar'), ('ALTERADA', 'Alterada'), ('DESCONHECIDA', 'Desconhecida')], max_length=20)),
+                ('situacao_nova', models.CharField(choices=[('VIGENTE', 'Vigente'), ('REVOGADA', 'Revogada'), ('IRREGULAR', 'Irregular'), ('A_VERIFICAR', 'A verificar'), ('ALTERADA', 'Alterada'), ('DESCONHECIDA', 'Desconhecida')], max_length=20)),
+                ('fonte', models.CharField(choices=[('SEFAZ', 'SEFAZ'), ('BING', 'Bing'), ('CATALOGO', 'Catálogo local'), ('MANUAL', 'Manual')], default='MANUAL', max_length=10)),
+                ('data', models.DateTimeField(default=django.utils.timezone.now)),
+                ('norma', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='historico_situacao', to='monitor.normavigente')),
+            ],
+            options={
+                'verbose_name': 'Histórico de Situação de Norma',
+                'verbose_name_plural': 'Históricos de Situação de Normas',
+                'ordering': ['-data'],
+                'indexes': [models.Index(fields=['norma', 'data'], name='monitor_his_norma_i_fce903_idx'), models.Index(fields=['data'], name='monitor_his_data_8d32f4_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-19 16:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0040_historicosituacaonorma'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogoNormaSefaz',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('LEI', 'Lei'), ('DECRETO', 'Decreto'), ('PORTARIA', 'Portaria'), ('RESOLUCAO', 'Resolução'), ('INSTRUCAO', 'Instrução Normativa'), ('OUTROS', 'Outros')], max_length=20)),
+                ('numero', models.CharField(max_length=50)),
+                ('ano', models.IntegerField(blank=True, null=True)),
+                ('titulo', models.CharField(blank=True, max_length=500)),
+                ('situacao', models.CharField(blank=True, help_text='Situação como exibida no portal', max_length=255)),
+                ('situacao_normalizada', models.CharField(choices=[('VIGENTE', 'Vigente'), ('REVOGADA', 'Revogada'), ('IRREGULAR', 'Irregular'), ('A_VERIFICAR', 'A verificar'), ('ALTERADA', 'Alterada'), ('DESCONHECIDA', 'Desconhecida')], db_index=True, default='DESCONHECIDA', max_length=20)),
+                ('ementa', models.TextField(blank=True)),
+                ('data_publicacao', models.DateField(blank=True, db_index=True, null=True)),
+                ('url', models.URLField(blank=True, max_length=500)),
+                ('link_publicacao', models.URLField(blank=True, max_length=500)),
+                ('alteracoes', models.JSONField(blank=True, help_text='Links do campo Alterações do portal', null=True)),
+                ('data_sincronizacao', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Norma do Catálogo SEFAZ',
+                'verbose_name_plural': 'Catálogo de Normas SEFAZ',
+                'ordering': ['-data_publicacao'],
+                'indexes': [models.Index(fields=['tipo', 'numero'], name='monitor_cat_tipo_971924_idx')],
+                'unique_together': {('tipo', 'numero', 'ano')},
+            },
+        ),
+    ]
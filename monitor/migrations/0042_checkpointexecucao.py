@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-19 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0041_catalogonormasefaz'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckpointExecucao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500)),
+                ('fonte', models.CharField(blank=True, max_length=30)),
+                ('etapa', models.CharField(choices=[('DESCOBERTO', 'Descoberto'), ('BAIXADO', 'Baixado'), ('EXTRAIDO', 'Texto extraído'), ('GRAVADO', 'Gravado'), ('PROCESSADO', 'Processado'), ('DESCARTADO', 'Descartado')], default='DESCOBERTO', max_length=20)),
+                ('dados', models.JSONField(blank=True, help_text='Item da etapa (metadados e caminhos dos arquivos)', null=True)),
+                ('data_atualizacao', models.DateTimeField(auto_now=True)),
+                ('documento', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='checkpoints', to='monitor.documento')),
+                ('log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='monitor.logexecucao')),
+            ],
+            options={
+                'verbose_name': 'Checkpoint de Execução',
+                'verbose_name_plural': 'Checkpoints de Execução',
+                'indexes': [models.Index(fields=['log', 'etapa'], name='monitor_che_log_id_2fd052_idx')],
+                'unique_together': {('log', 'url')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-19 19:40
+
+from django.db import migrations, models
+
+
+def limpar_impressoes_antigas(apps, schema_editor):
+    """As impressões antigas trocavam os dígitos por 0 e não batem mais com as novas."""
+    ParagrafoRecorrente = apps.get_model('monitor', 'ParagrafoRecorrente')
+    ParagrafoRecorrente.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0042_checkpointexecucao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documento',
+            name='paragrafos_registrados',
+            field=models.BooleanField(default=False, help_text='Parágrafos já somados em ParagrafoRecorrente (cada documento conta uma vez)', verbose_name='Parágrafos contados?'),
+        ),
+        migrations.AlterField(
+            model_name='paragraforecorrente',
+            name='impressao',
+            field=models.CharField(help_text='SHA-1 do parágrafo normalizado (sem acentos, caixa e espaços extras)', max_length=40, unique=True),
+        ),
+        migrations.RunPython(limpar_impressoes_antigas, migrations.RunPython.noop),
+    ]
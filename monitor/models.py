@@ -40,6 +40,13 @@ class TermoMonitorado(models.Model):
     def __str__(self):
         return f"{self.termo} ({self.get_tipo_display()})"
 
+    def clean(self):
+        if self.tipo == 'REGEX':
+            try:
+                re.compile(self.termo)
+            except re.error as e:
+                raise ValidationError({'termo': f"Expressão regular inválida: {e}"})
+
 
 from django.db import models
 from django.utils import timezone # Importar timezone se for usar no save, etc.
@@ -178,6 +185,15 @@ class NormaVigente(models.Model):
             self.full_clean()
             super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Situação lida do banco: o post_save compara com ela para gravar o histórico
+        instancia._situacao_carregada = instancia.__dict__.get('situacao')
+        # Chave lida do banco: o post_save compara com ela para invalidar o índice de normas
+        instancia._chave_carregada = tuple(instancia.__dict__.get(campo) for campo in ('tipo', 'numero', 'ano'))
+        return instancia
+
     @property
     def get_status_badge_class(self):
         status_map = {
@@ -224,12 +240,28 @@ class Documento(models.Model):
     processado = models.BooleanField(default=False, verbose_name="Processado?")
     resumo_ia = models.TextField(blank=True, null=True)
     indexado = models.BooleanField(default=False, db_index=True)
+    paragrafos_registrados = models.BooleanField(
+        default=False,
+        verbose_name="Parágrafos contados?",
+        help_text="Parágrafos já somados em ParagrafoRecorrente (cada documento conta uma vez)"
+    )
     sentimento_ia = models.CharField(max_length=8000, blank=True, null=True)
 
     relevante_contabil = models.BooleanField(
         default=False,
         verbose_name="Relevante para Contabilidade?"
     )
+    score_relevancia = models.FloatField(
+        default=0,
+        verbose_name="Score de Relevância",
+        help_text="Soma ponderada pela prioridade dos termos monitorados encontrados"
+    )
+    score_classificador = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name="Score do Classificador Local",
+        help_text="Maior score 'relevante' entre os parágrafos (vazio = ainda não classificado)"
+    )
     is_contabeis_news = models.BooleanField(
         default=False,
         verbose_name="Notícia do Contabeis?",
@@ -288,6 +320,15 @@ class Documento(models.Model):
         default=False,
         help_text="Indica se o arquivo PDF foi removido por não ser relevante"
     )
+    documento_canonico = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='duplicatas',
+        verbose_name="Documento Canônico",
+        help_text="Preenchido quando o documento é quase duplicata de outro (análise reaproveitada)"
+    )
 
     class Meta:
         verbose_name = "Documento"
@@ -297,10 +338,12 @@ class Documento(models.Model):
             models.Index(fields=['data_publicacao']),
             models.Index(fields=['processado']),
             models.Index(fields=['relevante_contabil']),
+            models.Index(fields=['score_relevancia']),
             models.Index(fields=['arquivo_removido']),
             models.Index(fields=['tipo_documento']), # Index para o novo campo
             # Adicione um índice para fonte_documento se você for filtrar muito por ele
             # models.Index(fields=['fonte_documento']),
+            # Índice FULLTEXT (MySQL) em titulo/texto_completo/resumo_ia/assunto: migração 0034
         ]
 
     def __str__(self):
@@ -318,6 +361,240 @@ class Documento(models.Model):
         return 'warning'
 
 
+class OcorrenciaTermoDocumento(models.Model):
+    """
+    Índice persistido de ocorrências dos termos monitorados em cada documento
+    """
+    documento = models.ForeignKey(
+        'Documento',
+        on_delete=models.CASCADE,
+        related_name='ocorrencias_termos'
+    )
+    termo = models.ForeignKey(
+        'TermoMonitorado',
+        on_delete=models.CASCADE,
+        related_name='ocorrencias'
+    )
+    data_publicacao = models.DateField(
+        verbose_name="Data de Publicação",
+        help_text="Cópia de Documento.data_publicacao para consultas por período"
+    )
+    contagem = models.PositiveIntegerField(default=0, verbose_name="Número de Ocorrências")
+    posicoes = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Primeiras posições (offsets) do termo no texto original"
+    )
+
+    class Meta:
+        verbose_name = "Ocorrência de Termo"
+        verbose_name_plural = "Ocorrências de Termos"
+        unique_together = [['documento', 'termo']]
+        indexes = [
+            models.Index(fields=['termo', 'data_publicacao']),
+        ]
+
+    def __str__(self):
+        return f"{self.termo_id} em {self.documento_id} ({self.contagem}x)"
+
+
+class AssinaturaDocumento(models.Model):
+    """
+    SimHash (64 bits) do texto do documento, dividido em 8 bandas de 8 bits
+    indexadas para a busca de quase duplicatas (monitor.utils.duplicatas).
+    """
+    documento = models.OneToOneField(
+        'Documento',
+        on_delete=models.CASCADE,
+        related_name='assinatura'
+    )
+    simhash = models.BigIntegerField(help_text="SimHash em complemento de dois (64 bits)")
+    banda_0 = models.PositiveSmallIntegerField(db_index=True)
+    banda_1 = models.PositiveSmallIntegerField(db_index=True)
+    banda_2 = models.PositiveSmallIntegerField(db_index=True)
+    banda_3 = models.PositiveSmallIntegerField(db_index=True)
+    banda_4 = models.PositiveSmallIntegerField(db_index=True)
+    banda_5 = models.PositiveSmallIntegerField(db_index=True)
+    banda_6 = models.PositiveSmallIntegerField(db_index=True)
+    banda_7 = models.PositiveSmallIntegerField(db_index=True)
+
+    class Meta:
+        verbose_name = "Assinatura de Documento"
+        verbose_name_plural = "Assinaturas de Documentos"
+
+    def __str__(self):
+        return f"{self.documento_id}: {self.simhash & 0xFFFFFFFFFFFFFFFF:016x}"
+
+
+class HistoricoSituacaoNorma(models.Model):
+    """
+    Mudanças de NormaVigente.situacao (ex.: VIGENTE -> REVOGADA). Cada registro
+    dispara a reavaliação dos documentos e relatórios afetados
+    (monitor.utils.situacao_normas).
+    """
+    FONTE_CHOICES = [
+        ('SEFAZ', 'SEFAZ'),
+        ('BING', 'Bing'),
+        ('CATALOGO', 'Catálogo local'),
+        ('MANUAL', 'Manual'),
+    ]
+
+    norma = models.ForeignKey(
+        NormaVigente,
+        on_delete=models.CASCADE,
+        related_name='historico_situacao'
+    )
+    situacao_anterior = models.CharField(max_length=20, choices=NormaVigente.SITUACAO_CHOICES, blank=True)
+    situacao_nova = models.CharField(max_length=20, choices=NormaVigente.SITUACAO_CHOICES)
+    fonte = models.CharField(max_length=10, choices=FONTE_CHOICES, default='MANUAL')
+    data = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Histórico de Situação de Norma"
+        verbose_name_plural = "Históricos de Situação de Normas"
+        ordering = ['-data']
+        indexes = [
+            models.Index(fields=['norma', 'data']),
+            models.Index(fields=['data']),
+        ]
+
+    def __str__(self):
+        return f"{self.norma_id}: {self.situacao_anterior or '-'} -> {self.situacao_nova} ({self.fonte})"
+
+
+class CatalogoNormaSefaz(models.Model):
+    """
+    Espelho local do índice de busca do portal da legislação da SEFAZ-PI
+    (monitor.utils.catalogo_sefaz). check_norm_status consulta esta tabela
+    antes de ir ao portal.
+    """
+    tipo = models.CharField(max_length=20, choices=NormaVigente.TIPO_CHOICES)
+    numero = models.CharField(max_length=50)
+    ano = models.IntegerField(null=True, blank=True)
+    titulo = models.CharField(max_length=500, blank=True)
+    situacao = models.CharField(max_length=255, blank=True, help_text="Situação como exibida no portal")
+    situacao_normalizada = models.CharField(
+        max_length=20,
+        choices=NormaVigente.SITUACAO_CHOICES,
+        default='DESCONHECIDA',
+        db_index=True
+    )
+    ementa = models.TextField(blank=True)
+    data_publicacao = models.DateField(null=True, blank=True, db_index=True)
+    url = models.URLField(max_length=500, blank=True)
+    link_publicacao = models.URLField(max_length=500, blank=True)
+    alteracoes = models.JSONField(blank=True, null=True, help_text="Links do campo Alterações do portal")
+    data_sincronizacao = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Norma do Catálogo SEFAZ"
+        verbose_name_plural = "Catálogo de Normas SEFAZ"
+        ordering = ['-data_publicacao']
+        unique_together = [['tipo', 'numero', 'ano']]
+        indexes = [
+            models.Index(fields=['tipo', 'numero']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.numero} ({self.situacao_normalizada})"
+
+
+class RelacaoNorma(models.Model):
+    """
+    Aresta norma→norma do grafo de citações: `origem` altera, revoga ou
+    regulamenta `destino` (monitor.utils.grafo_normas).
+    """
+    TIPO_CHOICES = [
+        ('ALTERA', 'Altera'),
+        ('REVOGA', 'Revoga'),
+        ('REGULAMENTA', 'Regulamenta'),
+    ]
+
+    origem = models.ForeignKey(
+        NormaVigente,
+        on_delete=models.CASCADE,
+        related_name='relacoes_saida'
+    )
+    destino = models.ForeignKey(
+        NormaVigente,
+        on_delete=models.CASCADE,
+        related_name='relacoes_entrada'
+    )
+    tipo = models.CharField(max_length=12, choices=TIPO_CHOICES)
+    fonte = models.CharField(
+        max_length=10,
+        default='SEFAZ',
+        choices=[('SEFAZ', 'SEFAZ'), ('DIARIO', 'Diário Oficial')]
+    )
+    data_cadastro = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Relação entre Normas"
+        verbose_name_plural = "Relações entre Normas"
+        unique_together = [['origem', 'destino', 'tipo']]
+        indexes = [
+            models.Index(fields=['destino', 'tipo']),
+        ]
+
+    def __str__(self):
+        return f"{self.origem_id} {self.get_tipo_display().lower()} {self.destino_id}"
+
+
+class CitacaoNorma(models.Model):
+    """
+    Aresta documento→norma com o número de menções da norma no texto analisado.
+    Espelha Documento.normas_relacionadas, acrescida da contagem.
+    """
+    documento = models.ForeignKey(
+        'Documento',
+        on_delete=models.CASCADE,
+        related_name='citacoes_normas'
+    )
+    norma = models.ForeignKey(
+        NormaVigente,
+        on_delete=models.CASCADE,
+        related_name='citacoes'
+    )
+    mencoes = models.PositiveIntegerField(default=1, verbose_name="Número de Menções")
+
+    class Meta:
+        verbose_name = "Citação de Norma"
+        verbose_name_plural = "Citações de Normas"
+        unique_together = [['documento', 'norma']]
+        indexes = [
+            models.Index(fields=['norma', 'documento']),
+        ]
+
+    def __str__(self):
+        return f"{self.documento_id} cita {self.norma_id} ({self.mencoes}x)"
+
+
+class ParagrafoRecorrente(models.Model):
+    """
+    Impressões digitais de parágrafos repetidos entre edições (cabeçalhos,
+    expedientes, assinaturas, cláusulas padrão). Parágrafos vistos em mais de
+    MONITOR_BOILERPLATE_LIMIAR documentos são marcados como boilerplate.
+    """
+    impressao = models.CharField(
+        max_length=40,
+        unique=True,
+        help_text="SHA-1 do parágrafo normalizado (sem acentos, caixa e espaços extras)"
+    )
+    ocorrencias = models.PositiveIntegerField(default=0, verbose_name="Documentos em que apareceu")
+    boilerplate = models.BooleanField(default=False, db_index=True, verbose_name="Boilerplate")
+    amostra = models.TextField(blank=True, verbose_name="Amostra do Parágrafo")
+    primeira_ocorrencia = models.DateTimeField(auto_now_add=True)
+    ultima_ocorrencia = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Parágrafo Recorrente"
+        verbose_name_plural = "Parágrafos Recorrentes"
+        ordering = ['-ocorrencias']
+
+    def __str__(self):
+        return f"{self.amostra[:60]} ({self.ocorrencias}x{', boilerplate' if self.boilerplate else ''})"
+
+
 class RelatorioGerado(models.Model):
     """
     Relatórios gerados pelo sistema
@@ -478,4 +755,37 @@ class LogExecucao(models.Model):
         """Calcula a duração antes de salvar"""
         if self.data_fim and self.data_inicio:
             self.duracao = self.data_fim - self.data_inicio
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class CheckpointExecucao(models.Model):
+    """
+    Progresso de um documento (por URL) numa execução da coleta: a última etapa
+    concluída. Permite retomar uma execução interrompida (monitor.utils.checkpoints).
+    """
+    ETAPA_CHOICES = [
+        ('DESCOBERTO', 'Descoberto'),
+        ('BAIXADO', 'Baixado'),
+        ('EXTRAIDO', 'Texto extraído'),
+        ('GRAVADO', 'Gravado'),
+        ('PROCESSADO', 'Processado'),
+        ('DESCARTADO', 'Descartado'),
+    ]
+
+    log = models.ForeignKey(LogExecucao, on_delete=models.CASCADE, related_name='checkpoints')
+    url = models.URLField(max_length=500)
+    fonte = models.CharField(max_length=30, blank=True)
+    etapa = models.CharField(max_length=20, choices=ETAPA_CHOICES, default='DESCOBERTO')
+    documento = models.ForeignKey(Documento, on_delete=models.SET_NULL, null=True, blank=True, related_name='checkpoints')
+    dados = models.JSONField(blank=True, null=True, help_text="Item da etapa (metadados e caminhos dos arquivos)")
+    data_atualizacao = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Checkpoint de Execução"
+        verbose_name_plural = "Checkpoints de Execução"
+        unique_together = [['log', 'url']]
+        indexes = [
+            models.Index(fields=['log', 'etapa']),
+        ]
+
+    def __str__(self):
+        return f"{self.log_id} {self.url} ({self.etapa})"
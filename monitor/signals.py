@@ -0,0 +1,46 @@
+# monitor/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import NormaVigente, ParagrafoRecorrente, RelacaoNorma, TermoMonitorado
+from .utils.boilerplate import invalidar_boilerplate
+from .utils.cache_worker import invalidar_termos
+from .utils.grafo_normas import invalidar_grafo_normas
+from .utils.indice_normas import norma_removida, norma_salva
+from .utils.situacao_normas import registrar_mudanca
+
+
+@receiver([post_save, post_delete], sender=TermoMonitorado)
+def termo_monitorado_alterado(sender, **kwargs):
+    """
+    Invalida o cache de termos dos workers quando um termo é criado, alterado ou
+    removido. Só depois do commit: antes dele, outro worker recarregaria os termos antigos.
+    """
+    transaction.on_commit(invalidar_termos)
+
+
+@receiver([post_save, post_delete], sender=ParagrafoRecorrente)
+def paragrafo_recorrente_alterado(sender, **kwargs):
+    """Marcação manual de boilerplate (admin/shell) vale para todos os workers."""
+    transaction.on_commit(invalidar_boilerplate)
+
+
+@receiver(post_save, sender=NormaVigente)
+def norma_vigente_salva(sender, instance, created=False, **kwargs):
+    """
+    Mantém o índice de normas do processo (mudança de tipo/número/ano invalida os
+    demais workers) e registra mudanças de situação no histórico.
+    """
+    norma_salva(instance, criada=created)
+    registrar_mudanca(instance, criada=created)
+
+
+@receiver(post_delete, sender=NormaVigente)
+def norma_vigente_removida(sender, instance, **kwargs):
+    norma_removida(instance)
+
+
+@receiver([post_save, post_delete], sender=RelacaoNorma)
+def relacao_norma_alterada(sender, **kwargs):
+    transaction.on_commit(invalidar_grafo_normas)
@@ -1,11 +1,12 @@
 import time
-from celery import chain, shared_task, group # group não está sendo usado, pode remover se não planeja
+from celery import chain, chord, shared_task, group
 from datetime import datetime, timedelta, date
 import logging
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 import traceback
-from django.db.models import Q, F # F não está sendo usado, pode remover
+from django.db.models import Q, F
 from django.db.models.functions import Length
 from .utils.scraper_geral import DiarioOficialScraper
 from .utils.pdf_processor import PDFProcessor
@@ -23,6 +24,22 @@ app.conf.beat_schedule = {
         'task': 'monitor.utils.tasks.coletar_e_processar_tudo',
         'schedule': crontab(minute=0, hour='*/3'),  # A cada 3 horas
         'options': {'expires': 3600 * 2}
+    },
+    'verificacao-agendada-normas': {
+        'task': 'monitor.utils.tasks.verificar_normas_agendadas',
+        'schedule': crontab(minute='*/30'),  # lote pequeno e frequente: carga constante no portal
+        'options': {'expires': 60 * 25}
+    },
+    'catalogo-sefaz-incremental': {
+        'task': 'monitor.utils.tasks.sincronizar_catalogo_sefaz',
+        'schedule': crontab(minute=30, hour=5),
+        'options': {'expires': 3600 * 6}
+    },
+    'catalogo-sefaz-completo': {
+        'task': 'monitor.utils.tasks.sincronizar_catalogo_sefaz',
+        'schedule': crontab(minute=0, hour=2, day_of_week='sun'),
+        'kwargs': {'completo': True},
+        'options': {'expires': 3600 * 12}
     }
 }
 
@@ -30,85 +47,345 @@ app.conf.beat_schedule = {
 
 
 
-# --- Task única: executa todos os scrapers e processa os documentos ---
+# --- Coleta em etapas: descobrir -> baixar -> extrair -> gravar -> analisar ---
+# Filas (diario_oficial/celery.py): etapas de I/O em 'io', etapas de CPU em 'cpu'
 from celery import shared_task
 
 @shared_task(bind=True, name="monitor.utils.tasks.coletar_e_processar_tudo")
-def coletar_e_processar_tudo(self):
+def coletar_e_processar_tudo(self, em_fluxo: Optional[bool] = None, retomar_log_id: Optional[int] = None):
     """
-    Executa todos os scrapers de coleta de documentos (Diário Oficial, SEFAZ, SEFAZ ICMS, etc) e processa os documentos coletados.
+    Coleta e processa os documentos de todas as fontes (Diário Oficial, SEFAZ, SEFAZ ICMS)
+    como um pipeline de tarefas (utils/etapas_coleta): a descoberta roda em paralelo por
+    fonte, cada documento segue baixar -> extrair -> gravar, e a análise é dividida em
+    lotes de MONITOR_PROCESSAMENTO_TAMANHO_LOTE (chord de processar_lote_documentos).
+    consolidar_processamento encerra o LogExecucao.
+
+    Com em_fluxo (padrão: MONITOR_COLETA_EM_FLUXO) tudo roda nesta tarefa, em fluxo:
+    cada PDF é gravado e analisado assim que é baixado (etapas_coleta.coletar_em_fluxo).
+
+    Cada etapa concluída vira um CheckpointExecucao da execução. Com retomar_log_id, a
+    execução interrompida continua de onde parou (utils/checkpoints), no mesmo modo.
     """
-    from monitor.models import LogExecucao, Documento
-    from .utils.scraper_geral import DiarioOficialScraper, SEFAZScraper, SEFAZICMSScraper
-    from .utils.pdf_processor import PDFProcessor
+    from monitor.models import LogExecucao
+    from .utils.etapas_coleta import FONTES
     task_id = self.request.id
-    log_entry = LogExecucao.objects.create(tipo_execucao='COLETA_E_PROCESSAMENTO', status='INICIADA', detalhes={'task_id': task_id})
-    logger.info(f"[{task_id}] Iniciando coleta e processamento de todos os scrapers.")
-    resultados = {}
-    erros = []
+    if retomar_log_id is not None:
+        log_entry = LogExecucao.objects.get(pk=retomar_log_id)
+        if log_entry.status == 'SUCESSO':
+            logger.info(f"[{task_id}] Execução {retomar_log_id} já concluída; nada a retomar.")
+            return {'status': 'JA_CONCLUIDA', 'log_id': log_entry.id}
+        detalhes = log_entry.detalhes or {}
+        detalhes['retomadas'] = detalhes.get('retomadas', []) + [{'task_id': task_id, 'data': timezone.now().isoformat()}]
+        log_entry.status = 'INICIADA'
+        log_entry.detalhes = detalhes
+        log_entry.data_fim = None
+        log_entry.save(update_fields=['status', 'detalhes', 'data_fim'])
+        em_fluxo = detalhes.get('modo') == 'fluxo'
+        logger.info(f"[{task_id}] Retomando a execução {retomar_log_id} (modo {detalhes.get('modo', 'etapas')}).")
+    else:
+        if em_fluxo is None:
+            em_fluxo = getattr(settings, 'MONITOR_COLETA_EM_FLUXO', False)
+        log_entry = LogExecucao.objects.create(
+            tipo_execucao='COLETA_E_PROCESSAMENTO', status='INICIADA',
+            detalhes={'task_id': task_id, 'modo': 'fluxo' if em_fluxo else 'etapas'},
+        )
+        logger.info(f"[{task_id}] Iniciando coleta e processamento de todos os scrapers.")
+    if em_fluxo:
+        return _coletar_em_fluxo(task_id, log_entry, retomar=retomar_log_id is not None)
+    try:
+        if (log_entry.detalhes or {}).get('descoberta_concluida'):
+            # Retomada após a descoberta: segue só com os checkpoints pendentes
+            preparar_documentos.delay([], log_entry.id)
+        else:
+            chord(
+                group(descobrir_documentos.s(fonte, str(timezone.localdate(log_entry.data_inicio))) for fonte in FONTES),
+                preparar_documentos.s(log_entry.id),
+            ).apply_async()
+    except Exception as e:
+        logger.error(f"[{task_id}] Erro fatal ao disparar a coleta: {e}", exc_info=True)
+        log_entry.status = 'ERRO'
+        log_entry.detalhes.update({'erro_principal': str(e), 'traceback': traceback.format_exc()})
+        log_entry.data_fim = timezone.now()
+        log_entry.duracao = log_entry.data_fim - log_entry.data_inicio
+        log_entry.save()
+        raise
+    return {'status': 'PROCESSANDO', 'log_id': log_entry.id}
+
+
+def _coletar_em_fluxo(task_id, log_entry, retomar: bool = False) -> dict:
+    from .utils.etapas_coleta import coletar_em_fluxo
+    resultados, erros = {}, []
+    try:
+        resultados = coletar_em_fluxo(log_id=log_entry.id, retomar=retomar, data=timezone.localdate(log_entry.data_inicio))
+        erros = resultados.pop('erros')
+        log_entry.documentos_coletados = log_entry.checkpoints.exclude(documento=None).count()
+        log_entry.documentos_processados = log_entry.checkpoints.filter(etapa='PROCESSADO').count()
+        resultados.update(_etapas_pos_processamento(task_id, erros))
+        log_entry.status = 'SUCESSO' if not erros and not resultados['processamento_documentos']['falha'] else 'PARCIAL'
+        log_entry.detalhes.update({'resultados': resultados, 'erros': erros})
+    except Exception as e:
+        logger.error(f"[{task_id}] Erro fatal na coleta em fluxo: {e}", exc_info=True)
+        log_entry.status = 'ERRO'
+        log_entry.detalhes.update({'erro_principal': str(e), 'traceback': traceback.format_exc()})
+        raise
+    finally:
+        log_entry.data_fim = timezone.now()
+        log_entry.duracao = log_entry.data_fim - log_entry.data_inicio
+        log_entry.save()
+        logger.info(f"[{task_id}] Task 'coletar_e_processar_tudo' (em fluxo) concluída. Status: {log_entry.status}.")
+    return {'status': log_entry.status, 'resultados': resultados, 'erros': erros}
+
+
+@shared_task(bind=True, name="monitor.utils.tasks.descobrir_documentos")
+def descobrir_documentos(self, fonte: str, data: Optional[str] = None):
+    """Etapa de I/O: lista os PDFs publicados na fonte em `data` (ISO; padrão: hoje)."""
+    from .utils.etapas_coleta import descobrir
+    try:
+        return {'fonte': fonte, 'itens': descobrir(fonte, date.fromisoformat(data) if data else None)}
+    except Exception as e:
+        logger.error(f"[{self.request.id}] Erro no scraper {fonte}: {e}", exc_info=True)
+        return {'fonte': fonte, 'itens': [], 'erro': str(e)}
+
+
+@shared_task(bind=True, name="monitor.utils.tasks.preparar_documentos")
+def preparar_documentos(self, descobertas: List[dict], log_id: int):
+    """
+    Callback da descoberta: registra os checkpoints DESCOBERTO e dispara, para cada
+    documento pendente, as etapas que faltam (baixar -> extrair -> gravar).
+    """
+    from monitor.models import LogExecucao
+    from .utils.checkpoints import pendentes, registrar_descobertos
+    log_entry = LogExecucao.objects.get(pk=log_id)
+    detalhes = log_entry.detalhes or {}
+    if descobertas:
+        resultados, erros, itens = {}, [], []
+        for descoberta in descobertas:
+            resultados[descoberta['fonte']] = len(descoberta['itens'])
+            if descoberta.get('erro'):
+                erros.append({'scraper': descoberta['fonte'], 'erro': descoberta['erro']})
+            itens += descoberta['itens']
+        registrar_descobertos(log_id, itens)
+        detalhes.update({'resultados': resultados, 'erros': erros, 'descoberta_concluida': True})
+        log_entry.detalhes = detalhes
+        log_entry.save(update_fields=['detalhes'])
+    pendente = pendentes(log_id)
+    cadeias = (
+        [chain(baixar_documento.s(item, log_id), extrair_documento.s(log_id), gravar_documento.s(log_id)) for item in pendente['baixar']]
+        + [chain(extrair_documento.s(item, log_id), gravar_documento.s(log_id)) for item in pendente['extrair']]
+        + [gravar_documento.s(item, log_id) for item in pendente['gravar']]
+    )
+    if not cadeias:
+        return despachar_analise.delay(pendente['analisar'], log_id).id
+    logger.info(f"[{self.request.id}] {len(cadeias)} documento(s) para baixar/extrair/gravar; "
+                f"{len(pendente['analisar'])} já gravado(s) e {pendente['concluidos']} concluído(s).")
+    chord(group(cadeias), despachar_analise.s(log_id, ja_gravados=pendente['analisar'])).apply_async()
+    return len(cadeias)
+
+
+def _etapa_documento(self, etapa, item, log_id, checkpoint):
+    # Falha de um documento não derruba o chord: o documento é descartado (None) e o
+    # checkpoint fica na etapa anterior, para a retomada tentar de novo
+    from .utils.checkpoints import avancar
+    if not item:
+        return None
     try:
-        documentos_coletados = []
-        # Diário Oficial
+        resultado = etapa(item)
+    except Exception as e:
+        logger.error(f"[{self.request.id}] Erro na etapa {etapa.__name__} de {item.get('url_original')}: {e}", exc_info=True)
+        return None
+    if log_id is not None:
+        if resultado is None:
+            avancar(log_id, item, 'DESCARTADO')
+        elif isinstance(resultado, dict):
+            avancar(log_id, resultado, checkpoint)
+        else:
+            avancar(log_id, item, checkpoint, documento_id=resultado)
+    return resultado
+
+
+@shared_task(bind=True, name="monitor.utils.tasks.baixar_documento")
+def baixar_documento(self, item: Optional[dict], log_id: Optional[int] = None):
+    """Etapa de I/O: baixa o PDF para o disco."""
+    from .utils.etapas_coleta import baixar
+    return _etapa_documento(self, baixar, item, log_id, 'BAIXADO')
+
+
+@shared_task(bind=True, name="monitor.utils.tasks.extrair_documento")
+def extrair_documento(self, item: Optional[dict], log_id: Optional[int] = None):
+    """Etapa de CPU: extrai o texto do PDF e aplica os filtros de data e termos."""
+    from .utils.etapas_coleta import extrair
+    return _etapa_documento(self, extrair, item, log_id, 'EXTRAIDO')
+
+
+@shared_task(bind=True, name="monitor.utils.tasks.gravar_documento")
+def gravar_documento(self, item: Optional[dict], log_id: Optional[int] = None):
+    """Etapa de I/O: cria o Documento e devolve o id para a análise."""
+    from .utils.etapas_coleta import gravar
+    return _etapa_documento(self, gravar, item, log_id, 'GRAVADO')
+
+
+@shared_task(bind=True, name="monitor.utils.tasks.despachar_analise")
+def despachar_analise(self, ids_documentos: List[Optional[int]], log_id: int, ja_gravados: Optional[List[int]] = None):
+    """Divide os documentos gravados em lotes de análise (chord) ou encerra a execução se não houver nenhum."""
+    from monitor.models import CheckpointExecucao, LogExecucao
+    ids_documentos = list(dict.fromkeys(i for i in list(ja_gravados or []) + list(ids_documentos) if i))
+    LogExecucao.objects.filter(pk=log_id).update(
+        documentos_coletados=CheckpointExecucao.objects.filter(log_id=log_id).exclude(documento=None).count()
+    )
+    if not ids_documentos:
+        return consolidar_processamento.delay([], log_id).id
+    tamanho = max(getattr(settings, 'MONITOR_PROCESSAMENTO_TAMANHO_LOTE', 20), 1)
+    lotes = [ids_documentos[i:i + tamanho] for i in range(0, len(ids_documentos), tamanho)]
+    logger.info(f"[{self.request.id}] Disparando {len(lotes)} lote(s) de análise para {len(ids_documentos)} documento(s).")
+    chord(
+        group(processar_lote_documentos.s(lote, log_id) for lote in lotes),
+        consolidar_processamento.s(log_id),
+    ).apply_async()
+    return len(lotes)
+
+
+def _etapas_pos_processamento(task_id, erros: list) -> dict:
+    """Etapas que dependem de todos os documentos processados (classificação local em lote)."""
+    resultados = {}
+    if getattr(settings, 'MONITOR_CLASSIFICACAO_LOCAL_ATIVA', True):
         try:
-            scraper_diario = DiarioOficialScraper()
-            documentos_diario = scraper_diario.coletar_e_salvar_documentos()
-            resultados['diario_oficial'] = len(documentos_diario)
-            documentos_coletados.extend(documentos_diario)
+            from .utils.estagio_classificacao import classificar_pendentes
+            resultados['classificacao_local'] = classificar_pendentes()
+        except ImportError:
+            logger.info(f"[{task_id}] transformers não instalado; classificação local em lote pulada.")
         except Exception as e:
-            logger.error(f"[{task_id}] Erro no scraper Diário Oficial: {e}", exc_info=True)
-            erros.append({'scraper': 'diario_oficial', 'erro': str(e)})
+            logger.error(f"[{task_id}] Erro na classificação local em lote: {e}", exc_info=True)
+            erros.append({'etapa': 'classificacao_local', 'erro': str(e)})
+    return resultados
 
-        # SEFAZ
+
+@shared_task(bind=True, name="monitor.utils.tasks.processar_lote_documentos")
+def processar_lote_documentos(self, ids_documentos: List[int], log_id: Optional[int] = None):
+    """
+    Etapa de CPU: analisa um lote de documentos (membro do group disparado por despachar_analise).
+    Um SELECT para o lote, um PDFProcessor por lote e um único UPDATE do contador do
+    LogExecucao ao final; devolve as contagens para o callback do chord. O checkpoint
+    de cada documento é marcado logo após a análise, para uma retomada não repeti-la.
+    """
+    from monitor.models import Documento, LogExecucao
+    from .utils.checkpoints import marcar_processados
+    from .utils.analise_documento import limitar_texto
+    from .utils.pdf_processor import BALDES, PDFProcessor, balde_do_status
+    task_id = self.request.id
+    contagem = {**{balde: 0 for balde in BALDES}, 'erros': []}
+    processados = []
+    documentos = Documento.objects.in_bulk(ids_documentos)
+    processor = PDFProcessor()
+    extracoes = {}
+    if getattr(settings, 'MONITOR_SPACY_LOTE_ATIVO', True):
+        # Normas e entidades do lote inteiro numa chamada a nlp.pipe
+        com_texto = [d for d in documentos.values() if d.texto_completo]
         try:
-            scraper_sefaz = SEFAZScraper()
-            documentos_sefaz = scraper_sefaz.coletar_documentos()
-            resultados['sefaz'] = len(documentos_sefaz)
-            documentos_coletados.extend(documentos_sefaz)
+            resultados = processor.extrair_normas_e_entidades_lote([limitar_texto(d.texto_completo) for d in com_texto])
+            extracoes = {d.pk: resultado for d, resultado in zip(com_texto, resultados)}
         except Exception as e:
-            logger.error(f"[{task_id}] Erro no scraper SEFAZ: {e}", exc_info=True)
-            erros.append({'scraper': 'sefaz', 'erro': str(e)})
-
-        # SEFAZ ICMS
+            logger.error(f"[{task_id}] Erro na extração de normas/entidades em lote: {e}", exc_info=True)
+    for documento_id in ids_documentos:
+        documento = documentos.get(documento_id)
+        if documento is None:
+            contagem['falha'] += 1
+            contagem['erros'].append({'documento': documento_id, 'erro': 'Documento não encontrado.'})
+            continue
         try:
-            scraper_icms = SEFAZICMSScraper()
-            documentos_icms = scraper_icms.coletar_documentos()
-            resultados['sefaz_icms'] = len(documentos_icms)
-            documentos_coletados.extend(documentos_icms)
+            result = processor.process_document(documento, extracao=extracoes.get(documento_id))
+            processados.append(documento_id)
+            if log_id is not None:
+                marcar_processados(log_id, [documento_id])
+            status = result.get('status')
+            balde = balde_do_status(status)
+            contagem[balde] += 1
+            if balde == 'falha':
+                contagem['erros'].append({'documento': documento_id, 'erro': result.get('message', status)})
         except Exception as e:
-            logger.error(f"[{task_id}] Erro no scraper SEFAZ ICMS: {e}", exc_info=True)
-            erros.append({'scraper': 'sefaz_icms', 'erro': str(e)})
+            contagem['falha'] += 1
+            contagem['erros'].append({'documento': documento_id, 'erro': str(e)})
+            logger.error(f"[{task_id}] Erro ao processar documento ID {documento_id}: {e}", exc_info=True)
+    if log_id is not None:
+        # Progresso visível durante a execução, sem corrida entre lotes paralelos
+        LogExecucao.objects.filter(pk=log_id).update(
+            documentos_processados=F('documentos_processados') + len(processados)
+        )
+    logger.info(f"[{task_id}] Lote de {len(ids_documentos)} documento(s) processado: {contagem['sucesso']} relevantes, "
+                f"{contagem['irrelevantes']} irrelevantes, {contagem['duplicatas']} duplicatas, {contagem['falha']} falhas.")
+    return contagem
 
-        # IDs de todos os documentos coletados
-        ids_documentos = [doc.id for doc in documentos_coletados if hasattr(doc, 'id')]
 
-        # Processa todos os documentos coletados
-        try:
-            logger.info(f"[{task_id}] Iniciando processamento dos documentos coletados.")
-            processor = PDFProcessor()
-            sucesso = 0
-            falha = 0
-            for i, documento in enumerate(Documento.objects.filter(id__in=ids_documentos)):
-                try:
-                    result = processor.process_document(documento)
-                    if result.get('status') == 'SUCESSO':
-                        sucesso += 1
-                    else:
-                        falha += 1
-                except Exception as e:
-                    falha += 1
-                    logger.error(f"[{task_id}] Erro ao processar documento ID {documento.id}: {e}", exc_info=True)
-            resultados['processamento_documentos'] = {'sucesso': sucesso, 'falha': falha}
-        except Exception as e:
-            logger.error(f"[{task_id}] Erro ao processar documentos coletados: {e}", exc_info=True)
-            erros.append({'etapa': 'processamento_documentos', 'erro': str(e)})
-
-        log_entry.status = 'SUCESSO' if not erros else 'PARCIAL'
-        log_entry.detalhes.update({
-            'resultados': resultados,
-            'erros': erros
-        })
+@shared_task(bind=True, name="monitor.utils.tasks.consolidar_processamento")
+def consolidar_processamento(self, resultados_lotes: List[dict], log_id: int):
+    """Callback do chord: soma as contagens dos lotes, roda as etapas em lote e encerra o LogExecucao."""
+    from monitor.models import LogExecucao
+    from .utils.pdf_processor import BALDES
+    log_entry = LogExecucao.objects.get(pk=log_id)
+    task_id = (log_entry.detalhes or {}).get('task_id', self.request.id)
+    total = {'lotes': len(resultados_lotes), **{balde: 0 for balde in BALDES}}
+    erros_documentos = []
+    for contagem in resultados_lotes:
+        for chave in BALDES:
+            total[chave] += contagem.get(chave, 0)
+        erros_documentos += contagem.get('erros', [])
+    detalhes = log_entry.detalhes or {}
+    resultados = detalhes.get('resultados', {})
+    erros = detalhes.get('erros', [])
+    resultados['processamento_documentos'] = total
+    resultados.update(_etapas_pos_processamento(task_id, erros))
+    log_entry.status = 'SUCESSO' if not erros and not total['falha'] else 'PARCIAL'
+    log_entry.detalhes = {**detalhes, 'resultados': resultados, 'erros': erros, 'erros_documentos': erros_documentos[:100]}
+    log_entry.data_fim = timezone.now()
+    log_entry.duracao = log_entry.data_fim - log_entry.data_inicio
+    # documentos_processados já foi incrementado pelos lotes
+    log_entry.save(update_fields=['status', 'detalhes', 'data_fim', 'duracao'])
+    logger.info(f"[{task_id}] Task 'coletar_e_processar_tudo' concluída. Status: {log_entry.status}. Processamento: {total}")
+    return {'status': log_entry.status, 'log_id': log_id, **total}
+
+
+@shared_task(bind=True, name="monitor.utils.tasks.classificar_documentos_pendentes")
+def classificar_documentos_pendentes(self, limite: Optional[int] = None):
+    """
+    Classifica com o modelo local, em lotes entre documentos, todo o backlog de
+    documentos relevantes ainda sem score_classificador.
+    """
+    from .utils.estagio_classificacao import classificar_pendentes
+    logger.info(f"[{self.request.id}] Iniciando classificação local em lote (limite={limite}).")
+    return classificar_pendentes(limite=limite)
+
+
+@shared_task(bind=True, name="monitor.utils.tasks.reavaliar_mudanca_situacao")
+def reavaliar_mudanca_situacao(self, historico_id: int):
+    """
+    Reavalia apenas os documentos e relatórios atingidos por uma mudança de
+    situação de norma (HistoricoSituacaoNorma), em vez de uma varredura completa.
+    """
+    from .utils.situacao_normas import reavaliar_mudanca
+    logger.info(f"[{self.request.id}] Reavaliando mudança de situação {historico_id}.")
+    return reavaliar_mudanca(historico_id)
+
+
+@shared_task(bind=True, name="monitor.utils.tasks.verificar_normas_agendadas")
+def verificar_normas_agendadas(self, max_normas: Optional[int] = None, orcamento_segundos: Optional[float] = None):
+    """
+    Verifica no portal da SEFAZ as normas de maior prioridade (agendador_verificacao),
+    limitado por quantidade e por tempo. Respeita ConfiguracaoColeta.verificar_vigencias.
+    """
+    from monitor.models import ConfiguracaoColeta, LogExecucao
+    from .utils.agendador_verificacao import executar_verificacao
+    task_id = self.request.id
+    configuracao = ConfiguracaoColeta.objects.filter(ativa=True).first()
+    if configuracao is not None and not configuracao.verificar_vigencias:
+        logger.info(f"[{task_id}] Verificação de vigências desativada na configuração de coleta.")
+        return {'status': 'DESATIVADA'}
+    log_entry = LogExecucao.objects.create(tipo_execucao='SEFAZ', status='INICIADA', detalhes={'task_id': task_id})
+    try:
+        resultado = executar_verificacao(max_normas=max_normas, orcamento_segundos=orcamento_segundos)
+        log_entry.status = 'SUCESSO' if not resultado['erros'] else 'PARCIAL'
+        log_entry.normas_verificadas = resultado['verificadas']
+        log_entry.detalhes.update({'resultados': resultado})
     except Exception as e:
-        logger.error(f"[{task_id}] Erro fatal na coleta e processamento: {e}", exc_info=True)
+        logger.error(f"[{task_id}] Erro na verificação agendada de normas: {e}", exc_info=True)
         log_entry.status = 'ERRO'
         log_entry.detalhes.update({'erro_principal': str(e), 'traceback': traceback.format_exc()})
         raise
@@ -116,6 +393,16 @@ def coletar_e_processar_tudo(self):
         log_entry.data_fim = timezone.now()
         log_entry.duracao = log_entry.data_fim - log_entry.data_inicio
         log_entry.save()
-        logger.info(f"[{task_id}] Task 'coletar_e_processar_tudo' concluída. Status: {log_entry.status}. Detalhes: {log_entry.detalhes}")
-    return {'status': log_entry.status, 'resultados': resultados, 'erros': erros}
-# monitor/utils/tasks.py
\ No newline at end of file
+    return {'status': log_entry.status, **resultado}
+
+
+@shared_task(bind=True, name="monitor.utils.tasks.sincronizar_catalogo_sefaz")
+def sincronizar_catalogo_sefaz(self, completo: bool = False):
+    """
+    Atualiza o espelho local do catálogo do portal da legislação (catalogo_sefaz):
+    incremental por data de publicação todo dia, completo aos domingos.
+    """
+    from .utils.catalogo_sefaz import sincronizar_catalogo
+    logger.info(f"[{self.request.id}] Sincronizando catálogo SEFAZ (completo={completo}).")
+    return sincronizar_catalogo(completo=completo)
+# monitor/utils/tasks.py
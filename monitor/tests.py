@@ -0,0 +1,91 @@
+import random
+import unittest
+
+from monitor.utils.lexico import LEXICO_IMPACTO_FISCAL, LEXICO_SENTIMENTO
+
+# Listas e lógica anteriores aos léxicos compilados (PDFProcessor/ClaudeProcessor)
+PALAVRAS_SENTIMENTO = (
+    ("POSITIVO", ["benefício", "redução", "simplifica", "incentivo", "isenção", "facilita"]),
+    ("NEGATIVO", ["obriga", "penalidade", "multa", "aumenta", "restrição", "oneroso", "complexo", "revoga", "exclui"]),
+    ("CAUTELA", ["ambíguo", "incerto", "cautela", "duvidoso", "interpretação"]),
+)
+PALAVRAS_IMPACTO_FISCAL = [
+    "alíquota", "base de cálculo", "tributo", "obrigação acessória", "sped", "efd", "prazo", "recolhimento",
+    "benefício fiscal", "isenção", "penalidade", "multa", "regime especial", "substituição tributária",
+]
+
+
+def sentimento_anterior(texto: str) -> str:
+    texto = texto.lower()
+    for sentimento, palavras in PALAVRAS_SENTIMENTO:
+        if any(palavra in texto for palavra in palavras):
+            return sentimento
+    return "NEUTRO"
+
+
+def impacto_anterior(paragrafo: str) -> bool:
+    return any(palavra in paragrafo.lower() for palavra in PALAVRAS_IMPACTO_FISCAL)
+
+
+class LexicoEquivalenciaTests(unittest.TestCase):
+    """Os léxicos compilados dão o mesmo resultado dos laços `palavra in texto`."""
+
+    CASOS = [
+        "",
+        "Texto sem nenhuma palavra dos léxicos.",
+        "Concede benefício fiscal às empresas do Simples.",
+        "O benefício foi mantido.",
+        "Aplica multa por atraso no recolhimento.",
+        "A multa e o benefício fiscal foram revistos.",
+        "MULTA",
+        "Multas e penalidades.",
+        "benefíciofiscal",
+        "Isenção do ICMS com interpretação duvidosa.",
+        "A substituição tributária altera a base de cálculo.",
+        "Prazo do SPED e da EFD prorrogado.",
+        "Revoga a isenção e obriga o recolhimento.",
+        "Regime especial; cautela na obrigação acessória.",
+        "redução da alíquota, aumenta o tributo",
+    ]
+
+    def test_sentimento_igual_ao_anterior(self):
+        for texto in self.CASOS:
+            with self.subTest(texto=texto):
+                self.assertEqual(LEXICO_SENTIMENTO.avaliar(texto).rotulo, sentimento_anterior(texto))
+
+    def test_impacto_fiscal_igual_ao_anterior(self):
+        for texto in self.CASOS:
+            with self.subTest(texto=texto):
+                self.assertEqual(bool(LEXICO_IMPACTO_FISCAL.avaliar(texto).total), impacto_anterior(texto))
+
+    def test_prefixo_credita_as_duas_palavras(self):
+        contagem = LEXICO_IMPACTO_FISCAL.contar_palavras("benefício fiscal")
+        self.assertEqual(contagem, {"benefício fiscal": 1})
+        contagem = LEXICO_SENTIMENTO.contar_palavras("benefício fiscal")
+        self.assertEqual(contagem, {"benefício": 1})
+
+    def test_multa_nos_dois_lexicos(self):
+        self.assertEqual(LEXICO_SENTIMENTO.avaliar("multa").rotulo, "NEGATIVO")
+        self.assertEqual(LEXICO_IMPACTO_FISCAL.avaliar("multa").rotulo, "PENALIDADES")
+        # Prioridade por ordem de classe, como no laço anterior
+        self.assertEqual(LEXICO_SENTIMENTO.avaliar("multa e benefício").rotulo, "POSITIVO")
+
+    def test_sobreposicao_conta_todas_as_ocorrencias(self):
+        contagem = LEXICO_IMPACTO_FISCAL.contar_palavras("isenção isenção; penalidade e multa")
+        self.assertEqual(contagem, {"isenção": 2, "penalidade": 1, "multa": 1})
+
+    def test_textos_aleatorios(self):
+        palavras = sorted({p for _, lista in PALAVRAS_SENTIMENTO for p in lista} | set(PALAVRAS_IMPACTO_FISCAL))
+        ruido = ["de", "a", "o", "fiscal", "ICMS", "", " ", "\n", "-", "bene", "mul"]
+        aleatorio = random.Random(37)
+        for _ in range(2000):
+            partes = [aleatorio.choice(palavras + ruido) for _ in range(aleatorio.randint(0, 8))]
+            texto = aleatorio.choice(["", " "]).join(partes)
+            texto = texto.upper() if aleatorio.random() < 0.2 else texto
+            with self.subTest(texto=texto):
+                self.assertEqual(LEXICO_SENTIMENTO.avaliar(texto).rotulo, sentimento_anterior(texto))
+                self.assertEqual(bool(LEXICO_IMPACTO_FISCAL.avaliar(texto).total), impacto_anterior(texto))
+
+
+if __name__ == '__main__':
+    unittest.main()
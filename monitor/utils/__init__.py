@@ -1,8 +1,7 @@
-import spacy
-from spacy.lang.pt.stop_words import STOP_WORDS
-
 class PDFProcessor:
     def __init__(self):
+        # spaCy importado aqui para não pesar no import de monitor.utils
+        import spacy
         self.nlp = spacy.load("pt_core_news_lg")
         self._adicionar_regras_contabeis()
     
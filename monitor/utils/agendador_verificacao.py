@@ -0,0 +1,192 @@
+# monitor/utils/agendador_verificacao.py
+"""
+Agendador adaptativo da verificação de vigência das normas no portal da SEFAZ.
+
+Cada execução ordena as normas por prioridade e verifica as primeiras até
+MONITOR_VERIFICACAO_MAX_NORMAS ou até esgotar MONITOR_VERIFICACAO_ORCAMENTO_SEGUNDOS,
+com MONITOR_VERIFICACAO_INTERVALO_SEGUNDOS entre consultas: o portal recebe uma
+carga constante e limitada, e as normas que mais importam são vistas primeiro.
+
+Prioridade (maior = antes):
+- menção recente (data_ultima_mencao, decaimento exponencial com meia-vida de 30 dias);
+- tempo desde a última verificação (data_verificacao; nunca verificada = máximo);
+- volatilidade: mudanças de situação registradas em HistoricoSituacaoNorma;
+- documentos que citam a norma (CitacaoNorma).
+"""
+import heapq
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PESOS = {
+    'mencao': 3.0,
+    'desatualizacao': 2.0,
+    'volatilidade': 1.5,
+    'referencias': 1.0,
+}
+MEIA_VIDA_MENCAO_DIAS = 30
+DIAS_PARA_DESATUALIZACAO_MAXIMA = 90  # sem verificação há 90 dias (ou nunca) = termo máximo
+
+
+@dataclass
+class NormaPriorizada:
+    id: int
+    tipo: str
+    numero: str
+    situacao: str
+    prioridade: float
+    termos: Dict[str, float]
+
+
+def _contagem(modelo, campo: str):
+    """Subconsulta com a contagem de linhas de `modelo` por norma (evita JOINs com GROUP BY)."""
+    return Coalesce(Subquery(
+        modelo.objects.filter(**{campo: OuterRef('pk')}).order_by().values(campo)
+        .annotate(total=Count('pk')).values('total')[:1],
+        output_field=IntegerField(),
+    ), Value(0))
+
+
+def calcular_prioridade(data_ultima_mencao: Optional[date], data_verificacao: Optional[datetime],
+                        mudancas: int, referencias: int, agora: datetime) -> Dict[str, float]:
+    """Termos da prioridade já ponderados por PESOS; a prioridade é a soma."""
+    if data_ultima_mencao:
+        dias_mencao = max((agora.date() - data_ultima_mencao).days, 0)
+        mencao = 0.5 ** (dias_mencao / MEIA_VIDA_MENCAO_DIAS)
+    else:
+        mencao = 0.0
+    if data_verificacao:
+        dias_verificacao = (agora - data_verificacao).total_seconds() / 86400
+        desatualizacao = min(dias_verificacao / DIAS_PARA_DESATUALIZACAO_MAXIMA, 1.0)
+    else:
+        desatualizacao = 1.0
+    # log1p achata normas com centenas de citações/mudanças; 5 e 100 normalizam para ~1
+    volatilidade = min(math.log1p(mudancas) / math.log1p(5), 1.0)
+    referencias_norm = min(math.log1p(referencias) / math.log1p(100), 1.0)
+    return {
+        'mencao': PESOS['mencao'] * mencao,
+        'desatualizacao': PESOS['desatualizacao'] * desatualizacao,
+        'volatilidade': PESOS['volatilidade'] * volatilidade,
+        'referencias': PESOS['referencias'] * referencias_norm,
+    }
+
+
+def priorizar_normas(limite: int, intervalo_minimo_horas: Optional[float] = None) -> List[NormaPriorizada]:
+    """
+    As `limite` normas de maior prioridade, excluindo as verificadas há menos de
+    MONITOR_VERIFICACAO_INTERVALO_MINIMO_HORAS. Uma consulta (contagens em subconsultas)
+    e seleção com heap em Python.
+    """
+    from monitor.models import CitacaoNorma, HistoricoSituacaoNorma, NormaVigente
+    agora = timezone.now()
+    if intervalo_minimo_horas is None:
+        intervalo_minimo_horas = getattr(settings, 'MONITOR_VERIFICACAO_INTERVALO_MINIMO_HORAS', 24)
+    candidatas = (
+        NormaVigente.objects
+        .exclude(data_verificacao__gte=agora - timedelta(hours=intervalo_minimo_horas))
+        .annotate(
+            mudancas=_contagem(HistoricoSituacaoNorma, 'norma'),
+            referencias=_contagem(CitacaoNorma, 'norma'),
+        )
+        .values_list('id', 'tipo', 'numero', 'situacao', 'data_ultima_mencao', 'data_verificacao', 'mudancas', 'referencias')
+    )
+    priorizadas = []
+    for norma_id, tipo, numero, situacao, mencao, verificacao, mudancas, referencias in candidatas.iterator(chunk_size=5000):
+        termos = calcular_prioridade(mencao, verificacao, mudancas, referencias, agora)
+        priorizadas.append(NormaPriorizada(norma_id, tipo, numero, situacao, sum(termos.values()), termos))
+    return heapq.nlargest(limite, priorizadas, key=lambda n: n.prioridade)
+
+
+def _situacao_do_resultado(resultado: dict) -> Optional[str]:
+    """Converte o retorno de SEFAZScraper.check_norm_status em NormaVigente.situacao."""
+    status = resultado.get('status')
+    if status == 'VIGENTE':
+        return 'VIGENTE'
+    if status == 'NAO_VIGENTE':
+        texto = ((resultado.get('dados') or {}).get('situacao') or '').lower()
+        if any(t in texto for t in ('revogad', 'cancelad', 'extint')):
+            return 'REVOGADA'
+        if 'alterad' in texto:
+            return 'ALTERADA'
+    # NAO_ENCONTRADA / DADOS_INVALIDOS, ou NAO_VIGENTE com situação vazia ou que não
+    # reconhecemos: mantém a situação, só registra a verificação
+    return None
+
+
+def verificar_norma(scraper, norma) -> Tuple[Optional[str], dict]:
+    """
+    Consulta a norma no portal e grava situação e data_verificacao (histórico via
+    situacao_normas). Retorna a situação reconhecida e o resultado de check_norm_status.
+    """
+    from .situacao_normas import atualizar_situacao
+    resultado = scraper.check_norm_status(norma.get_tipo_display(), norma.numero) or {}
+    situacao = _situacao_do_resultado(resultado)
+    campos = {'data_verificacao': timezone.now()}
+    if resultado.get('fonte'):
+        campos['url_consulta'] = resultado['fonte']
+    if resultado.get('dados'):
+        campos['detalhes'] = norma._preprocessar_detalhes(dict(resultado['dados']))
+        campos['fonte_confirmacao'] = 'SEFAZ'
+    fonte = 'CATALOGO' if resultado.get('origem') == 'CATALOGO' else 'SEFAZ'
+    atualizar_situacao(norma, situacao or norma.situacao, fonte=fonte, **campos)
+    return situacao, resultado
+
+
+def executar_verificacao(max_normas: Optional[int] = None, orcamento_segundos: Optional[float] = None,
+                         intervalo_segundos: Optional[float] = None, scraper=None) -> dict:
+    """Verifica as normas mais prioritárias dentro do orçamento de tempo."""
+    from monitor.models import NormaVigente
+    max_normas = max_normas or getattr(settings, 'MONITOR_VERIFICACAO_MAX_NORMAS', 30)
+    orcamento_segundos = orcamento_segundos or getattr(settings, 'MONITOR_VERIFICACAO_ORCAMENTO_SEGUNDOS', 600)
+    intervalo_segundos = getattr(settings, 'MONITOR_VERIFICACAO_INTERVALO_SEGUNDOS', 5) if intervalo_segundos is None else intervalo_segundos
+    inicio = time.monotonic()
+    fila = priorizar_normas(max_normas)
+    normas = NormaVigente.objects.in_bulk([n.id for n in fila])
+    if scraper is None:
+        from .scraper_geral import SEFAZScraper
+        scraper = SEFAZScraper()
+    resultado = {'priorizadas': len(fila), 'verificadas': 0, 'mudancas': 0, 'erros': 0, 'orcamento_esgotado': False}
+    duracao_media = 0.0
+    try:
+        for posicao, priorizada in enumerate(fila):
+            decorrido = time.monotonic() - inicio
+            # Não começa uma consulta que provavelmente estouraria o orçamento
+            if decorrido + duracao_media > orcamento_segundos:
+                resultado['orcamento_esgotado'] = True
+                break
+            norma = normas.get(priorizada.id)
+            if norma is None:
+                continue
+            inicio_consulta = time.monotonic()
+            consultou_portal = True
+            try:
+                anterior = norma.situacao
+                situacao, consulta_norma = verificar_norma(scraper, norma)
+                consultou_portal = consulta_norma.get('origem') != 'CATALOGO'
+                resultado['verificadas'] += 1
+                resultado['mudancas'] += int(situacao is not None and situacao != anterior)
+            except Exception as e:
+                resultado['erros'] += 1
+                logger.error(f"Erro ao verificar a norma {norma}: {e}", exc_info=True)
+            consulta = time.monotonic() - inicio_consulta
+            duracao_media = consulta if posicao == 0 else 0.7 * duracao_media + 0.3 * consulta
+            # Respostas do espelho local (catalogo_sefaz) não passam pelo portal: sem pausa
+            if intervalo_segundos and consultou_portal and posicao + 1 < len(fila):
+                time.sleep(intervalo_segundos)
+    finally:
+        fechar = getattr(scraper, 'close', None)
+        if callable(fechar):
+            fechar()
+    resultado['duracao_segundos'] = round(time.monotonic() - inicio, 1)
+    logger.info(f"Verificação agendada de normas: {resultado}")
+    return resultado
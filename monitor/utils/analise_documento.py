@@ -0,0 +1,187 @@
+# monitor/utils/analise_documento.py
+"""
+Análise de um documento feita uma única vez e compartilhada pelas heurísticas.
+
+Parágrafos, ocorrências de termos, parágrafos relevantes e normas citadas
+são calculados sob demanda, no máximo uma vez por documento,
+e o tempo de cada etapa fica em `tempos` (ms). Parágrafos de boilerplate
+(monitor.utils.boilerplate) ficam de fora dos termos e dos parágrafos.
+"""
+import bisect
+import functools
+import logging
+import re
+import time
+from typing import Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
+
+from .boilerplate import impressao_paragrafo, remover_boilerplate
+from .busca_termos import MotorTermos, ResultadoBusca, obter_motor_termos
+
+logger = logging.getLogger(__name__)
+
+LIMITE_PARAGRAFOS_RELEVANTES = 10000
+_PARAGRAFOS = re.compile(r'\n{2,}')
+_PAGINAS = re.compile(r'\f|\n{3,}')
+
+
+def _etapa(func):
+    """cached_property que registra o tempo da primeira execução em self.tempos."""
+    nome = func.__name__
+
+    @functools.wraps(func)
+    def medida(self):
+        inicio = time.perf_counter()
+        try:
+            return func(self)
+        finally:
+            self.tempos[nome] = round((time.perf_counter() - inicio) * 1000, 2)
+
+    return functools.cached_property(medida)
+
+
+def dividir_paragrafos(texto: str) -> List[str]:
+    return [p.strip() for p in _PARAGRAFOS.split(texto or '') if p.strip()]
+
+
+def dividir_paragrafos_com_posicoes(texto: str) -> List[Tuple[str, int, int]]:
+    """Os mesmos parágrafos de dividir_paragrafos, com (inicio, fim) de cada um em `texto`."""
+    texto = texto or ''
+    resultado = []
+    inicio = 0
+    for separador in list(_PARAGRAFOS.finditer(texto)) + [None]:
+        fim = separador.start() if separador else len(texto)
+        trecho = texto[inicio:fim]
+        paragrafo = trecho.strip()
+        if paragrafo:
+            comeco = inicio + len(trecho) - len(trecho.lstrip())
+            resultado.append((paragrafo, comeco, comeco + len(paragrafo)))
+        if separador:
+            inicio = separador.end()
+    return resultado
+
+
+def limitar_texto(texto: str, limite_paginas: int = 3, limite_texto: int = 20000) -> str:
+    paginas = _PAGINAS.split(texto)
+    texto_limitado = '\n'.join(paginas[:limite_paginas]) if len(paginas) > 1 else texto
+    return texto_limitado[:limite_texto]
+
+
+class AnaliseDocumento:
+    """
+    Resultado compartilhado da análise de um texto.
+
+    - texto: texto completo (ocorrências de termos e score);
+    - texto_limitado: primeiras páginas (parágrafos, normas e heurísticas de IA);
+    - extrator_normas: função texto -> {(tipo, numero): menções} (PDFProcessor.contar_normas)
+      ou texto -> [(tipo, numero)];
+    - seletor_local: função texto -> parágrafos relevantes, usada quando nenhum
+      parágrafo cita termos monitorados;
+    - boilerplate: impressões de parágrafos a descartar (None = sem filtro).
+    """
+    def __init__(self, texto: str, texto_limitado: Optional[str] = None, motor: Optional[MotorTermos] = None,
+                 extrator_normas: Optional[Callable[[str], Union[Mapping[Tuple[str, str], int], List[Tuple[str, str]]]]] = None,
+                 seletor_local: Optional[Callable[[str], str]] = None,
+                 boilerplate: Optional[FrozenSet[str]] = None):
+        self.texto = texto or ''
+        self.texto_limitado = self.texto if texto_limitado is None else texto_limitado
+        self.motor = motor or obter_motor_termos()
+        self._extrator_normas = extrator_normas
+        self._seletor_local = seletor_local
+        self.boilerplate = boilerplate or frozenset()
+        self.paragrafos_descartados = 0
+        self.posicoes_paragrafos: List[Tuple[int, int]] = []
+        self.tempos: Dict[str, float] = {}
+
+    @classmethod
+    def do_texto(cls, texto: str, limite_paginas: int = 3, limite_texto: int = 20000, **kwargs) -> 'AnaliseDocumento':
+        return cls(texto, limitar_texto(texto or '', limite_paginas, limite_texto), **kwargs)
+
+    def _posicao_no_texto(self, posicao: int) -> int:
+        """
+        Offset de texto_limitado em texto. limitar_texto só troca cada separador de
+        página por '\n': dentro de uma página os offsets diferem por uma constante.
+        """
+        if self._inicios_paginas is None:
+            return posicao
+        inicios_limitado, inicios_texto = self._inicios_paginas
+        pagina = bisect.bisect_right(inicios_limitado, posicao) - 1
+        return inicios_texto[pagina] + posicao - inicios_limitado[pagina]
+
+    @functools.cached_property
+    def _inicios_paginas(self) -> Optional[Tuple[List[int], List[int]]]:
+        # (início de cada página no texto_limitado, no texto); None se é um prefixo do texto
+        if self.texto.startswith(self.texto_limitado):
+            return None
+        inicios_texto = [0] + [m.end() for m in _PAGINAS.finditer(self.texto)]
+        inicios_limitado = [0]
+        for pagina in _PAGINAS.split(self.texto)[:-1]:
+            inicios_limitado.append(inicios_limitado[-1] + len(pagina) + 1)
+        return inicios_limitado, inicios_texto
+
+    @_etapa
+    def paragrafos(self) -> List[str]:
+        """Parágrafos do texto_limitado sem boilerplate; (inicio, fim) no texto em posicoes_paragrafos."""
+        todos = dividir_paragrafos_com_posicoes(self.texto_limitado)
+        if self.boilerplate:
+            mantidos = [t for t in todos if impressao_paragrafo(t[0]) not in self.boilerplate]
+        else:
+            mantidos = todos
+        self.paragrafos_descartados = len(todos) - len(mantidos)
+        self.posicoes_paragrafos = [
+            (self._posicao_no_texto(inicio), self._posicao_no_texto(fim - 1) + 1) for _, inicio, fim in mantidos
+        ]
+        return [paragrafo for paragrafo, _, _ in mantidos]
+
+    @_etapa
+    def texto_sem_boilerplate(self) -> str:
+        """Texto completo com o boilerplate trocado por espaços (mesmos offsets)."""
+        return remover_boilerplate(self.texto, self.boilerplate)
+
+    @_etapa
+    def resultado_termos(self) -> ResultadoBusca:
+        return self.motor.buscar(self.texto_sem_boilerplate)
+
+    @_etapa
+    def paragrafos_com_termos(self) -> List[str]:
+        """Parágrafos que contêm alguma ocorrência de resultado_termos (pelos offsets, sem nova busca)."""
+        inicios = self.resultado_termos.inicios
+        if not inicios:
+            return []
+        com_termos = []
+        for paragrafo, (inicio, fim) in zip(self.paragrafos, self.posicoes_paragrafos):
+            posicao = bisect.bisect_left(inicios, inicio)
+            if posicao < len(inicios) and inicios[posicao] < fim:
+                com_termos.append(paragrafo)
+        return com_termos
+
+    @_etapa
+    def paragrafos_relevantes(self) -> str:
+        if self.paragrafos_com_termos:
+            return "\n\n".join(self.paragrafos_com_termos)[:LIMITE_PARAGRAFOS_RELEVANTES]
+        if self._seletor_local is not None:
+            logger.info("Nenhum parágrafo relevante encontrado por termos. Usando IA local heurística.")
+            return self._seletor_local("\n\n".join(self.paragrafos))
+        return ""
+
+    @_etapa
+    def paragrafos_relevantes_minusculos(self) -> List[str]:
+        return [p.lower() for p in dividir_paragrafos(self.paragrafos_relevantes)]
+
+    @_etapa
+    def contagem_normas(self) -> Dict[Tuple[str, str], int]:
+        if self._extrator_normas is None:
+            return {}
+        normas = self._extrator_normas(self.texto_limitado)
+        return dict(normas) if isinstance(normas, Mapping) else dict.fromkeys(normas, 1)
+
+    @property
+    def normas(self) -> List[Tuple[str, str]]:
+        return sorted(self.contagem_normas)
+
+    @property
+    def score_relevancia(self) -> float:
+        return self.resultado_termos.score(tipos=('TEXTO', 'REGEX'))
+
+    @property
+    def tempo_total(self) -> float:
+        return round(sum(self.tempos.values()), 2)
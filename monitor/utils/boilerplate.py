@@ -0,0 +1,141 @@
+# monitor/utils/boilerplate.py
+"""
+Detecção de boilerplate por impressão digital de parágrafos.
+
+Cada parágrafo é normalizado (acentos, caixa e espaços) e vira um SHA-1. Os
+dígitos ficam na impressão: "Decreto nº 21.866" e "Decreto nº 21.867" são
+parágrafos diferentes, e o título de um ato nunca vira boilerplate de outro.
+O banco (ParagrafoRecorrente) conta em quantos documentos cada impressão
+apareceu, uma vez por documento (Documento.paragrafos_registrados); acima de MONITOR_BOILERPLATE_LIMIAR o parágrafo passa a ser
+boilerplate e é descartado antes da relevância, do resumo e da classificação.
+O conjunto de impressões de boilerplate fica em cache no worker, versionado via Redis.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from typing import FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .busca_termos import normalizar_texto
+from .cache_worker import VersaoCompartilhada
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_MINIMO_PARAGRAFO = 15  # parágrafos menores não são registrados
+TAMANHO_AMOSTRA = 500
+_PARAGRAFOS = re.compile(r'\n{2,}')
+
+_versao_boilerplate = VersaoCompartilhada('monitor:boilerplate:versao')
+_cache_lock = threading.Lock()
+_cache: Optional[Tuple[tuple, float, FrozenSet[str]]] = None
+
+
+def impressao_paragrafo(paragrafo: str) -> Optional[str]:
+    """
+    Impressão digital do parágrafo, estável a acentos, caixa e espaçamento.
+    None para parágrafos curtos demais.
+    """
+    normalizado = normalizar_texto(paragrafo)
+    if len(normalizado) < TAMANHO_MINIMO_PARAGRAFO:
+        return None
+    return hashlib.sha1(normalizado.encode('utf-8')).hexdigest()
+
+
+def obter_impressoes_boilerplate() -> FrozenSet[str]:
+    """
+    Impressões marcadas como boilerplate, do cache do worker (recarregadas
+    quando a versão muda ou o TTL MONITOR_CACHE_TTL expira).
+    """
+    global _cache
+    versao = _versao_boilerplate.atual()
+    ttl = getattr(settings, 'MONITOR_CACHE_TTL', 300)
+    cache = _cache
+    if cache is not None and cache[0] == versao and time.monotonic() - cache[1] < ttl:
+        return cache[2]
+    with _cache_lock:
+        cache = _cache
+        if cache is None or cache[0] != versao or time.monotonic() - cache[1] >= ttl:
+            from monitor.models import ParagrafoRecorrente
+            impressoes = frozenset(ParagrafoRecorrente.objects.filter(boilerplate=True).values_list('impressao', flat=True))
+            logger.info(f"Cache de boilerplate carregado: {len(impressoes)} impressões (versão {versao}).")
+            cache = (versao, time.monotonic(), impressoes)
+            _cache = cache
+    return cache[2]
+
+
+def invalidar_boilerplate() -> None:
+    _versao_boilerplate.incrementar()
+
+
+def eh_boilerplate(paragrafo: str, impressoes: Optional[FrozenSet[str]] = None) -> bool:
+    impressoes = obter_impressoes_boilerplate() if impressoes is None else impressoes
+    return bool(impressoes) and impressao_paragrafo(paragrafo) in impressoes
+
+
+def filtrar_boilerplate(paragrafos: Sequence[str], impressoes: Optional[FrozenSet[str]] = None) -> List[str]:
+    impressoes = obter_impressoes_boilerplate() if impressoes is None else impressoes
+    if not impressoes:
+        return list(paragrafos)
+    return [p for p in paragrafos if impressao_paragrafo(p) not in impressoes]
+
+
+def remover_boilerplate(texto: str, impressoes: Optional[FrozenSet[str]] = None) -> str:
+    """
+    Troca os parágrafos de boilerplate por espaços do mesmo tamanho, preservando
+    os offsets do texto original (posições de termos continuam válidas).
+    """
+    impressoes = obter_impressoes_boilerplate() if impressoes is None else impressoes
+    if not impressoes or not texto:
+        return texto
+    partes = []
+    inicio = 0
+    for separador in list(_PARAGRAFOS.finditer(texto)) + [None]:
+        fim = separador.start() if separador else len(texto)
+        trecho = texto[inicio:fim]
+        partes.append(' ' * len(trecho) if impressao_paragrafo(trecho.strip()) in impressoes else trecho)
+        if separador:
+            partes.append(separador.group())
+            inicio = separador.end()
+    return ''.join(partes)
+
+
+def registrar_paragrafos(paragrafos: Iterable[str], documento_id: Optional[int] = None) -> int:
+    """
+    Soma uma ocorrência para cada parágrafo distinto do documento e marca como
+    boilerplate os que passarem do limiar. Retorna quantos viraram boilerplate agora.
+    Com `documento_id`, o documento só é contado na primeira vez (reprocessamento e
+    retomada de execução não inflam as ocorrências).
+    """
+    from monitor.models import Documento, ParagrafoRecorrente
+    amostras = {}
+    for paragrafo in paragrafos:
+        impressao = impressao_paragrafo(paragrafo)
+        if impressao and impressao not in amostras:
+            amostras[impressao] = paragrafo[:TAMANHO_AMOSTRA]
+    if not amostras:
+        return 0
+    limiar = getattr(settings, 'MONITOR_BOILERPLATE_LIMIAR', 5)
+    with transaction.atomic():
+        if documento_id is not None and not Documento.objects.filter(
+            pk=documento_id, paragrafos_registrados=False
+        ).update(paragrafos_registrados=True):
+            return 0
+        existentes = set(ParagrafoRecorrente.objects.filter(impressao__in=amostras).values_list('impressao', flat=True))
+        if existentes:
+            ParagrafoRecorrente.objects.filter(impressao__in=existentes).update(ocorrencias=F('ocorrencias') + 1)
+        ParagrafoRecorrente.objects.bulk_create(
+            [ParagrafoRecorrente(impressao=i, ocorrencias=1, amostra=a) for i, a in amostras.items() if i not in existentes],
+            ignore_conflicts=True,
+        )
+        novos = ParagrafoRecorrente.objects.filter(
+            impressao__in=existentes, boilerplate=False, ocorrencias__gt=limiar
+        ).update(boilerplate=True) if existentes else 0
+    if novos:
+        logger.info(f"{novos} parágrafo(s) passaram de {limiar} ocorrências e foram marcados como boilerplate.")
+        transaction.on_commit(invalidar_boilerplate)
+    return novos
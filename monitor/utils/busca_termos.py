@@ -0,0 +1,271 @@
+# monitor/utils/busca_termos.py
+"""
+Motor de busca dos termos monitorados.
+
+O texto é normalizado uma única vez (acentos e caixa removidos, espaços
+colapsados) e mantém um mapa de offsets para o texto original. Termos TEXTO,
+NORMA e REGEX são compilados em um único padrão com grupos nomeados e avaliados
+na mesma passada; só REGEX com retrorreferência numérica (\\1) é avaliado à parte,
+porque a numeração dos grupos muda dentro da alternação. Termos escondidos dentro
+de uma ocorrência mais longa ("ICMS" em "ICMS ST") são procurados no trecho casado,
+então cada termo tem as próprias ocorrências, como numa busca termo a termo.
+"""
+import logging
+import math
+import re
+import unicodedata
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+MAX_POSICOES = 20  # posições guardadas por termo (a contagem considera todas)
+_RETROREFERENCIA_NUMERICA = re.compile(r'(?<!\\)(?:\\\\)*\\[1-9]')
+
+
+def _dobrar_caractere(c: str) -> str:
+    decomposto = unicodedata.normalize('NFKD', c)
+    sem_acento = ''.join(ch for ch in decomposto if not unicodedata.combining(ch)).lower()
+    # Mantém a correspondência 1:1 de posições; expansões (ß, ligaduras) ficam como estão
+    return sem_acento if len(sem_acento) == 1 else c
+
+
+def _montar_tabelas():
+    completa = {}
+    so_acentos = {}
+    for codigo in range(0x250):  # Latin-1 + Latin Extended A/B
+        c = chr(codigo)
+        dobrado = _dobrar_caractere(c)
+        if dobrado != c:
+            completa[codigo] = dobrado
+            if codigo > 127:
+                so_acentos[codigo] = dobrado
+    return completa, so_acentos
+
+
+# _TABELA_DOBRA remove acentos e caixa; _TABELA_ACENTOS só remove acentos
+# (usada nos padrões REGEX, onde \D, \S, \W não podem virar minúsculas).
+_TABELA_DOBRA, _TABELA_ACENTOS = _montar_tabelas()
+_ESPACOS = re.compile(r'\s+')
+_SEPARADORES_TERMO = re.compile(r'[^0-9a-z]+')
+
+
+class TextoNormalizado:
+    """
+    Visão normalizada de um texto com o mapa de offsets de volta ao original.
+    """
+    __slots__ = ('original', 'texto', 'offsets')
+
+    def __init__(self, original: str):
+        self.original = original or ''
+        dobrado = self.original.translate(_TABELA_DOBRA)
+        partes = []
+        offsets = array('l')
+        inicio = 0
+        for m in _ESPACOS.finditer(dobrado):
+            partes.append(dobrado[inicio:m.start()])
+            offsets.extend(range(inicio, m.start()))
+            partes.append(' ')
+            offsets.append(m.start())
+            inicio = m.end()
+        partes.append(dobrado[inicio:])
+        offsets.extend(range(inicio, len(dobrado)))
+        self.texto = ''.join(partes)
+        self.offsets = offsets
+
+    def posicao_original(self, posicao: int) -> int:
+        if posicao >= len(self.offsets):
+            return len(self.original)
+        return self.offsets[posicao]
+
+    def trecho_original(self, inicio: int, fim: int) -> str:
+        if fim <= inicio:
+            return ''
+        return self.original[self.posicao_original(inicio):self.posicao_original(fim - 1) + 1]
+
+
+def normalizar_texto(texto: str) -> str:
+    """Versão normalizada de um texto curto (sem o mapa de offsets)."""
+    return _ESPACOS.sub(' ', (texto or '').translate(_TABELA_DOBRA)).strip()
+
+
+def _padrao_literal(termo: str) -> Optional[str]:
+    """
+    Converte um termo literal em padrão tolerante a espaçamento de OCR:
+    "Decreto 21.866" casa com "decreto21866", "DECRETO 21 866", etc.
+    """
+    tokens = [t for t in _SEPARADORES_TERMO.split(normalizar_texto(termo)) if t]
+    if not tokens:
+        return None
+    return r'[\s\-./]*'.join(re.escape(t) for t in tokens)
+
+
+@dataclass
+class OcorrenciaTermo:
+    termo_id: int
+    termo: str
+    tipo: str
+    prioridade: int
+    contagem: int = 0
+    posicoes: List[int] = field(default_factory=list)
+
+
+@dataclass
+class ResultadoBusca:
+    texto: TextoNormalizado
+    ocorrencias: Dict[int, OcorrenciaTermo] = field(default_factory=dict)
+    inicios: List[int] = field(default_factory=list)  # offset original de todas as ocorrências, em ordem
+
+    def encontrou(self, tipos: Optional[Iterable[str]] = None) -> bool:
+        if tipos is None:
+            return bool(self.ocorrencias)
+        tipos = set(tipos)
+        return any(o.tipo in tipos for o in self.ocorrencias.values())
+
+    def termos(self, tipos: Optional[Iterable[str]] = None) -> List[OcorrenciaTermo]:
+        tipos = set(tipos) if tipos is not None else None
+        return [o for o in self.ocorrencias.values() if tipos is None or o.tipo in tipos]
+
+    def score(self, tipos: Optional[Iterable[str]] = None) -> float:
+        """
+        Relevância ponderada: soma de prioridade * (1 + ln(ocorrências)) por termo encontrado.
+        """
+        return round(sum(o.prioridade * (1 + math.log(o.contagem)) for o in self.termos(tipos)), 4)
+
+
+class MotorTermos:
+    """
+    Compila os termos monitorados em um único padrão com grupos nomeados.
+
+    - TEXTO e NORMA: termo e variações, sem acento/caixa e tolerantes a espaçamento
+      (os números das normas são tratados em extrair_normas);
+    - REGEX: o próprio termo, compilado como expressão regular.
+
+    A alternação dá preferência aos termos mais longos; os termos que cabem dentro
+    de um deles (self.contidos, calculado a partir das formas) são procurados só no
+    trecho de cada ocorrência dele. Depois de um REGEX, todos os termos são procurados
+    no trecho. Ocorrência que só se sobrepõe em parte a uma mais longa fica de fora.
+    REGEX com retrorreferência numérica fica fora da alternação (self.isolados) e
+    é buscado em passada própria.
+    """
+    def __init__(self, termos: Iterable):
+        self.termos = {t.id: t for t in termos}
+        literais = []
+        regex = []
+        self.isolados = []
+        individuais = {}
+        for termo in self.termos.values():
+            if termo.tipo == 'REGEX':
+                padrao = termo.termo.translate(_TABELA_ACENTOS)
+                try:
+                    compilado = re.compile(padrao, re.IGNORECASE)
+                except re.error as e:
+                    logger.warning(f"Termo REGEX inválido ignorado (id={termo.id}): {termo.termo!r}: {e}")
+                    continue
+                if _RETROREFERENCIA_NUMERICA.search(padrao):
+                    self.isolados.append((termo.id, compilado))
+                else:
+                    regex.append((termo.id, padrao))
+                    individuais[termo.id] = compilado
+            else:
+                formas = termo.formas
+                padroes = sorted({p for p in (_padrao_literal(f) for f in formas) if p}, key=len, reverse=True)
+                if padroes:
+                    literais.append((termo.id, padroes))
+                    individuais[termo.id] = re.compile('|'.join(padroes), re.IGNORECASE)
+        literais.sort(key=lambda item: len(item[1][0]), reverse=True)
+        grupos = [f"(?P<t{id_}>{'|'.join(padroes)})" for id_, padroes in literais]
+        grupos += [f"(?P<t{id_}>{padrao})" for id_, padrao in regex]
+        self.padrao = self._compilar(grupos, regex)
+        self.contidos = self._termos_contidos(individuais)
+
+    def _termos_contidos(self, individuais: Dict[int, re.Pattern]) -> Dict[int, list]:
+        """
+        Para cada termo da alternação, os outros termos que podem casar dentro de uma
+        ocorrência dele: para literais, os que casam em alguma das suas formas; para
+        REGEX, cujo trecho não dá para prever, todos.
+        """
+        if self.padrao is None:
+            return {}
+        combinados = {int(nome[1:]): individuais[int(nome[1:])] for nome in self.padrao.groupindex}
+        contidos = {}
+        for termo_id in combinados:
+            termo = self.termos[termo_id]
+            outros = [(outro_id, compilado) for outro_id, compilado in combinados.items() if outro_id != termo_id]
+            if termo.tipo != 'REGEX':
+                formas = [normalizar_texto(forma) for forma in termo.formas]
+                outros = [(outro_id, compilado) for outro_id, compilado in outros
+                          if any(compilado.search(forma) for forma in formas)]
+            if outros:
+                contidos[termo_id] = outros
+        return contidos
+
+    def _compilar(self, grupos: List[str], regex: list):
+        if not grupos:
+            return None
+        try:
+            return re.compile('|'.join(grupos), re.IGNORECASE)
+        except re.error as e:
+            # Algum REGEX válido isoladamente não combina com os demais (ex.: grupos nomeados repetidos)
+            logger.warning(f"Falha ao combinar termos REGEX ({e}); termos REGEX serão buscados à parte nesta versão.")
+            self.isolados.extend((id_, re.compile(padrao, re.IGNORECASE)) for id_, padrao in regex)
+            ids_regex = {f"(?P<t{id_}>" for id_, _ in regex}
+            grupos = [g for g in grupos if not any(g.startswith(prefixo) for prefixo in ids_regex)]
+            return re.compile('|'.join(grupos), re.IGNORECASE) if grupos else None
+
+    def _registrar(self, resultado: ResultadoBusca, termo_id: int, inicio: int) -> None:
+        ocorrencia = resultado.ocorrencias.get(termo_id)
+        if ocorrencia is None:
+            termo = self.termos[termo_id]
+            ocorrencia = OcorrenciaTermo(termo_id, termo.termo, termo.tipo, termo.prioridade)
+            resultado.ocorrencias[termo_id] = ocorrencia
+        ocorrencia.contagem += 1
+        resultado.inicios.append(inicio)
+        if len(ocorrencia.posicoes) < MAX_POSICOES:
+            ocorrencia.posicoes.append(inicio)
+
+    def buscar(self, texto: Union[str, TextoNormalizado]) -> ResultadoBusca:
+        normalizado = texto if isinstance(texto, TextoNormalizado) else TextoNormalizado(texto)
+        resultado = ResultadoBusca(texto=normalizado)
+        texto_normalizado = normalizado.texto
+        reordenar = bool(self.isolados)
+        if self.padrao is not None:
+            for m in self.padrao.finditer(texto_normalizado):
+                if m.start() == m.end():
+                    continue
+                termo_id = int(m.lastgroup[1:])
+                self._registrar(resultado, termo_id, normalizado.posicao_original(m.start()))
+                for contido_id, compilado in self.contidos.get(termo_id, ()):
+                    for c in compilado.finditer(texto_normalizado, m.start(), m.end()):
+                        if c.start() != c.end():
+                            self._registrar(resultado, contido_id, normalizado.posicao_original(c.start()))
+                            reordenar = True
+        for termo_id, compilado in self.isolados:
+            for m in compilado.finditer(texto_normalizado):
+                if m.start() != m.end():
+                    self._registrar(resultado, termo_id, normalizado.posicao_original(m.start()))
+        if reordenar:
+            resultado.inicios.sort()
+            for ocorrencia in resultado.ocorrencias.values():
+                ocorrencia.posicoes.sort()
+        return resultado
+
+    def contem(self, texto: str) -> bool:
+        normalizado = normalizar_texto(texto)
+        if self.padrao is not None and self.padrao.search(normalizado) is not None:
+            return True
+        return any(compilado.search(normalizado) is not None for _, compilado in self.isolados)
+
+
+def obter_motor_termos() -> MotorTermos:
+    """
+    Motor compilado para a versão atual do cache de termos do worker.
+    """
+    from .cache_worker import obter_termos_ativos
+    termos_ativos = obter_termos_ativos()
+    motor = getattr(termos_ativos, 'motor', None)
+    if motor is None:
+        motor = MotorTermos(termos_ativos.termos)
+        termos_ativos.motor = motor
+    return motor
@@ -0,0 +1,67 @@
+# monitor/utils/busca_textual.py
+"""
+Busca textual ranqueada sobre os documentos coletados.
+
+No MySQL usa o índice FULLTEXT (titulo, texto_completo, resumo_ia, assunto)
+criado na migração 0034. O InnoDB atualiza esse índice a cada INSERT/UPDATE,
+então todo documento salvo pelo processamento já fica pesquisável.
+Observação: por padrão o InnoDB ignora palavras com menos de 3 caracteres
+(innodb_ft_min_token_size), como "IN" ou "ST".
+"""
+import logging
+from datetime import date
+from typing import Iterable, Optional
+
+from django.db import connection
+from django.db.models import FloatField, Q, QuerySet, Value
+from django.db.models.expressions import RawSQL
+
+from monitor.models import Documento
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_FULLTEXT = ('titulo', 'texto_completo', 'resumo_ia', 'assunto')
+
+
+def _expressao_match(modo_booleano: bool) -> str:
+    tabela = Documento._meta.db_table
+    colunas = ', '.join(f"{tabela}.{campo}" for campo in CAMPOS_FULLTEXT)
+    modo = 'IN BOOLEAN MODE' if modo_booleano else 'IN NATURAL LANGUAGE MODE'
+    return f"MATCH ({colunas}) AGAINST (%s {modo})"
+
+
+def buscar_documentos(consulta: str,
+                      data_inicio: Optional[date] = None,
+                      data_fim: Optional[date] = None,
+                      fontes: Optional[Iterable[str]] = None,
+                      limite: int = 20,
+                      modo_booleano: bool = False) -> QuerySet:
+    """
+    Retorna documentos ordenados por relevância (anotada em `relevancia`).
+
+    Filtros opcionais por período de publicação e por fonte_documento. O texto
+    completo não é carregado (defer) para manter a consulta leve; acesse-o
+    sob demanda no objeto. Com modo_booleano=True a consulta aceita os
+    operadores do MySQL (+termo -termo "frase").
+    """
+    consulta = (consulta or '').strip()
+    qs = Documento.objects.defer('texto_completo')
+    if data_inicio:
+        qs = qs.filter(data_publicacao__gte=data_inicio)
+    if data_fim:
+        qs = qs.filter(data_publicacao__lte=data_fim)
+    if fontes:
+        qs = qs.filter(fonte_documento__in=list(fontes))
+    if not consulta:
+        return qs.none()
+
+    if connection.vendor == 'mysql':
+        relevancia = RawSQL(_expressao_match(modo_booleano), (consulta,), output_field=FloatField())
+        qs = qs.annotate(relevancia=relevancia).filter(relevancia__gt=0)
+    else:
+        logger.debug(f"Banco '{connection.vendor}' sem FULLTEXT; usando busca por icontains.")
+        filtro = Q()
+        for campo in CAMPOS_FULLTEXT:
+            filtro |= Q(**{f"{campo}__icontains": consulta})
+        qs = qs.filter(filtro).annotate(relevancia=Value(0.0, output_field=FloatField()))
+    return qs.order_by('-relevancia', '-data_publicacao')[:limite]
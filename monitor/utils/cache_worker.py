@@ -0,0 +1,143 @@
+# monitor/utils/cache_worker.py
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class VersaoCompartilhada:
+    """
+    Contador de versão compartilhado entre os workers via Redis.
+    Cada processo guarda a última versão lida e só volta ao Redis depois de
+    `intervalo` segundos. Sem Redis, a versão vale apenas para o processo atual.
+    """
+    def __init__(self, chave: str, intervalo: Optional[float] = None):
+        self.chave = chave
+        self.intervalo = intervalo if intervalo is not None else getattr(settings, 'MONITOR_CACHE_INTERVALO_VERIFICACAO', 5)
+        self._local = 0
+        self._remota = None
+        self._verificado_em = 0.0
+        self._cliente = None
+        self._lock = threading.Lock()
+
+    def _redis(self):
+        if self._cliente is None:
+            try:
+                import redis
+                url = getattr(settings, 'MONITOR_REDIS_URL', None) or settings.CELERY_BROKER_URL
+                self._cliente = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+            except Exception as e:
+                logger.warning(f"Redis indisponível para a versão '{self.chave}': {e}. Usando versão local.")
+                self._cliente = None
+        return self._cliente
+
+    def atual(self) -> Tuple[int, Optional[int]]:
+        """
+        Retorna a versão conhecida como tupla (local, remota).
+        """
+        agora = time.monotonic()
+        if agora - self._verificado_em >= self.intervalo:
+            self._verificado_em = agora
+            cliente = self._redis()
+            if cliente is not None:
+                try:
+                    valor = cliente.get(self.chave)
+                    self._remota = int(valor) if valor is not None else 0
+                except Exception as e:
+                    logger.debug(f"Falha ao ler a versão '{self.chave}' no Redis: {e}")
+        return (self._local, self._remota)
+
+    def incrementar(self) -> None:
+        """
+        Invalida a versão atual neste processo e, se possível, em todos os workers.
+        """
+        with self._lock:
+            self._local += 1
+        cliente = self._redis()
+        if cliente is not None:
+            try:
+                self._remota = int(cliente.incr(self.chave))
+                self._verificado_em = time.monotonic()
+            except Exception as e:
+                logger.warning(f"Falha ao incrementar a versão '{self.chave}' no Redis: {e}")
+
+
+# --- Cache de termos monitorados ---
+
+@dataclass(frozen=True)
+class TermoCache:
+    id: int
+    termo: str
+    tipo: str
+    prioridade: int
+    variacoes: Tuple[str, ...] = ()
+
+    @property
+    def formas(self) -> Tuple[str, ...]:
+        """Termo principal seguido das variações cadastradas."""
+        return (self.termo,) + self.variacoes
+
+
+@dataclass
+class TermosAtivos:
+    """
+    Fotografia imutável dos termos ativos, com as visões usadas pelos processadores.
+    """
+    versao: tuple
+    termos: Tuple[TermoCache, ...]
+    carregado_em: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self):
+        self.termos_busca = frozenset(t.termo.lower() for t in self.termos)
+        self.termos_texto = [t.termo for t in self.termos if t.tipo == 'TEXTO']
+        self.formas_texto = [forma for t in self.termos if t.tipo == 'TEXTO' for forma in t.formas]
+
+    def por_tipo(self, tipo: str) -> List[TermoCache]:
+        return [t for t in self.termos if t.tipo == tipo]
+
+
+_versao_termos = VersaoCompartilhada('monitor:termos:versao')
+_termos_lock = threading.Lock()
+_termos_cache: Optional[TermosAtivos] = None
+
+
+def _carregar_termos(versao: tuple) -> TermosAtivos:
+    from monitor.models import TermoMonitorado
+    linhas = TermoMonitorado.objects.filter(ativo=True).values_list('id', 'termo', 'tipo', 'prioridade', 'variacoes')
+    termos = []
+    for id_, termo, tipo, prioridade, variacoes in linhas:
+        lista_variacoes = tuple(v.strip() for v in (variacoes or '').split(',') if v.strip())
+        termos.append(TermoCache(id_, termo, tipo, prioridade, lista_variacoes))
+    logger.info(f"Cache de termos monitorados carregado: {len(termos)} termos ativos (versão {versao}).")
+    return TermosAtivos(versao=versao, termos=tuple(termos))
+
+
+def obter_termos_ativos() -> TermosAtivos:
+    """
+    Retorna os termos ativos do cache do worker, recarregando do banco só quando
+    a versão muda (signals/Redis) ou o TTL `MONITOR_CACHE_TTL` expira.
+    """
+    global _termos_cache
+    versao = _versao_termos.atual()
+    cache = _termos_cache
+    ttl = getattr(settings, 'MONITOR_CACHE_TTL', 300)
+    if cache is not None and cache.versao == versao and time.monotonic() - cache.carregado_em < ttl:
+        return cache
+    with _termos_lock:
+        cache = _termos_cache
+        if cache is None or cache.versao != versao or time.monotonic() - cache.carregado_em >= ttl:
+            cache = _carregar_termos(versao)
+            _termos_cache = cache
+    return cache
+
+
+def invalidar_termos() -> None:
+    """
+    Chamado pelos signals de TermoMonitorado para forçar a recarga em todos os workers.
+    """
+    _versao_termos.incrementar()
@@ -0,0 +1,294 @@
+# monitor/utils/catalogo_sefaz.py
+"""
+Espelho local do catálogo do portal da legislação da SEFAZ-PI.
+
+sincronizar_catalogo() percorre as páginas do índice de busca do portal
+(endpoint query-meta, só HTTP, sem Selenium) e grava tipo, número, ano,
+situação, ementa e links em CatalogoNormaSefaz com upsert em lote.
+
+- incremental (padrão): novidade é uma norma fora do espelho ou publicada a partir
+  da última data de publicação espelhada menos MONITOR_CATALOGO_SEFAZ_MARGEM_DIAS.
+  Para depois de MONITOR_CATALOGO_SEFAZ_PAGINAS_SEM_NOVIDADE páginas seguidas sem
+  novidade, ou na primeira página inteira anterior a essa data quando
+  MONITOR_CATALOGO_SEFAZ_ORDENADO_POR_DATA diz que a MONITOR_CATALOGO_SEFAZ_URL_PAGINA
+  ordena das mais recentes para as antigas (o índice padrão não garante ordem);
+- completo: percorre todo o índice (agendado semanalmente), o que atualiza a
+  situação de normas antigas.
+
+Na incremental, normas publicadas desde a última sincronização que alteram/revogam
+outras (ementa) tiram as alvo do espelho (situação A_VERIFICAR) até a próxima sincronização completa, para
+que a consulta caia no portal.
+
+consultar_catalogo() é a busca indexada usada por SEFAZScraper.check_norm_status
+antes do portal ao vivo.
+"""
+import logging
+import re
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote_plus, urljoin
+
+import requests
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from .extrator_normas import PADRAO_NORMA, extrair_ano, mapa_tipos_norma, padronizar_numero
+from .grafo_normas import relacoes_do_texto
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://portaldalegislacao.sefaz.pi.gov.br"
+URL_PAGINA_PADRAO = (
+    "{base}/vivisimo/cgi-bin/query-meta?v%3Aproject=Legislacao&query={consulta}"
+    "&v%3Astate=root%7Croot-{inicio}-{tamanho}%7C0%7C&render.list-show={tamanho}"
+)
+CAMPOS_ATUALIZADOS = [
+    'titulo', 'situacao', 'situacao_normalizada', 'ementa', 'data_publicacao',
+    'url', 'link_publicacao', 'alteracoes', 'data_sincronizacao',
+]
+_MESES = {
+    'janeiro': 1, 'fevereiro': 2, 'marco': 3, 'março': 3, 'abril': 4, 'maio': 5, 'junho': 6,
+    'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12,
+}
+_DATA_NUMERICA = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+_DATA_EXTENSO = re.compile(r'(\d{1,2})º?\s+de\s+([a-zç]+)\s+de\s+(\d{4})', re.IGNORECASE)
+_ANO_SOLTO = re.compile(r'\b(19\d{2}|20\d{2})\b')
+_ANOS_NO_FIM = re.compile(r'(/\d{4})+$')
+
+
+def _data(texto: str) -> Optional[date]:
+    texto = texto or ''
+    try:
+        match = _DATA_NUMERICA.search(texto)
+        if match:
+            return date(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+        match = _DATA_EXTENSO.search(texto)
+        if match and match.group(2).lower() in _MESES:
+            return date(int(match.group(3)), _MESES[match.group(2).lower()], int(match.group(1)))
+    except ValueError:
+        pass
+    return None
+
+
+def normalizar_situacao(texto: str) -> str:
+    """Mesmo critério de check_norm_status: 'vigente' sem revogação = VIGENTE."""
+    texto = (texto or '').lower()
+    if any(t in texto for t in ('revogad', 'cancelad', 'extint')):
+        return 'REVOGADA'
+    if 'vigente' in texto:
+        return 'VIGENTE'
+    if 'alterad' in texto:
+        return 'ALTERADA'
+    return 'DESCONHECIDA'
+
+
+def identificar_norma(titulo: str, data_publicacao: Optional[date] = None) -> Optional[Tuple[str, str, int]]:
+    """
+    (tipo, número/ano, ano) a partir do título do resultado, no formato de
+    NormaVigente ('Decreto nº 21.866, de 15 de março de 2023' -> ('DECRETO', '21.866/2023', 2023)).
+    """
+    match = PADRAO_NORMA.search(titulo or '')
+    if not match:
+        return None
+    tipo = mapa_tipos_norma().get(match.group(1).strip().lower(), 'OUTROS')
+    numero = padronizar_numero(match.group(2).strip())
+    if not numero:
+        return None
+    ano = extrair_ano(numero)
+    if ano is None or len(str(ano)) != 4:
+        data = _data(titulo[match.end():]) or data_publicacao
+        ano_solto = _ANO_SOLTO.search(titulo[match.end():])
+        ano = data.year if data else (int(ano_solto.group(1)) if ano_solto else None)
+        if ano is None:
+            return None
+        numero = f"{numero}/{ano}"
+    elif not numero.endswith(f"/{ano}"):
+        numero = f"{_ANOS_NO_FIM.sub('', numero)}/{ano}"
+    return tipo, numero, ano
+
+
+def _campo(bloco, classe: str) -> str:
+    campo = bloco.select_one(f"div.{classe}")
+    if campo is None:
+        return ''
+    valor = campo.select_one('span.value') or campo.select_one('.value')
+    if valor is not None:
+        return valor.get_text(' ', strip=True)
+    texto = campo.get_text(' ', strip=True)
+    for rotulo in campo.find_all('strong'):
+        texto = texto.replace(rotulo.get_text(' ', strip=True), '', 1)
+    return texto.strip(' :')
+
+
+def _link(bloco, classe: str) -> str:
+    campo = bloco.select_one(f"div.{classe} a[href]")
+    return urljoin(BASE_URL, campo['href']) if campo else ''
+
+
+def extrair_resultados(html: str) -> List[dict]:
+    """Registros de uma página de resultados do query-meta."""
+    soup = BeautifulSoup(html, 'html.parser')
+    registros = []
+    for corpo in soup.select('div.document-body'):
+        documento = corpo.find_parent('li') or corpo.parent
+        titulo_link = documento.select_one('a.title') if documento else None
+        titulo = titulo_link.get_text(' ', strip=True) if titulo_link else _campo(corpo, 'field-apelido')
+        data_publicacao = _data(_campo(corpo, 'field-data_publicacao'))
+        norma = identificar_norma(titulo, data_publicacao)
+        if norma is None:
+            logger.debug(f"Resultado do catálogo sem tipo/número/ano reconhecível: '{titulo[:80]}'")
+            continue
+        tipo, numero, ano = norma
+        situacao = _campo(corpo, 'field-situacao')
+        registros.append({
+            'tipo': tipo,
+            'numero': numero,
+            'ano': ano,
+            'titulo': titulo[:500],
+            'situacao': situacao[:255],
+            'situacao_normalizada': normalizar_situacao(situacao),
+            'ementa': _campo(corpo, 'field-ementa'),
+            'data_publicacao': data_publicacao,
+            'url': urljoin(BASE_URL, titulo_link['href'])[:500] if titulo_link and titulo_link.get('href') else '',
+            'link_publicacao': _link(corpo, 'field-link_fonte')[:500],
+            'alteracoes': [
+                {'texto': a.get_text(' ', strip=True), 'url': urljoin(BASE_URL, a['href'])}
+                for a in corpo.select('div.field-alt a[href]')
+            ],
+        })
+    return registros
+
+
+def paginas_catalogo(consulta: str = '*', tamanho: Optional[int] = None, paginas_max: Optional[int] = None,
+                     sessao: Optional[requests.Session] = None) -> Iterator[List[dict]]:
+    """Gera os registros página a página; para na primeira página sem resultados."""
+    tamanho = tamanho or getattr(settings, 'MONITOR_CATALOGO_SEFAZ_TAMANHO_PAGINA', 100)
+    paginas_max = paginas_max or getattr(settings, 'MONITOR_CATALOGO_SEFAZ_PAGINAS_MAX', 500)
+    intervalo = getattr(settings, 'MONITOR_CATALOGO_SEFAZ_INTERVALO_SEGUNDOS', 1.0)
+    modelo_url = getattr(settings, 'MONITOR_CATALOGO_SEFAZ_URL_PAGINA', URL_PAGINA_PADRAO)
+    if sessao is None:
+        sessao = requests.Session()
+        sessao.headers['User-Agent'] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    for pagina in range(paginas_max):
+        url = modelo_url.format(base=BASE_URL, consulta=quote_plus(consulta), inicio=pagina * tamanho, tamanho=tamanho)
+        resposta = sessao.get(url, timeout=30)
+        resposta.raise_for_status()
+        if 'document-body' not in resposta.text:
+            return  # fim do índice
+        registros = extrair_resultados(resposta.text)
+        yield registros
+        if intervalo:
+            time.sleep(intervalo)
+
+
+def _gravar(registros: List[dict]) -> int:
+    from monitor.models import CatalogoNormaSefaz
+    unicos = {(r['tipo'], r['numero'], r['ano']): r for r in registros}
+    agora = timezone.now()
+    objetos = [CatalogoNormaSefaz(data_sincronizacao=agora, **r) for r in unicos.values()]
+    opcoes = {'update_conflicts': True, 'update_fields': CAMPOS_ATUALIZADOS}
+    if connection.features.supports_update_conflicts_with_target:
+        opcoes['unique_fields'] = ['tipo', 'numero', 'ano']  # MySQL usa a chave única sozinho
+    CatalogoNormaSefaz.objects.bulk_create(objetos, **opcoes)
+    return len(objetos)
+
+
+def _invalidar_alvos(registros: List[dict]) -> int:
+    """Normas alteradas/revogadas pelas novas saem do espelho até a próxima sincronização completa."""
+    from monitor.models import CatalogoNormaSefaz
+    alvos = set()
+    for registro in registros:
+        norma = (registro['tipo'], registro['numero'])
+        for origem, _, destino in relacoes_do_texto(norma, registro['ementa']):
+            if origem == norma:
+                alvos.add(destino)
+    if not alvos:
+        return 0
+    invalidadas = 0
+    for tipo, numero in alvos:
+        invalidadas += CatalogoNormaSefaz.objects.filter(tipo=tipo, numero=numero).exclude(
+            situacao_normalizada='A_VERIFICAR').update(situacao_normalizada='A_VERIFICAR')
+    return invalidadas
+
+
+def _fora_do_espelho(registros: List[dict]) -> int:
+    """Quantos registros da página ainda não estão no espelho (consultar antes de _gravar)."""
+    from monitor.models import CatalogoNormaSefaz
+    chaves = {(r['tipo'], r['numero'], r['ano']) for r in registros}
+    if not chaves:
+        return 0
+    existentes = set(CatalogoNormaSefaz.objects.filter(
+        tipo__in={c[0] for c in chaves}, numero__in={c[1] for c in chaves}
+    ).values_list('tipo', 'numero', 'ano'))
+    return len(chaves - existentes)
+
+
+def sincronizar_catalogo(completo: bool = False, consulta: str = '*') -> Dict[str, int]:
+    """Sincroniza o espelho local com o índice do portal."""
+    from monitor.models import CatalogoNormaSefaz
+    limite = None
+    if not completo:
+        ultima = CatalogoNormaSefaz.objects.aggregate(ultima=Max('data_publicacao'))['ultima']
+        if ultima:
+            limite = ultima - timedelta(days=getattr(settings, 'MONITOR_CATALOGO_SEFAZ_MARGEM_DIAS', 7))
+    ordenado = getattr(settings, 'MONITOR_CATALOGO_SEFAZ_ORDENADO_POR_DATA', False)
+    paginas_sem_novidade_max = getattr(settings, 'MONITOR_CATALOGO_SEFAZ_PAGINAS_SEM_NOVIDADE', 10)
+    resultado = {'paginas': 0, 'registros': 0, 'novos': 0, 'invalidadas': 0}
+    sem_novidade = 0
+    for registros in paginas_catalogo(consulta):
+        resultado['paginas'] += 1
+        if limite is None:
+            # Sincronização completa ou espelho vazio: grava tudo, sem invalidar alvos
+            resultado['registros'] += _gravar(registros)
+            continue
+        novos = _fora_do_espelho(registros)
+        recentes = [r for r in registros if r['data_publicacao'] and r['data_publicacao'] >= limite]
+        resultado['registros'] += _gravar(registros)
+        resultado['novos'] += novos
+        # Só as publicadas desde a última sincronização: as antigas já tiveram os alvos invalidados
+        resultado['invalidadas'] += _invalidar_alvos(recentes)
+        sem_novidade = 0 if novos or recentes else sem_novidade + 1
+        if ordenado and registros and all(r['data_publicacao'] and r['data_publicacao'] < limite for r in registros):
+            break
+        if sem_novidade >= paginas_sem_novidade_max:
+            break
+    logger.info(f"Catálogo SEFAZ sincronizado ({'completo' if completo else 'incremental'}): {resultado}")
+    return resultado
+
+
+def consultar_catalogo(norm_type: str, norm_number: str) -> Optional[dict]:
+    """
+    Detalhes da norma no espelho local no formato de SEFAZScraper.get_norm_details,
+    ou None (não espelhada, invalidada ou mais antiga que MONITOR_CATALOGO_SEFAZ_VALIDADE_DIAS).
+    """
+    from monitor.models import CatalogoNormaSefaz
+    if not getattr(settings, 'MONITOR_CATALOGO_SEFAZ_ATIVO', True):
+        return None
+    tipo = mapa_tipos_norma().get((norm_type or '').lower().strip(), 'OUTROS')
+    numero = padronizar_numero(norm_number or '')
+    if not numero:
+        return None
+    validade = timezone.now() - timedelta(days=getattr(settings, 'MONITOR_CATALOGO_SEFAZ_VALIDADE_DIAS', 30))
+    registros = CatalogoNormaSefaz.objects.filter(tipo=tipo, data_sincronizacao__gte=validade).exclude(situacao_normalizada='A_VERIFICAR')
+    ano = extrair_ano(numero)
+    if ano and len(str(ano)) == 4:
+        registro = registros.filter(numero=numero).first() or registros.filter(
+            numero=f"{_ANOS_NO_FIM.sub('', numero)}/{ano}").first()
+    else:
+        registro = registros.filter(numero__startswith=f"{numero}/").order_by('-ano').first()
+    if registro is None:
+        return None
+    return {
+        'norma': f"{norm_type} {norm_number}",
+        'situacao': registro.situacao,
+        'ementa': registro.ementa,
+        'data_publicacao': registro.data_publicacao.strftime('%d/%m/%Y') if registro.data_publicacao else '',
+        'link_publicacao': {'texto': '', 'url': registro.link_publicacao},
+        'altera': registro.alteracoes or [],
+        'url': registro.url,
+        'origem': 'CATALOGO',
+    }
@@ -0,0 +1,90 @@
+# monitor/utils/checkpoints.py
+"""
+Checkpoints da coleta (CheckpointExecucao): a última etapa concluída por cada URL
+numa execução (LogExecucao).
+
+    DESCOBERTO -> BAIXADO -> EXTRAIDO -> GRAVADO -> PROCESSADO   (ou DESCARTADO)
+
+Cada etapa só grava o checkpoint depois de concluir; uma etapa que falha deixa a
+URL na etapa anterior. Ao retomar a execução (coletar_e_processar_tudo com
+retomar_log_id), `pendentes` diz de onde cada URL continua. Se o arquivo da etapa
+concluída sumiu do default_storage, a URL volta uma etapa.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ETAPAS_FINAIS = ('PROCESSADO', 'DESCARTADO')
+
+
+def registrar_descobertos(log_id: int, itens: Iterable[dict]) -> int:
+    """Cria os checkpoints DESCOBERTO; URLs já registradas mantêm a etapa em que estão."""
+    from monitor.models import CheckpointExecucao
+    checkpoints = {
+        item['url_original']: CheckpointExecucao(log_id=log_id, url=item['url_original'], fonte=item.get('fonte', ''), dados=item)
+        for item in itens
+    }
+    CheckpointExecucao.objects.bulk_create(checkpoints.values(), ignore_conflicts=True)
+    return len(checkpoints)
+
+
+def avancar(log_id: int, item: dict, etapa: str, documento_id: Optional[int] = None) -> None:
+    """Registra que a URL concluiu `etapa`, guardando o item (caminhos dos arquivos) para a retomada."""
+    from monitor.models import CheckpointExecucao
+    dados = {k: v for k, v in item.items() if k not in ('conteudo', 'texto')}
+    campos = {'etapa': etapa, 'fonte': item.get('fonte', ''), 'dados': dados}
+    if documento_id is not None:
+        campos['documento_id'] = documento_id
+    CheckpointExecucao.objects.update_or_create(log_id=log_id, url=item['url_original'], defaults=campos)
+
+
+def marcar_processados(log_id: int, documentos_ids: Iterable[int]) -> int:
+    from monitor.models import CheckpointExecucao
+    return CheckpointExecucao.objects.filter(log_id=log_id, documento_id__in=list(documentos_ids)).update(etapa='PROCESSADO')
+
+
+def urls_concluidas(log_id: int, etapas: Iterable[str] = ETAPAS_FINAIS) -> set:
+    from monitor.models import CheckpointExecucao
+    return set(CheckpointExecucao.objects.filter(log_id=log_id, etapa__in=list(etapas)).values_list('url', flat=True))
+
+
+def _existe(nome: Optional[str]) -> bool:
+    from django.core.files.storage import default_storage
+    return bool(nome) and default_storage.exists(nome)
+
+
+def _etapa_retomavel(etapa: str, dados: dict) -> str:
+    # Arquivo removido do storage (limpeza, volume trocado): refaz a etapa anterior
+    if etapa == 'EXTRAIDO' and not _existe(dados.get('arquivo_txt')):
+        etapa = 'BAIXADO'
+    if etapa == 'BAIXADO' and not _existe(dados.get('arquivo_pdf')):
+        etapa = 'DESCOBERTO'
+    return etapa
+
+
+def pendentes(log_id: int) -> Dict[str, List]:
+    """
+    O que falta na execução, por etapa a executar:
+    {'baixar': [item], 'extrair': [item], 'gravar': [item], 'analisar': [documento_id], 'concluidos': n}.
+    """
+    from monitor.models import CheckpointExecucao
+    resultado: Dict[str, List] = {'baixar': [], 'extrair': [], 'gravar': [], 'analisar': []}
+    concluidos = 0
+    checkpoints = CheckpointExecucao.objects.filter(log_id=log_id).values_list('etapa', 'dados', 'documento_id')
+    for etapa, dados, documento_id in checkpoints.iterator(chunk_size=2000):
+        dados = dados or {}
+        if etapa in ETAPAS_FINAIS:
+            concluidos += 1
+        elif etapa == 'GRAVADO' and documento_id:
+            resultado['analisar'].append(documento_id)
+        elif etapa == 'GRAVADO':
+            # Documento apagado depois da gravação: grava de novo a partir do texto
+            resultado['gravar' if _existe(dados.get('arquivo_txt')) else 'baixar'].append(dados)
+        else:
+            proxima = {'DESCOBERTO': 'baixar', 'BAIXADO': 'extrair', 'EXTRAIDO': 'gravar'}[_etapa_retomavel(etapa, dados)]
+            resultado[proxima].append(dados)
+    resumo = {etapa: len(itens) for etapa, itens in resultado.items()}
+    logger.info(f"Retomada da execução {log_id}: {concluidos} concluído(s), pendentes por etapa: {resumo}.")
+    resultado['concluidos'] = concluidos
+    return resultado
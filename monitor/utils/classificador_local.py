@@ -0,0 +1,138 @@
+# monitor/utils/classificador_local.py
+"""
+Classificador zero-shot local (HuggingFace Transformers) residente no worker.
+
+O pipeline é carregado uma única vez por processo, na primeira chamada (nunca
+no import, para não pesar em processos que não o usam nem ser herdado por fork).
+Os parágrafos são classificados em lotes ordenados por tamanho, de modo que o
+padding de cada lote fique próximo do tamanho real dos textos.
+
+Backends (MONITOR_CLASSIFICADOR_BACKEND):
+    - 'torch': modelo original em float32;
+    - 'int8':  quantização dinâmica int8 das camadas Linear (torch, só CPU);
+    - 'onnx':  exportado para ONNX Runtime (requer optimum[onnxruntime]); a
+               exportação é feita uma vez e reaproveitada de MONITOR_CLASSIFICADOR_ONNX_DIR.
+"""
+import logging
+import os
+import threading
+from typing import List, Optional, Sequence
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MODELO_PADRAO = "pierreguillou/bert-base-cased-pt-br"
+BACKENDS = ('torch', 'int8', 'onnx')
+ROTULOS = ["relevante", "irrelevante"]
+HIPOTESE = "Este parágrafo é {} para contabilidade/fiscal."
+MAX_CARACTERES_PARAGRAFO = 2000  # o tokenizer trunca em 512 tokens de qualquer forma
+
+_classificador = None
+_lock = threading.Lock()
+
+
+def _configurar_threads():
+    threads = getattr(settings, 'MONITOR_TORCH_THREADS', None)
+    if not threads:
+        return
+    try:
+        import torch
+        torch.set_num_threads(int(threads))
+        logger.info(f"torch configurado com {threads} threads.")
+    except Exception as e:
+        logger.warning(f"Não foi possível configurar as threads do torch: {e}")
+
+
+def _carregar_onnx(modelo: str):
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    import onnxruntime
+    opcoes = onnxruntime.SessionOptions()
+    threads = getattr(settings, 'MONITOR_TORCH_THREADS', None)
+    if threads:
+        opcoes.intra_op_num_threads = int(threads)
+    diretorio = os.path.join(getattr(settings, 'MONITOR_CLASSIFICADOR_ONNX_DIR', os.path.join('modelos', 'onnx')), modelo.replace('/', '__'))
+    if os.path.isdir(diretorio):
+        return ORTModelForSequenceClassification.from_pretrained(diretorio, session_options=opcoes)
+    logger.info(f"Exportando '{modelo}' para ONNX em {diretorio} (apenas na primeira vez)...")
+    onnx_model = ORTModelForSequenceClassification.from_pretrained(modelo, export=True, session_options=opcoes)
+    onnx_model.save_pretrained(diretorio)
+    return onnx_model
+
+
+def carregar_classificador(backend: Optional[str] = None, modelo: Optional[str] = None):
+    """
+    Cria um pipeline zero-shot novo (sem cache) para o backend informado.
+    Usado por obter_classificador e pelos benchmarks que comparam backends.
+    """
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+    backend = backend or getattr(settings, 'MONITOR_CLASSIFICADOR_BACKEND', 'torch')
+    modelo = modelo or getattr(settings, 'MONITOR_CLASSIFICADOR_MODELO', MODELO_PADRAO)
+    if backend not in BACKENDS:
+        logger.warning(f"Backend de classificador '{backend}' desconhecido. Usando 'torch'.")
+        backend = 'torch'
+    _configurar_threads()
+    logger.info(f"Carregando modelo zero-shot '{modelo}' (backend {backend}) neste worker...")
+    tokenizer = AutoTokenizer.from_pretrained(modelo)
+    modelo_carregado = None
+    if backend == 'onnx':
+        try:
+            modelo_carregado = _carregar_onnx(modelo)
+        except ImportError:
+            logger.warning("optimum[onnxruntime] não instalado. Usando backend 'torch'.")
+            backend = 'torch'
+    if modelo_carregado is None:
+        modelo_carregado = AutoModelForSequenceClassification.from_pretrained(modelo)
+        if backend == 'int8':
+            import torch
+            modelo_carregado = torch.quantization.quantize_dynamic(modelo_carregado, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("zero-shot-classification", model=modelo_carregado, tokenizer=tokenizer, device=-1)
+
+
+def obter_classificador():
+    """
+    Retorna o pipeline zero-shot do processo, carregando-o na primeira chamada.
+    Levanta ImportError se transformers não estiver instalado.
+    """
+    global _classificador
+    if _classificador is not None:
+        return _classificador
+    with _lock:
+        if _classificador is None:
+            _classificador = carregar_classificador()
+    return _classificador
+
+
+def _lotes_por_tamanho(textos: Sequence[str], tamanho_lote: int) -> List[List[int]]:
+    ordem = sorted(range(len(textos)), key=lambda i: len(textos[i]))
+    return [ordem[i:i + tamanho_lote] for i in range(0, len(ordem), tamanho_lote)]
+
+
+def classificar_paragrafos(paragrafos: Sequence[str], tamanho_lote: Optional[int] = None,
+                           classificador=None) -> List[float]:
+    """
+    Retorna o score do rótulo "relevante" para cada parágrafo, na ordem de entrada.
+    Parágrafos de um lote que falhar recebem score 0.
+    """
+    if not paragrafos:
+        return []
+    classificador = classificador or obter_classificador()
+    tamanho_lote = tamanho_lote or getattr(settings, 'MONITOR_CLASSIFICADOR_LOTE', 16)
+    scores = [0.0] * len(paragrafos)
+    for lote in _lotes_por_tamanho(paragrafos, tamanho_lote):
+        textos = [paragrafos[i][:MAX_CARACTERES_PARAGRAFO] for i in lote]
+        try:
+            saidas = classificador(
+                textos,
+                candidate_labels=ROTULOS,
+                hypothesis_template=HIPOTESE,
+                batch_size=len(textos) * len(ROTULOS),
+            )
+        except Exception as e:
+            logger.warning(f"Erro ao classificar lote de {len(textos)} parágrafos: {e}")
+            continue
+        if isinstance(saidas, dict):
+            saidas = [saidas]
+        for indice, saida in zip(lote, saidas):
+            scores[indice] = saida['scores'][saida['labels'].index("relevante")]
+    return scores
@@ -0,0 +1,159 @@
+# monitor/utils/duplicatas.py
+"""
+Detecção de documentos quase duplicados (SimHash de 64 bits + LSH por bandas).
+
+O mesmo decreto chega pelo Diário Oficial, pelo portal de legislação e pelo
+scraper do ICMS com pequenas diferenças de texto. Cada documento recebe um
+SimHash sobre shingles de 3 palavras; a assinatura é dividida em 8 bandas de
+8 bits indexadas no banco. Pelo princípio da casa dos pombos, duas assinaturas
+a até 7 bits de distância compartilham ao menos uma banda, então uma consulta
+por bandas encontra todos os candidatos; a distância exata decide o resto.
+
+MONITOR_DUPLICATA_DISTANCIA_MAXIMA (bits de Hamming, padrão 6, ou seja,
+similaridade de ~90%) ajusta o limiar; acima de 7 a busca por bandas deixa de
+garantir que todos os pares dentro do limiar sejam encontrados.
+"""
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .busca_termos import normalizar_texto
+
+logger = logging.getLogger(__name__)
+
+BITS = 64
+BANDAS = 8
+BITS_POR_BANDA = BITS // BANDAS
+TAMANHO_SHINGLE = 3
+MAX_CARACTERES = 200000
+CAMPOS_REAPROVEITADOS = ['relevante_contabil', 'score_relevancia', 'resumo_ia', 'sentimento_ia', 'impacto_fiscal', 'assunto']
+_POTENCIAS = np.arange(BITS, dtype=np.uint64)
+
+
+def calcular_simhash(texto: str) -> int:
+    """SimHash (inteiro sem sinal de 64 bits) dos shingles de palavras do texto normalizado."""
+    palavras = normalizar_texto((texto or '')[:MAX_CARACTERES]).split()
+    if not palavras:
+        return 0
+    shingles: Dict[str, int] = {}
+    for i in range(max(len(palavras) - TAMANHO_SHINGLE + 1, 1)):
+        shingle = ' '.join(palavras[i:i + TAMANHO_SHINGLE])
+        shingles[shingle] = shingles.get(shingle, 0) + 1
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'big') for s in shingles),
+        dtype=np.uint64, count=len(shingles),
+    )
+    pesos = np.fromiter(shingles.values(), dtype=np.float64, count=len(shingles))
+    bits = ((hashes[:, None] >> _POTENCIAS) & np.uint64(1)).astype(np.float64)  # (shingles x 64)
+    votos = pesos @ (2 * bits - 1)
+    return sum(1 << i for i in np.flatnonzero(votos > 0).tolist())
+
+
+def distancia(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def bandas(simhash: int) -> List[int]:
+    mascara = (1 << BITS_POR_BANDA) - 1
+    return [(simhash >> (i * BITS_POR_BANDA)) & mascara for i in range(BANDAS)]
+
+
+def _com_sinal(valor: int) -> int:
+    """BigIntegerField é com sinal: guarda os 64 bits em complemento de dois."""
+    return valor - (1 << BITS) if valor >= 1 << (BITS - 1) else valor
+
+
+def _sem_sinal(valor: int) -> int:
+    return valor + (1 << BITS) if valor < 0 else valor
+
+
+def encontrar_canonico(simhash: int, excluir_id: Optional[int] = None,
+                       distancia_maxima: Optional[int] = None) -> Optional[Tuple[int, int]]:
+    """
+    Retorna (id do documento canônico, distância) do documento já processado mais
+    próximo dentro do limiar, ou None. Duplicatas apontam sempre para a raiz; as
+    duplicatas do próprio `excluir_id` são ignoradas (reprocessar um canônico não o
+    torna duplicata de si mesmo).
+    """
+    from monitor.models import AssinaturaDocumento
+    if not simhash:
+        return None
+    distancia_maxima = getattr(settings, 'MONITOR_DUPLICATA_DISTANCIA_MAXIMA', 6) if distancia_maxima is None else distancia_maxima
+    filtro_bandas = Q()
+    for i, valor in enumerate(bandas(simhash)):
+        filtro_bandas |= Q(**{f'banda_{i}': valor})
+    candidatos = (
+        AssinaturaDocumento.objects
+        .filter(filtro_bandas, documento__processado=True)
+        .exclude(documento_id=excluir_id)
+        .exclude(documento__sentimento_ia='ERRO_PROCESSAMENTO')
+        .values_list('documento_id', 'documento__documento_canonico_id', 'simhash')
+    )
+    melhor = None
+    for documento_id, canonico_id, assinatura in candidatos:
+        raiz = canonico_id or documento_id
+        if raiz == excluir_id:
+            continue
+        d = distancia(simhash, _sem_sinal(assinatura))
+        if d <= distancia_maxima and (melhor is None or d < melhor[1]):
+            melhor = (raiz, d)
+    return melhor
+
+
+def registrar_assinatura(documento, simhash: int) -> None:
+    from monitor.models import AssinaturaDocumento
+    valores = {f'banda_{i}': valor for i, valor in enumerate(bandas(simhash))}
+    AssinaturaDocumento.objects.update_or_create(
+        documento=documento, defaults={'simhash': _com_sinal(simhash), **valores}
+    )
+
+
+def reaproveitar_analise(documento, canonico_id: int, distancia_bits: int) -> Dict[str, any]:
+    """
+    Copia a análise do documento canônico (campos de IA, normas e ocorrências de
+    termos) para o documento duplicado e o vincula ao canônico.
+    """
+    from monitor.models import CitacaoNorma, Documento, OcorrenciaTermoDocumento
+    from .persistencia_normas import relacionar_normas
+    canonico = Documento.objects.get(pk=canonico_id)
+    for campo in CAMPOS_REAPROVEITADOS:
+        setattr(documento, campo, getattr(canonico, campo))
+    documento.documento_canonico = canonico
+    documento.score_classificador = canonico.score_classificador
+    documento.metadata = {
+        **(canonico.metadata or {}),
+        'duplicata_de': canonico.id,
+        'duplicata_distancia_bits': distancia_bits,
+    }
+    documento.processado = True
+    with transaction.atomic():
+        documento.save()
+        relacionar_normas({documento.pk: dict(CitacaoNorma.objects.filter(documento=canonico).values_list('norma_id', 'mencoes'))})
+        OcorrenciaTermoDocumento.objects.filter(documento=documento).delete()
+        OcorrenciaTermoDocumento.objects.bulk_create([
+            OcorrenciaTermoDocumento(
+                documento=documento,
+                termo_id=o.termo_id,
+                data_publicacao=documento.data_publicacao,
+                contagem=o.contagem,
+                posicoes=[],  # posições do canônico não valem para este texto
+            )
+            for o in OcorrenciaTermoDocumento.objects.filter(documento=canonico)
+        ])
+    logger.info(f"Documento ID {documento.id} é quase duplicata do ID {canonico.id} ({distancia_bits} bits). Análise reaproveitada.")
+    return {
+        'status': 'DUPLICATA',
+        'message': f'Análise reaproveitada do documento {canonico.id}.',
+        'documento_canonico': canonico.id,
+        'distancia_bits': distancia_bits,
+        'relevante_contabil': documento.relevante_contabil,
+        'score_relevancia': documento.score_relevancia,
+        'resumo_ia': documento.resumo_ia,
+        'sentimento_ia': documento.sentimento_ia,
+        'impacto_fiscal': documento.impacto_fiscal,
+    }
@@ -0,0 +1,91 @@
+# monitor/utils/estagio_classificacao.py
+"""
+Etapa de classificação local em lote, entre documentos.
+
+Em vez de classificar documento por documento (lotes pequenos), junta os
+parágrafos candidatos de vários documentos, roda o classificador residente em
+lotes grandes e devolve os scores para cada documento com um único bulk_update.
+"""
+import logging
+import re
+from typing import Dict, List, Sequence
+
+from django.conf import settings
+
+from monitor.models import Documento
+from .boilerplate import filtrar_boilerplate, obter_impressoes_boilerplate
+from .classificador_local import classificar_paragrafos
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_MINIMO_PARAGRAFO = 40
+MAX_PARAGRAFOS_POR_DOCUMENTO = 60
+PARAGRAFOS_NO_METADATA = 5
+
+
+def _paragrafos_candidatos(texto: str, limite_texto: int, boilerplate=None) -> List[str]:
+    paragrafos = [p.strip() for p in re.split(r'\n{2,}', (texto or '')[:limite_texto]) if p.strip()]
+    candidatos = [p for p in paragrafos if len(p) >= TAMANHO_MINIMO_PARAGRAFO]
+    if boilerplate:
+        candidatos = filtrar_boilerplate(candidatos, boilerplate)
+    return candidatos[:MAX_PARAGRAFOS_POR_DOCUMENTO]
+
+
+def classificar_documentos(documentos: Sequence[Documento], limite_texto: int = 20000) -> Dict[str, int]:
+    """
+    Classifica os parágrafos de todos os documentos juntos e grava
+    score_classificador e metadata['classificacao_local'] de cada um.
+    """
+    paragrafos: List[str] = []
+    faixas = []  # (documento, inicio, fim) dentro de `paragrafos`
+    boilerplate = obter_impressoes_boilerplate() if getattr(settings, 'MONITOR_BOILERPLATE_ATIVO', True) else None
+    for documento in documentos:
+        candidatos = _paragrafos_candidatos(documento.texto_completo, limite_texto, boilerplate)
+        faixas.append((documento, len(paragrafos), len(paragrafos) + len(candidatos)))
+        paragrafos.extend(candidatos)
+
+    tamanho_lote = getattr(settings, 'MONITOR_CLASSIFICACAO_LOTE_GLOBAL', 64)
+    logger.info(f"Classificando {len(paragrafos)} parágrafos de {len(faixas)} documentos em lotes de {tamanho_lote}.")
+    scores = classificar_paragrafos(paragrafos, tamanho_lote=tamanho_lote) if paragrafos else []
+
+    modelo = getattr(settings, 'MONITOR_CLASSIFICADOR_MODELO', None)
+    for documento, inicio, fim in faixas:
+        pares = sorted(zip(scores[inicio:fim], paragrafos[inicio:fim]), key=lambda x: x[0], reverse=True)
+        documento.score_classificador = round(pares[0][0], 4) if pares else 0.0
+        metadata = dict(documento.metadata or {})
+        metadata['classificacao_local'] = {
+            'modelo': modelo,
+            'paragrafos_classificados': fim - inicio,
+            'paragrafos_relevantes': [
+                {'score': round(score, 4), 'trecho': paragrafo[:500]}
+                for score, paragrafo in pares[:PARAGRAFOS_NO_METADATA]
+            ],
+        }
+        documento.metadata = metadata
+
+    Documento.objects.bulk_update([d for d, _, _ in faixas], ['score_classificador', 'metadata'])
+    return {'documentos': len(faixas), 'paragrafos': len(paragrafos)}
+
+
+def classificar_pendentes(documentos_por_etapa: int = None, limite: int = None) -> Dict[str, int]:
+    """
+    Percorre o backlog de documentos relevantes ainda não classificados, do maior
+    para o menor score_relevancia, em etapas de `documentos_por_etapa`.
+    """
+    documentos_por_etapa = documentos_por_etapa or getattr(settings, 'MONITOR_CLASSIFICACAO_DOCUMENTOS_POR_ETAPA', 200)
+    totais = {'documentos': 0, 'paragrafos': 0}
+    while limite is None or totais['documentos'] < limite:
+        tamanho = documentos_por_etapa if limite is None else min(documentos_por_etapa, limite - totais['documentos'])
+        etapa = list(
+            Documento.objects
+            .filter(processado=True, relevante_contabil=True, score_classificador__isnull=True)
+            .order_by('-score_relevancia', '-data_publicacao')
+            .only('id', 'texto_completo', 'metadata')[:tamanho]
+        )
+        if not etapa:
+            break
+        parcial = classificar_documentos(etapa)
+        totais['documentos'] += parcial['documentos']
+        totais['paragrafos'] += parcial['paragrafos']
+    logger.info(f"Classificação em lote concluída: {totais}")
+    return totais
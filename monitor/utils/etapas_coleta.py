@@ -0,0 +1,330 @@
+# monitor/utils/etapas_coleta.py
+"""
+Etapas da coleta. Dois modos de execução (monitor/tasks.py):
+
+1. Tarefas separadas, roteadas para as filas de I/O e de CPU:
+
+    descobrir (I/O) -> baixar (I/O) -> extrair (CPU) -> gravar (I/O) -> analisar (CPU)
+
+Cada etapa recebe e devolve dicts serializáveis em JSON. PDF e texto vão para o
+default_storage (coleta/pdfs_diario_oficial/, coleta/pdfs_sefaz/) e só o nome passa pelo
+broker: as filas podem rodar em máquinas diferentes desde que compartilhem o storage
+(MEDIA_ROOT num volume compartilhado, ou um backend remoto). Uma etapa que
+descarta o documento devolve None e as seguintes repassam o None.
+A análise (PDFProcessor.process_document) grava os próprios resultados, por isso o
+Documento é criado antes dela.
+
+2. Em fluxo, num único processo (fluxo_coleta/coletar_em_fluxo): uma thread por fonte
+   percorre o gerador do scraper (descobre, baixa, extrai e filtra um PDF por vez) e
+   entrega cada documento numa fila limitada a MONITOR_COLETA_FLUXO_FILA itens; o
+   consumidor grava e analisa o documento assim que ele chega. A memória fica limitada
+   pelo tamanho da fila, o primeiro documento é analisado sem esperar as demais fontes e
+   nada passa por coleta/ (o PDF vai direto para o storage do Documento).
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FONTES = ('diario_oficial', 'sefaz', 'sefaz_icms')
+PASTAS = {'diario_oficial': 'coleta/pdfs_diario_oficial', 'sefaz': 'coleta/pdfs_sefaz', 'sefaz_icms': 'coleta/pdfs_sefaz'}
+# Valores que PDFProcessor.process_document reconhece: fonte_documento 'sefaz' e
+# tipo_documento 'SEFAZ_ICMS' vão para processar_sefaz_icms
+NOMES_FONTES = {
+    'diario_oficial': 'Diário Oficial do Estado do Piauí',
+    'sefaz': 'SEFAZ',
+    'sefaz_icms': 'SEFAZ',
+}
+TIPOS_DOCUMENTO = {'diario_oficial': 'DIARIO_OFICIAL', 'sefaz': None, 'sefaz_icms': 'SEFAZ_ICMS'}
+
+
+def _hoje_por_extenso(hoje: date) -> str:
+    # Mesmo formato usado pelos scrapers para conferir a data de publicação no texto
+    return hoje.strftime('%d de %B de %Y').lower()
+
+
+def descobrir(fonte: str, data: Optional[date] = None) -> List[dict]:
+    """
+    URLs dos PDFs publicados na fonte em `data` (padrão: hoje), com os metadados que a
+    listagem oferece.
+    """
+    from .scraper_geral import DiarioOficialScraper, SEFAZICMSScraper, SEFAZScraper
+    hoje = data or datetime.now().date()
+    if fonte == 'diario_oficial':
+        scraper = DiarioOficialScraper()
+        try:
+            urls = scraper._extrair_links_pdf(f"{scraper.BASE_URL}?data={hoje.strftime('%d-%m-%Y')}")
+        finally:
+            scraper._fechar_webdriver()
+        itens = [{'url_original': url, 'data_publicacao': str(hoje), 'filtrar': True} for url in urls]
+    elif fonte == 'sefaz':
+        itens = [{'url_original': url, 'data_publicacao': str(hoje), 'filtrar': True}
+                 for url in SEFAZScraper()._obter_lista_pdfs()]
+    elif fonte == 'sefaz_icms':
+        # Os cards já são filtrados pela data de publicação na própria página
+        itens = [{**encontrado, 'filtrar': False} for encontrado in SEFAZICMSScraper().descobrir_documentos(hoje)]
+    else:
+        raise ValueError(f"Fonte de coleta desconhecida: {fonte}")
+    for item in itens:
+        item['fonte'] = fonte
+    logger.info(f"{len(itens)} documento(s) descoberto(s) em {fonte}.")
+    return itens
+
+
+def _salvar_no_storage(nome: str, conteudo: bytes) -> str:
+    # Uma etapa repetida (retomada) substitui o arquivo em vez de criar outro com sufixo
+    if default_storage.exists(nome):
+        default_storage.delete(nome)
+    return default_storage.save(nome, ContentFile(conteudo))
+
+
+def baixar(item: Optional[dict]) -> Optional[dict]:
+    """
+    Baixa o PDF para a pasta da fonte no default_storage. Falha no download levanta exceção (e não None)
+    para a URL continuar em DESCOBERTO e ser baixada de novo na retomada.
+    """
+    from .scraper_geral import DiarioOficialScraper
+    if not item:
+        return None
+    conteudo = DiarioOficialScraper()._baixar_pdf(item['url_original'])
+    if not conteudo:
+        raise RuntimeError(f"Não foi possível baixar o PDF de {item['url_original']}.")
+    pasta = PASTAS.get(item.get('fonte'), PASTAS['diario_oficial'])
+    nome_pdf = f"{pasta}/{item['url_original'].split('/')[-1] or 'documento.pdf'}"
+    return {**item, 'arquivo_pdf': _salvar_no_storage(nome_pdf, conteudo)}
+
+
+def extrair(item: Optional[dict]) -> Optional[dict]:
+    """
+    Extrai o texto do PDF e aplica os filtros dos scrapers (data de publicação do item e
+    termos prioritários) quando item['filtrar']; None se o documento for descartado.
+    """
+    from .scraper_geral import DiarioOficialScraper
+    if not item:
+        return None
+    scraper = DiarioOficialScraper()
+    with default_storage.open(item['arquivo_pdf'], 'rb') as f:
+        texto = scraper._extrair_texto_de_pdf(f.read())
+    if not texto:
+        logger.warning(f"Não foi possível extrair texto de {item['url_original']}.")
+        return None
+    if item.get('filtrar'):
+        # Data da descoberta, não a de hoje: uma execução retomada no dia seguinte filtra igual
+        if _hoje_por_extenso(_data_publicacao(item.get('data_publicacao'))) not in texto.lower():
+            logger.info(f"PDF ignorado (data de publicação diferente de {item.get('data_publicacao')}): {item['url_original']}")
+            return None
+        if not scraper._contem_termos_prioritarios(texto):
+            logger.info(f"PDF ignorado (sem termos monitorados): {item['url_original']}")
+            return None
+    nome_txt = os.path.splitext(item['arquivo_pdf'])[0] + '.txt'
+    return {**item, 'arquivo_txt': _salvar_no_storage(nome_txt, texto.encode('utf-8'))}
+
+
+def _data_publicacao(valor) -> date:
+    try:
+        return date.fromisoformat(str(valor)[:10])
+    except (TypeError, ValueError):
+        pass
+    # Ex.: "19 de outubro de 2026" do portal ICMS; hoje só se nem assim for uma data
+    from .catalogo_sefaz import _data
+    return _data(str(valor or '')) or timezone.localdate()
+
+
+def _gravar_documento(item: dict, texto: str, conteudo: Optional[bytes] = None) -> Optional[int]:
+    """
+    Cria (ou completa) o Documento pela url_original e devolve o id a analisar;
+    None se o documento já foi processado em outra execução. Com `conteudo`, o PDF vai
+    para o storage do campo arquivo_pdf; sem ele, item['arquivo_pdf'] é o nome no default_storage.
+    """
+    from monitor.models import Documento
+    fonte = item.get('fonte')
+    nome_pdf = os.path.basename(item.get('arquivo_pdf') or item['url_original'].split('/')[-1]) or 'documento.pdf'
+    documento, criado = Documento.objects.get_or_create(
+        url_original=item['url_original'],
+        defaults={
+            'titulo': (item.get('titulo') or nome_pdf)[:255],
+            'data_publicacao': _data_publicacao(item.get('data_publicacao')),
+            'arquivo_pdf': None if conteudo is not None else item.get('arquivo_pdf'),
+            'resumo': item.get('resumo') or '',
+            'texto_completo': texto,
+            'tipo_documento': TIPOS_DOCUMENTO.get(fonte),
+            'fonte_documento': NOMES_FONTES.get(fonte),
+            'assunto': item.get('assunto') or 'Contábil/Fiscal',
+        },
+    )
+    if not criado:
+        if documento.processado:
+            return None
+        documento.texto_completo = texto
+        documento.save(update_fields=['texto_completo'])
+    if conteudo is not None and not documento.arquivo_pdf:
+        documento.arquivo_pdf.save(nome_pdf, ContentFile(conteudo), save=False)
+        documento.save(update_fields=['arquivo_pdf'])
+    return documento.id
+
+
+def gravar(item: Optional[dict]) -> Optional[int]:
+    """Etapa de gravação das tarefas separadas: lê o texto extraído do default_storage."""
+    if not item:
+        return None
+    with default_storage.open(item['arquivo_txt'], 'rb') as f:
+        texto = f.read().decode('utf-8')
+    return _gravar_documento(item, texto)
+
+
+# --- Coleta em fluxo (um processo, fila limitada) ---
+
+_FIM_DA_FONTE = object()
+
+
+def _iterar_sefaz_icms(ignorar=(), data: Optional[date] = None) -> Iterator[dict]:
+    from .scraper_geral import DiarioOficialScraper, SEFAZICMSScraper
+    baixador = DiarioOficialScraper()
+    for encontrado in SEFAZICMSScraper().iterar_descobertos(data):
+        if encontrado['url_original'] in ignorar:
+            continue
+        conteudo = baixador._baixar_pdf(encontrado['url_original'])
+        texto = baixador._extrair_texto_de_pdf(conteudo) if conteudo else None
+        if texto:
+            yield {**encontrado, 'conteudo': conteudo, 'texto': texto}
+
+
+def iterar_fonte(fonte: str, ignorar=(), data: Optional[date] = None) -> Iterator[dict]:
+    """
+    Documentos da fonte publicados em `data` (padrão: hoje), já baixados, extraídos e
+    filtrados, um por vez ('conteudo' e 'texto'). URLs em `ignorar` não são baixadas.
+    """
+    from .scraper_geral import DiarioOficialScraper, SEFAZScraper
+    if fonte == 'diario_oficial':
+        return DiarioOficialScraper().iterar_documentos(ignorar=ignorar, data=data)
+    if fonte == 'sefaz':
+        return SEFAZScraper().iterar_documentos(ignorar=ignorar, data=data)
+    if fonte == 'sefaz_icms':
+        return _iterar_sefaz_icms(ignorar=ignorar, data=data)
+    raise ValueError(f"Fonte de coleta desconhecida: {fonte}")
+
+
+def fluxo_coleta(fontes: Iterable[str] = FONTES, tamanho_fila: Optional[int] = None, ignorar=(),
+                 data: Optional[date] = None) -> Iterator[dict]:
+    """
+    Gera os documentos de todas as fontes na ordem em que ficam prontos. Cada fonte roda
+    numa thread produtora que bloqueia quando a fila está cheia; fechar o gerador encerra
+    as produtoras no próximo documento. Falhas de uma fonte chegam como {'fonte', 'erro'}.
+    """
+    fontes = list(fontes)
+    tamanho_fila = tamanho_fila or getattr(settings, 'MONITOR_COLETA_FLUXO_FILA', 4)
+    fila: queue.Queue = queue.Queue(maxsize=tamanho_fila)
+    parar = threading.Event()
+
+    def entregar(item) -> bool:
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produzir(fonte: str):
+        try:
+            for item in iterar_fonte(fonte, ignorar, data):
+                if not entregar({**item, 'fonte': fonte}):
+                    return
+        except Exception as e:
+            logger.error(f"Erro no scraper {fonte}: {e}", exc_info=True)
+            entregar({'fonte': fonte, 'erro': str(e)})
+        finally:
+            # Filtro de termos pode consultar o banco: cada thread fecha a própria conexão
+            connection.close()
+            entregar(_FIM_DA_FONTE)
+
+    produtoras = [threading.Thread(target=produzir, args=(fonte,), name=f"coleta-{fonte}", daemon=True) for fonte in fontes]
+    for produtora in produtoras:
+        produtora.start()
+    ativas = len(produtoras)
+    try:
+        while ativas:
+            item = fila.get()
+            if item is _FIM_DA_FONTE:
+                ativas -= 1
+                continue
+            yield item
+    finally:
+        parar.set()
+
+
+def coletar_em_fluxo(fontes: Iterable[str] = FONTES, processar: Optional[Callable[[int], dict]] = None,
+                     log_id: Optional[int] = None, retomar: bool = False, data: Optional[date] = None) -> Dict:
+    """
+    Consome fluxo_coleta gravando e analisando cada documento assim que chega.
+    `processar(documento_id)` devolve o resultado de PDFProcessor.process_document
+    (padrão: um PDFProcessor para toda a execução). Com `log_id`, cada documento gravado
+    e analisado vira checkpoint; com `retomar`, os documentos já gravados dessa execução
+    são analisados primeiro e as URLs já concluídas não são baixadas de novo. `data` é o
+    dia de publicação coletado (padrão: hoje; na retomada, o dia em que a execução começou).
+    """
+    from . import checkpoints
+    from .pdf_processor import BALDES, balde_do_status
+    if processar is None:
+        from monitor.models import Documento
+        from .pdf_processor import PDFProcessor
+        processor = PDFProcessor()
+        processar = lambda documento_id: processor.process_document(Documento.objects.get(pk=documento_id))
+    inicio = time.monotonic()
+    resultados: Dict = {'fontes': {}, 'erros': [], 'ja_processados': 0, 'primeiro_documento_segundos': None,
+                        'processamento_documentos': {balde: 0 for balde in BALDES}}
+    contagem = resultados['processamento_documentos']
+
+    def analisar(documento_id: int, url: str):
+        try:
+            status = processar(documento_id).get('status')
+        except Exception as e:
+            logger.error(f"Erro ao analisar {url}: {e}", exc_info=True)
+            status = 'ERRO'
+        else:
+            if log_id is not None:
+                checkpoints.marcar_processados(log_id, [documento_id])
+        if resultados['primeiro_documento_segundos'] is None:
+            resultados['primeiro_documento_segundos'] = round(time.monotonic() - inicio, 1)
+        contagem[balde_do_status(status)] += 1
+
+    ignorar = set()
+    if retomar and log_id is not None:
+        for documento_id in checkpoints.pendentes(log_id)['analisar']:
+            analisar(documento_id, f"documento {documento_id}")
+        ignorar = checkpoints.urls_concluidas(log_id, ('GRAVADO',) + checkpoints.ETAPAS_FINAIS)
+    for item in fluxo_coleta(fontes, ignorar=ignorar, data=data):
+        fonte = item['fonte']
+        if 'erro' in item:
+            resultados['erros'].append({'scraper': fonte, 'erro': item['erro']})
+            continue
+        resultados['fontes'][fonte] = resultados['fontes'].get(fonte, 0) + 1
+        try:
+            documento_id = _gravar_documento(item, item.pop('texto'), conteudo=item.pop('conteudo'))
+        except Exception as e:
+            logger.error(f"Erro ao gravar {item['url_original']}: {e}", exc_info=True)
+            contagem['falha'] += 1
+            continue
+        if log_id is not None:
+            if documento_id is None:
+                checkpoints.avancar(log_id, item, 'DESCARTADO')
+            else:
+                checkpoints.avancar(log_id, item, 'GRAVADO', documento_id=documento_id)
+        if documento_id is None:
+            resultados['ja_processados'] += 1
+            continue
+        analisar(documento_id, item['url_original'])
+    resultados['duracao_segundos'] = round(time.monotonic() - inicio, 1)
+    logger.info(f"Coleta em fluxo concluída: {resultados}")
+    return resultados
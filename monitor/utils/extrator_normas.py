@@ -0,0 +1,191 @@
+# monitor/utils/extrator_normas.py
+"""
+Extrator de citações de normas (tipo + número/ano) compilado no import.
+
+- PADRAO_NORMA é compilado uma vez por processo;
+- a canonização de números/citações é memoizada (lru_cache), pois as mesmas
+  normas se repetem em quase todas as edições;
+- os números específicos dos termos NORMA (variações) viram um único padrão,
+  recompilado só quando o cache de termos do worker muda de versão.
+"""
+import logging
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from .cache_worker import obter_termos_ativos
+
+logger = logging.getLogger(__name__)
+
+# group(1) = tipo da norma; group(2) = número completo, incluindo ano se junto
+PADRAO_NORMA = re.compile(
+    r'(?i)\b(lei\scomplementar|lei\sordin[áa]ria|lei|decreto-lei|decreto|portaria|resolu[cç][ãa]o|instru[cç][ãa]o\snormativa|ato\snormativo|IN\b|LC\b|EC\b|MP\b|ADE\b)\s+'
+    r'(?:n[º°\.\s]*|n[º°]?\s*)?'  # Permite "nº ", "n. ", "n ", ou só o número
+    r'([\d]+(?:[\.,\/\-]\d+)*[\w]*)',  # Número: dígitos, pontos, barras, hífens, opcionalmente terminando com letra
+    re.IGNORECASE
+)
+_NAO_NUMERO = re.compile(r'[^\d./-]')
+_TEM_DIGITO = re.compile(r'\d')
+_PARTES_NUMERO = re.compile(r'([./-])')
+_ANO_4_DIGITOS = re.compile(r'/(\d{4})\b')
+_ANO_2_DIGITOS = re.compile(r'/(\d{2})\b')
+_ANOS_NO_FIM = re.compile(r'(\/\d{4})+$')
+
+_MAPA_TIPOS_BASE = {
+    'lei': 'LEI', 'leis': 'LEI', 'lei complementar': 'LEI',
+    'leis complementares': 'LEI', 'lc': 'LEI',
+    'decreto': 'DECRETO', 'decretos': 'DECRETO', 'decreto-lei': 'DECRETO',
+    'portaria': 'PORTARIA', 'portarias': 'PORTARIA',
+    'resolucao': 'RESOLUCAO', 'resolucoes': 'RESOLUCAO', 'resolução': 'RESOLUCAO',
+    'instrucao normativa': 'INSTRUCAO', 'instrução normativa': 'INSTRUCAO',
+    'instrucao': 'INSTRUCAO', 'in': 'INSTRUCAO',
+    'ato normativo': 'ATO_NORMATIVO',
+}
+
+
+@lru_cache(maxsize=1)
+def mapa_tipos_norma() -> Dict[str, str]:
+    """Texto do tipo (minúsculo) -> NormaVigente.tipo; desconhecidos viram 'OUTROS'."""
+    from monitor.models import NormaVigente
+    mapa = defaultdict(lambda: 'OUTROS')
+    mapa.update(_MAPA_TIPOS_BASE)
+    for choice_key, _ in NormaVigente.TIPO_CHOICES:
+        mapa[choice_key.lower()] = choice_key
+    return mapa
+
+
+@lru_cache(maxsize=1)
+def tipos_validos() -> FrozenSet[str]:
+    from monitor.models import NormaVigente
+    return frozenset(choice[0] for choice in NormaVigente.TIPO_CHOICES)
+
+
+@lru_cache(maxsize=8192)
+def padronizar_numero(numero: str) -> str:
+    """Remove zeros à esquerda e caracteres estranhos: '021.866/2023.' -> '21.866/2023'."""
+    numero_limpo = _NAO_NUMERO.sub('', str(numero))
+    if not numero_limpo or not _TEM_DIGITO.search(numero_limpo):
+        return ""
+    partes = []
+    for parte in _PARTES_NUMERO.split(numero_limpo):
+        if parte.isdigit():
+            partes.append(parte.lstrip('0') or '0')
+        elif parte in ('/', '.', '-'):
+            partes.append(parte)
+    return "".join(partes).strip('./-')
+
+
+@lru_cache(maxsize=8192)
+def extrair_ano(numero_norma: str) -> Optional[int]:
+    match = _ANO_4_DIGITOS.search(numero_norma)
+    if match:
+        return int(match.group(1))
+    match = _ANO_2_DIGITOS.search(numero_norma)
+    if match:
+        ano_curto = int(match.group(1))
+        return 2000 + ano_curto if ano_curto < 50 else 1900 + ano_curto
+    return None
+
+
+@lru_cache(maxsize=8192)
+def normalizar_citacao(tipo_bruto: str, numero_bruto: str) -> Optional[Tuple[str, str]]:
+    """
+    Converte tipo/número brutos de uma citação em (tipo do modelo, número/ano).
+    Retorna None para citações sem ano de 4 dígitos.
+    """
+    tipo_normalizado = mapa_tipos_norma().get(tipo_bruto.lower(), 'OUTROS')
+    numero_padronizado = padronizar_numero(numero_bruto)
+    ano_norma = extrair_ano(numero_padronizado)
+    if tipo_normalizado not in tipos_validos():
+        logger.warning(f"Tipo de norma '{tipo_bruto}' normalizado para '{tipo_normalizado}' não é um TIPO_CHOICES válido. Marcando como OUTROS ou ignorando. Número: {numero_padronizado}")
+    # Só considera normas com número e ano (ano com 4 dígitos)
+    if numero_padronizado and ano_norma and len(str(ano_norma)) == 4:
+        # Só adiciona o ano se o número não terminar com /ano
+        if not numero_padronizado.endswith(f"/{ano_norma}"):
+            numero_sem_ano = _ANOS_NO_FIM.sub('', numero_padronizado)
+            return (tipo_normalizado, f"{numero_sem_ano}/{ano_norma}")
+        return (tipo_normalizado, numero_padronizado)
+    logger.warning(f"Norma ignorada por não conter ano válido ou número muito curto: tipo={tipo_normalizado}, numero='{numero_padronizado}', ano={ano_norma}")
+    return None
+
+
+def _eh_caractere_palavra(c: str) -> bool:
+    return c.isalnum() or c == '_'
+
+
+class VariacoesNorma:
+    """
+    Números específicos dos termos NORMA compilados em um único padrão.
+    Equivale a um re.search(rf'(?i)\\b{numero}\\b') por variação, mas em uma passada:
+    o lookahead encontra o número mais longo em cada posição e os números que
+    são prefixo dele (e terminam em fronteira de palavra) são creditados junto.
+    """
+    def __init__(self, termos: Iterable):
+        self.tipos_por_numero: Dict[str, set] = defaultdict(set)
+        for termo in termos:
+            tipo = mapa_tipos_norma().get(termo.termo.lower(), 'OUTROS')
+            for variacao in termo.variacoes:
+                numero = padronizar_numero(variacao)
+                if numero:
+                    self.tipos_por_numero[numero.lower()].add((tipo, numero))
+        numeros = sorted(self.tipos_por_numero, key=len, reverse=True)
+        self._prefixos = {n: [p for p in numeros if n.startswith(p)] for n in numeros}
+        self.padrao = re.compile(
+            r'(?=\b(' + '|'.join(re.escape(n) for n in numeros) + r')\b)', re.IGNORECASE
+        ) if numeros else None
+
+    def buscar(self, texto: str) -> set:
+        encontrados = set()
+        if self.padrao is None:
+            return encontrados
+        vistos = set()
+        for m in self.padrao.finditer(texto):
+            inicio = m.start()
+            for numero in self._prefixos[m.group(1).lower()]:
+                if numero in vistos:
+                    continue
+                fim = inicio + len(numero)
+                # fronteira de palavra no fim do prefixo (o mais longo já foi validado pelo padrão)
+                if fim < len(texto) and _eh_caractere_palavra(numero[-1]) == _eh_caractere_palavra(texto[fim]):
+                    continue
+                vistos.add(numero)
+                encontrados.update(self.tipos_por_numero[numero])
+        return encontrados
+
+
+def obter_variacoes_norma() -> VariacoesNorma:
+    """Padrão das variações para a versão atual do cache de termos do worker."""
+    termos_ativos = obter_termos_ativos()
+    variacoes = getattr(termos_ativos, 'variacoes_norma', None)
+    if variacoes is None:
+        variacoes = VariacoesNorma(termos_ativos.por_tipo('NORMA'))
+        termos_ativos.variacoes_norma = variacoes
+    return variacoes
+
+
+def contar_normas(texto: str, variacoes: Optional[VariacoesNorma] = None) -> Dict[Tuple[str, str], int]:
+    """
+    Citações de normas (tipo, número/ano) -> número de menções no texto.
+    Números achados só pelas variações dos termos NORMA contam uma menção.
+    """
+    contagem: Dict[Tuple[str, str], int] = {}
+    for match in PADRAO_NORMA.finditer(texto or ''):
+        citacao = normalizar_citacao(match.group(1).strip(), match.group(2).strip())
+        if citacao:
+            contagem[citacao] = contagem.get(citacao, 0) + 1
+    variacoes = variacoes if variacoes is not None else obter_variacoes_norma()
+    for citacao in variacoes.buscar(texto or ''):
+        contagem.setdefault(citacao, 1)
+    return contagem
+
+
+def extrair_normas(texto: str, variacoes: Optional[VariacoesNorma] = None) -> List[Tuple[str, str]]:
+    """Citações de normas (tipo, número/ano) do texto, sem repetição."""
+    return sorted(contar_normas(texto, variacoes))
+
+
+def extrair_normas_lote(textos: Sequence[str]) -> List[List[Tuple[str, str]]]:
+    """Versão em lote: o padrão das variações é obtido uma única vez para todos os textos."""
+    variacoes = obter_variacoes_norma()
+    return [extrair_normas(texto, variacoes) for texto in textos]
@@ -0,0 +1,252 @@
+# monitor/utils/grafo_normas.py
+"""
+Grafo de citações entre normas.
+
+- Arestas norma→norma (RelacaoNorma: ALTERA, REVOGA, REGULAMENTA) ficam em listas
+  de adjacência por processo, recarregadas quando a versão 'monitor:grafo_normas:versao'
+  muda no Redis ou o TTL expira;
+- arestas documento→norma (CitacaoNorma, com número de menções) são gravadas por
+  persistencia_normas e consultadas com um único IN sobre o fecho calculado em memória.
+
+Assim "todos os documentos afetados se a Lei 4.257 for revogada" é uma busca em
+largura nas listas de adjacência e uma consulta, sem consultas ORM recursivas.
+"""
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from .cache_worker import VersaoCompartilhada
+from .extrator_normas import PADRAO_NORMA, mapa_tipos_norma, normalizar_citacao, padronizar_numero
+
+logger = logging.getLogger(__name__)
+
+Citacao = Tuple[str, str]  # (tipo, numero) como em extrator_normas
+Aresta = Tuple[Citacao, str, Citacao]  # (origem, tipo da relação, destino)
+
+# Normas que perdem o objeto quando o destino é revogado: as que o alteram ou regulamentam
+TIPOS_DEPENDENCIA = ('ALTERA', 'REGULAMENTA')
+
+_VERBOS_RELACAO = re.compile(
+    r'(?i)\b(?:(?P<passiva>alterad[oa]s?|revogad[oa]s?|regulamentad[oa]s?)\s+pel[oa]s?'
+    r'|(?P<ativa>altera|revoga|regulamenta)[mr]?)\b'
+)
+_TIPO_POR_RADICAL = {'alter': 'ALTERA', 'revog': 'REVOGA', 'regul': 'REGULAMENTA'}
+
+_versao_grafo = VersaoCompartilhada('monitor:grafo_normas:versao')
+_lock = threading.Lock()
+_grafo: Optional['GrafoNormas'] = None
+
+
+class GrafoNormas:
+    """Listas de adjacência (id da norma -> [(id vizinho, tipo da relação)]) nos dois sentidos."""
+    __slots__ = ('versao', 'carregado_em', 'saida', 'entrada', 'arestas')
+
+    def __init__(self, versao: tuple, arestas: Iterable[Tuple[int, int, str]] = ()):
+        self.versao = versao
+        self.carregado_em = time.monotonic()
+        self.saida: Dict[int, List[Tuple[int, str]]] = {}
+        self.entrada: Dict[int, List[Tuple[int, str]]] = {}
+        self.arestas = 0
+        for origem, destino, tipo in arestas:
+            self.saida.setdefault(origem, []).append((destino, tipo))
+            self.entrada.setdefault(destino, []).append((origem, tipo))
+            self.arestas += 1
+
+    def _percorrer(self, adjacencia, inicio: int, tipos: Sequence[str], profundidade: Optional[int]) -> Dict[int, int]:
+        distancias = {inicio: 0}
+        fila = deque([inicio])
+        while fila:
+            atual = fila.popleft()
+            if profundidade is not None and distancias[atual] >= profundidade:
+                continue
+            for vizinho, tipo in adjacencia.get(atual, ()):
+                if tipo in tipos and vizinho not in distancias:
+                    distancias[vizinho] = distancias[atual] + 1
+                    fila.append(vizinho)
+        return distancias
+
+    def dependentes(self, norma_id: int, tipos: Sequence[str] = TIPOS_DEPENDENCIA,
+                    profundidade: Optional[int] = None) -> Dict[int, int]:
+        """
+        Normas que alteram/regulamentam `norma_id`, direta ou transitivamente,
+        com a distância no grafo (a própria norma tem distância 0).
+        """
+        return self._percorrer(self.entrada, norma_id, tipos, profundidade)
+
+    def dependencias(self, norma_id: int, tipos: Sequence[str] = TIPOS_DEPENDENCIA,
+                     profundidade: Optional[int] = None) -> Dict[int, int]:
+        """Sentido inverso: normas que `norma_id` altera/regulamenta."""
+        return self._percorrer(self.saida, norma_id, tipos, profundidade)
+
+
+def _carregar(versao: tuple) -> GrafoNormas:
+    from monitor.models import RelacaoNorma
+    linhas = RelacaoNorma.objects.values_list('origem_id', 'destino_id', 'tipo')
+    grafo = GrafoNormas(versao, linhas.iterator(chunk_size=5000))
+    logger.info(f"Grafo de normas carregado: {grafo.arestas} relações (versão {versao}).")
+    return grafo
+
+
+def obter_grafo_normas() -> GrafoNormas:
+    global _grafo
+    versao = _versao_grafo.atual()
+    ttl = getattr(settings, 'MONITOR_CACHE_TTL', 300)
+    grafo = _grafo
+    if grafo is not None and grafo.versao == versao and time.monotonic() - grafo.carregado_em < ttl:
+        return grafo
+    with _lock:
+        grafo = _grafo
+        if grafo is None or grafo.versao != versao or time.monotonic() - grafo.carregado_em >= ttl:
+            grafo = _carregar(versao)
+            _grafo = grafo
+    return grafo
+
+
+def invalidar_grafo_normas() -> None:
+    """Chamado pelos signals de RelacaoNorma e após gravações em lote (bulk_create não dispara signals)."""
+    _versao_grafo.incrementar()
+
+
+# --- Consultas ---
+
+def localizar_normas(tipo: str, numero: str) -> List[int]:
+    """
+    Ids das normas cadastradas para o tipo/número informados ('LEI', '4.257' ou
+    'Lei', '4.257/2002'). Sem ano, devolve todas as normas com aquele número.
+    """
+    from monitor.models import NormaVigente
+    tipo_modelo = mapa_tipos_norma().get(tipo.lower().strip(), 'OUTROS')
+    numero = padronizar_numero(numero)
+    if not numero:
+        return []
+    filtro = NormaVigente.objects.filter(tipo=tipo_modelo)
+    if '/' in numero:
+        return list(filtro.filter(numero=numero).values_list('id', flat=True))
+    return list(filtro.filter(numero__startswith=f"{numero}/").values_list('id', flat=True)) + \
+        list(filtro.filter(numero=numero).values_list('id', flat=True))
+
+
+def normas_afetadas(norma_ids: Iterable[int], tipos: Sequence[str] = TIPOS_DEPENDENCIA,
+                    profundidade: Optional[int] = None) -> Dict[int, int]:
+    """Fecho de dependentes de uma ou mais normas: id -> menor distância."""
+    grafo = obter_grafo_normas()
+    afetadas: Dict[int, int] = {}
+    for norma_id in norma_ids:
+        for dependente, d in grafo.dependentes(norma_id, tipos, profundidade).items():
+            if d < afetadas.get(dependente, d + 1):
+                afetadas[dependente] = d
+    return afetadas
+
+
+def documentos_afetados(norma_ids: Iterable[int], tipos: Sequence[str] = TIPOS_DEPENDENCIA,
+                        profundidade: Optional[int] = None) -> Dict[int, int]:
+    """
+    Documentos que citam as normas informadas ou qualquer norma que dependa delas,
+    com o total de menções dessas normas em cada documento (maior = mais afetado).
+    """
+    from monitor.models import CitacaoNorma
+    afetadas = normas_afetadas(norma_ids, tipos, profundidade)
+    if not afetadas:
+        return {}
+    documentos: Dict[int, int] = {}
+    citacoes = CitacaoNorma.objects.filter(norma_id__in=list(afetadas)).values_list('documento_id', 'mencoes')
+    for documento_id, mencoes in citacoes.iterator(chunk_size=5000):
+        documentos[documento_id] = documentos.get(documento_id, 0) + mencoes
+    return documentos
+
+
+def documentos_afetados_por_norma(tipo: str, numero: str, **kwargs) -> Dict[int, int]:
+    """Ex.: documentos_afetados_por_norma('Lei', '4.257') -> {documento_id: menções}."""
+    return documentos_afetados(localizar_normas(tipo, numero), **kwargs)
+
+
+# --- Gravação das relações ---
+
+def _citacoes(texto: str) -> List[Citacao]:
+    citacoes = []
+    for match in PADRAO_NORMA.finditer(texto or ''):
+        citacao = normalizar_citacao(match.group(1).strip(), match.group(2).strip())
+        if citacao and citacao not in citacoes:
+            citacoes.append(citacao)
+    return citacoes
+
+
+def relacoes_do_texto(norma: Citacao, texto: str) -> List[Aresta]:
+    """
+    Relações declaradas em ementas e situações do portal:
+    "Altera o Decreto nº 21.866/2023" -> norma ALTERA decreto;
+    "Revogado pelo Decreto nº 22.000/2024" -> decreto REVOGA norma.
+    Cada verbo vale para as citações até o próximo verbo.
+    """
+    arestas = []
+    verbos = list(_VERBOS_RELACAO.finditer(texto or ''))
+    for i, verbo in enumerate(verbos):
+        trecho = texto[verbo.end():verbos[i + 1].start() if i + 1 < len(verbos) else len(texto)]
+        radical = (verbo.group('passiva') or verbo.group('ativa')).lower()[:5]
+        tipo = _TIPO_POR_RADICAL[radical]
+        for citacao in _citacoes(trecho):
+            if citacao == norma:
+                continue
+            arestas.append((citacao, tipo, norma) if verbo.group('passiva') else (norma, tipo, citacao))
+    return arestas
+
+
+def relacoes_dos_detalhes(norma: Citacao, detalhes: dict) -> List[Aresta]:
+    """Arestas a partir do resultado de SEFAZScraper.get_norm_details."""
+    arestas = relacoes_do_texto(norma, detalhes.get('ementa') or '')
+    arestas += relacoes_do_texto(norma, detalhes.get('situacao') or '')
+    # Campo "Alterações" do portal: atos que alteraram (ou revogaram) esta norma
+    for link in detalhes.get('altera') or []:
+        texto = (link or {}).get('texto') or ''
+        explicitas = relacoes_do_texto(norma, texto)
+        if explicitas:
+            arestas += explicitas
+            continue
+        arestas += [(citacao, 'ALTERA', norma) for citacao in _citacoes(texto) if citacao != norma]
+    return list(dict.fromkeys(arestas))
+
+
+def registrar_relacoes(arestas: Iterable[Aresta], fonte: str = 'SEFAZ') -> int:
+    """
+    Grava as arestas (normas que faltam são criadas como A_VERIFICAR) e retorna
+    quantas eram novas; o grafo só é invalidado se alguma aresta foi inserida.
+    """
+    from monitor.models import RelacaoNorma
+    from .persistencia_normas import chave_norma, obter_ou_criar_normas
+    por_chave = []
+    for origem, tipo, destino in arestas:
+        chave_origem, chave_destino = chave_norma(*origem), chave_norma(*destino)
+        if chave_origem and chave_destino and chave_origem != chave_destino:
+            por_chave.append((chave_origem, tipo, chave_destino))
+    if not por_chave:
+        return 0
+    titulo = 'portal da legislação SEFAZ' if fonte == 'SEFAZ' else 'Diário Oficial'
+    mencoes = {chave: {'data': None, 'titulo': titulo} for origem, _, destino in por_chave for chave in (origem, destino)}
+    with transaction.atomic():
+        normas = obter_ou_criar_normas(mencoes)
+        ids = {normas[chave].pk for chave in mencoes if chave in normas}
+        # ignore_conflicts não diz o que foi inserido: conta as arestas entre essas normas antes e depois
+        afetadas = RelacaoNorma.objects.filter(origem_id__in=ids, destino_id__in=ids)
+        antes = afetadas.count()
+        RelacaoNorma.objects.bulk_create([
+            RelacaoNorma(origem_id=normas[origem].pk, destino_id=normas[destino].pk, tipo=tipo, fonte=fonte)
+            for origem, tipo, destino in por_chave if origem in normas and destino in normas
+        ], ignore_conflicts=True)
+        inseridas = afetadas.count() - antes
+    if inseridas:
+        transaction.on_commit(invalidar_grafo_normas)
+    return inseridas
+
+
+def registrar_detalhes_sefaz(norm_type: str, norm_number: str, detalhes: dict) -> int:
+    """Extrai e grava as relações de uma consulta ao portal (check_norm_status)."""
+    norma = normalizar_citacao(norm_type, norm_number) or (
+        mapa_tipos_norma().get(norm_type.lower().strip(), 'OUTROS'), padronizar_numero(norm_number)
+    )
+    return registrar_relacoes(relacoes_dos_detalhes(norma, detalhes or {}), fonte='SEFAZ')
@@ -0,0 +1,173 @@
+# monitor/utils/indice_normas.py
+"""
+Mapa de identidade (tipo, numero, ano) -> id de NormaVigente, local ao worker.
+
+A chave vira uma string "TIPO|numero|ano" e aponta para uma posição em dois
+arrays compactos: ids (array 'q') e data_ultima_mencao (ordinal, array 'l').
+O mapa é aquecido no início de cada processo do worker e mantido coerente assim:
+
+- normas criadas em outro processo não estão no mapa, mas uma falta cai no banco
+  e o resultado é adicionado (não há cache negativo);
+- post_save atualiza o mapa do processo; se a chave de uma norma mudou em relação
+  à lida do banco (NormaVigente.from_db), ou se ela foi removida (post_delete), a
+  versão no Redis é incrementada e os outros workers recarregam o mapa, mesmo que
+  este processo ainda não tenha mapa carregado;
+- a data de menção só avança (UPDATE condicional), então uma data local
+  desatualizada nunca faz a do banco regredir.
+"""
+import logging
+import threading
+import time
+from array import array
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from .cache_worker import VersaoCompartilhada
+
+logger = logging.getLogger(__name__)
+
+Chave = Tuple[str, str, Optional[int]]  # (tipo, numero, ano)
+
+_versao_normas = VersaoCompartilhada('monitor:normas:versao')
+_lock = threading.RLock()
+_indice: Optional['IndiceNormas'] = None
+
+
+def _texto_chave(chave: Chave) -> str:
+    tipo, numero, ano = chave
+    return f"{tipo}|{numero}|{'' if ano is None else ano}"
+
+
+class IndiceNormas:
+    __slots__ = ('versao', 'carregado_em', '_posicoes', '_posicao_por_id', '_chaves', 'ids', 'mencoes')
+
+    def __init__(self, versao: tuple):
+        self.versao = versao
+        self.carregado_em = time.monotonic()
+        self._posicoes: Dict[str, int] = {}
+        self._posicao_por_id: Dict[int, int] = {}
+        self._chaves: List[Optional[str]] = []
+        self.ids = array('q')
+        self.mencoes = array('l')  # date.toordinal(); 0 = sem menção
+
+    def __len__(self) -> int:
+        return len(self._posicoes)
+
+    def obter(self, chave: Chave) -> Optional[Tuple[int, Optional[date]]]:
+        posicao = self._posicoes.get(_texto_chave(chave))
+        if posicao is None:
+            return None
+        ordinal = self.mencoes[posicao]
+        return self.ids[posicao], (date.fromordinal(ordinal) if ordinal else None)
+
+    def registrar(self, chave: Chave, norma_id: int, data_mencao: Optional[date] = None) -> bool:
+        """
+        Adiciona/atualiza a chave. Retorna True se o id já estava no mapa com outra
+        chave (tipo/número/ano alterados), caso em que a chave antiga é removida.
+        """
+        texto = _texto_chave(chave)
+        ordinal = data_mencao.toordinal() if data_mencao else 0
+        posicao = self._posicao_por_id.get(norma_id)
+        if posicao is not None:
+            antiga = self._chaves[posicao]
+            if antiga != texto:
+                self._posicoes.pop(antiga, None)
+                self._posicoes[texto] = posicao
+                self._chaves[posicao] = texto
+            self.mencoes[posicao] = max(self.mencoes[posicao], ordinal)
+            return antiga != texto
+        posicao = len(self.ids)
+        self.ids.append(norma_id)
+        self.mencoes.append(ordinal)
+        self._chaves.append(texto)
+        self._posicoes[texto] = posicao
+        self._posicao_por_id[norma_id] = posicao
+        return False
+
+    def atualizar_mencao(self, chave: Chave, data_mencao: date) -> None:
+        posicao = self._posicoes.get(_texto_chave(chave))
+        if posicao is not None and data_mencao:
+            self.mencoes[posicao] = max(self.mencoes[posicao], data_mencao.toordinal())
+
+    def remover(self, norma_id: int) -> None:
+        posicao = self._posicao_por_id.pop(norma_id, None)
+        if posicao is None:
+            return
+        self._posicoes.pop(self._chaves[posicao], None)
+        self._chaves[posicao] = None
+        self.ids[posicao] = 0
+        self.mencoes[posicao] = 0
+
+
+def _carregar(versao: tuple) -> IndiceNormas:
+    from monitor.models import NormaVigente
+    inicio = time.monotonic()
+    indice = IndiceNormas(versao)
+    linhas = NormaVigente.objects.values_list('id', 'tipo', 'numero', 'ano', 'data_ultima_mencao')
+    for norma_id, tipo, numero, ano, data_mencao in linhas.iterator(chunk_size=5000):
+        indice.registrar((tipo, numero, ano), norma_id, data_mencao)
+    logger.info(f"Índice de normas carregado: {len(indice)} normas em {time.monotonic() - inicio:.2f}s (versão {versao}).")
+    return indice
+
+
+def obter_indice_normas() -> IndiceNormas:
+    """
+    Índice do processo, recarregado quando a versão no Redis muda ou o TTL
+    MONITOR_INDICE_NORMAS_TTL expira.
+    """
+    global _indice
+    versao = _versao_normas.atual()
+    ttl = getattr(settings, 'MONITOR_INDICE_NORMAS_TTL', 3600)
+    indice = _indice
+    if indice is not None and indice.versao == versao and time.monotonic() - indice.carregado_em < ttl:
+        return indice
+    with _lock:
+        indice = _indice
+        if indice is None or indice.versao != versao or time.monotonic() - indice.carregado_em >= ttl:
+            indice = _carregar(versao)
+            _indice = indice
+    return indice
+
+
+def aquecer_indice_normas() -> None:
+    """Carrega o índice no início do processo do worker (celery worker_process_init)."""
+    try:
+        obter_indice_normas()
+    except Exception as e:
+        logger.warning(f"Não foi possível aquecer o índice de normas: {e}")
+
+
+def registrar_normas(normas: Iterable[Tuple[Chave, int, Optional[date]]]) -> None:
+    """Adiciona ao índice do processo normas lidas ou criadas pelo chamador."""
+    indice = obter_indice_normas()
+    with _lock:
+        for chave, norma_id, data_mencao in normas:
+            indice.registrar(chave, norma_id, data_mencao)
+
+
+def norma_salva(norma, criada: bool = False) -> None:
+    """post_save de NormaVigente: atualiza este processo e, se a chave mudou, os demais."""
+    chave = (norma.tipo, norma.numero, norma.ano)
+    # Norma nova não invalida ninguém (falta no mapa cai no banco); sem a chave lida
+    # do banco (instância montada à mão), não dá para saber se mudou
+    chave_mudou = not criada and getattr(norma, '_chave_carregada', None) != chave
+    norma._chave_carregada = chave
+    indice = _indice
+    if indice is not None:
+        with _lock:
+            chave_mudou = indice.registrar(chave, norma.pk, norma.data_ultima_mencao) or chave_mudou
+    if chave_mudou:
+        # Os outros workers só recarregam depois do commit, senão leriam a chave antiga
+        transaction.on_commit(_versao_normas.incrementar)
+
+
+def norma_removida(norma) -> None:
+    """post_delete de NormaVigente: remove deste processo e invalida os demais."""
+    indice = _indice
+    if indice is not None:
+        with _lock:
+            indice.remover(norma.pk)
+    transaction.on_commit(_versao_normas.incrementar)
@@ -0,0 +1,85 @@
+# monitor/utils/indice_termos.py
+import logging
+from datetime import date
+from typing import Dict, List, Optional, Union
+
+from django.db import transaction
+from django.db.models import Count, QuerySet, Sum
+
+from monitor.models import Documento, OcorrenciaTermoDocumento, TermoMonitorado
+from .busca_termos import ResultadoBusca
+
+logger = logging.getLogger(__name__)
+
+
+def registrar_ocorrencias(documento: Documento, resultado: ResultadoBusca) -> int:
+    """
+    Substitui as ocorrências indexadas do documento pelas do resultado da busca.
+    Retorna o número de termos distintos gravados.
+    """
+    if not getattr(documento, 'pk', None) or not documento.data_publicacao:
+        return 0
+    linhas = [
+        OcorrenciaTermoDocumento(
+            documento_id=documento.pk,
+            termo_id=ocorrencia.termo_id,
+            data_publicacao=documento.data_publicacao,
+            contagem=ocorrencia.contagem,
+            posicoes=ocorrencia.posicoes,
+        )
+        for ocorrencia in resultado.ocorrencias.values()
+    ]
+    with transaction.atomic():
+        OcorrenciaTermoDocumento.objects.filter(documento_id=documento.pk).delete()
+        if linhas:
+            OcorrenciaTermoDocumento.objects.bulk_create(linhas)
+    return len(linhas)
+
+
+def _filtro_termo(termo: Union[TermoMonitorado, int, str]) -> Dict:
+    if isinstance(termo, TermoMonitorado):
+        return {'termo_id': termo.pk}
+    if isinstance(termo, int):
+        return {'termo_id': termo}
+    return {'termo__termo__iexact': termo}
+
+
+def ocorrencias_do_termo(termo: Union[TermoMonitorado, int, str],
+                         data_inicio: Optional[date] = None,
+                         data_fim: Optional[date] = None) -> QuerySet:
+    """
+    Ocorrências de um termo (objeto, id ou texto) no período, usando o índice (termo, data_publicacao).
+    """
+    qs = OcorrenciaTermoDocumento.objects.filter(**_filtro_termo(termo))
+    if data_inicio:
+        qs = qs.filter(data_publicacao__gte=data_inicio)
+    if data_fim:
+        qs = qs.filter(data_publicacao__lte=data_fim)
+    return qs
+
+
+def documentos_com_termo(termo: Union[TermoMonitorado, int, str],
+                         data_inicio: Optional[date] = None,
+                         data_fim: Optional[date] = None) -> QuerySet:
+    """
+    Documentos que mencionaram o termo no período, sem varrer texto_completo.
+    Ex.: documentos_com_termo('Decreto 21.866', date(2025, 7, 1), date(2025, 7, 31))
+    """
+    ids = ocorrencias_do_termo(termo, data_inicio, data_fim).values('documento_id')
+    return Documento.objects.filter(id__in=ids)
+
+
+def resumo_por_termo(data_inicio: Optional[date] = None, data_fim: Optional[date] = None) -> List[Dict]:
+    """
+    Totais por termo no período (documentos distintos e menções), para dashboards e relatórios.
+    """
+    qs = OcorrenciaTermoDocumento.objects.all()
+    if data_inicio:
+        qs = qs.filter(data_publicacao__gte=data_inicio)
+    if data_fim:
+        qs = qs.filter(data_publicacao__lte=data_fim)
+    return list(
+        qs.values('termo_id', 'termo__termo')
+        .annotate(documentos=Count('documento_id'), mencoes=Sum('contagem'))
+        .order_by('-documentos')
+    )
@@ -0,0 +1,85 @@
+# monitor/utils/lexico.py
+"""
+Léxicos compilados das heurísticas locais (sentimento e impacto fiscal).
+
+Todas as palavras de um léxico viram uma única expressão regular com
+lookahead, de modo que uma passada pelo texto conta as ocorrências de todas
+as classes — inclusive sobrepostas, com a mesma semântica de `palavra in texto`.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+@dataclass
+class ResultadoLexico:
+    rotulo: str
+    contagens: Dict[str, int] = field(default_factory=dict)
+    scores: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.contagens.values())
+
+
+class LexicoCompilado:
+    """
+    `classes` é uma sequência ordenada de (classe, palavras). O rótulo é a primeira
+    classe (na ordem informada) com alguma ocorrência, ou `rotulo_padrao`.
+    Os scores são a fração das ocorrências de cada classe.
+    """
+    def __init__(self, classes: Sequence[Tuple[str, Iterable[str]]], rotulo_padrao: str):
+        self.classes = [classe for classe, _ in classes]
+        self.rotulo_padrao = rotulo_padrao
+        self.classe_da_palavra: Dict[str, str] = {}
+        for classe, palavras in classes:
+            for palavra in palavras:
+                self.classe_da_palavra.setdefault(palavra.lower(), classe)
+        palavras = sorted(self.classe_da_palavra, key=len, reverse=True)
+        # Em cada posição a alternância casa só a palavra mais longa; as palavras
+        # que são prefixo dela também ocorrem ali e são creditadas junto.
+        self._prefixos = {p: [q for q in palavras if p.startswith(q)] for p in palavras}
+        self.padrao = re.compile('(?=(' + '|'.join(re.escape(p) for p in palavras) + '))') if palavras else None
+
+    def contar_palavras(self, texto: str, minusculo: bool = False) -> Dict[str, int]:
+        contagem: Dict[str, int] = {}
+        if self.padrao is None or not texto:
+            return contagem
+        for m in self.padrao.finditer(texto if minusculo else texto.lower()):
+            for palavra in self._prefixos[m.group(1)]:
+                contagem[palavra] = contagem.get(palavra, 0) + 1
+        return contagem
+
+    def avaliar(self, texto: str, minusculo: bool = False) -> ResultadoLexico:
+        contagens = dict.fromkeys(self.classes, 0)
+        for palavra, qtd in self.contar_palavras(texto, minusculo).items():
+            contagens[self.classe_da_palavra[palavra]] += qtd
+        total = sum(contagens.values())
+        scores = {classe: round(qtd / total, 4) if total else 0.0 for classe, qtd in contagens.items()}
+        rotulo = next((classe for classe in self.classes if contagens[classe]), self.rotulo_padrao)
+        return ResultadoLexico(rotulo, contagens, scores)
+
+    def avaliar_lote(self, textos: Sequence[str], minusculo: bool = False) -> List[ResultadoLexico]:
+        return [self.avaliar(texto, minusculo) for texto in textos]
+
+
+LEXICO_SENTIMENTO = LexicoCompilado((
+    ("POSITIVO", ["benefício", "redução", "simplifica", "incentivo", "isenção", "facilita"]),
+    ("NEGATIVO", ["obriga", "penalidade", "multa", "aumenta", "restrição", "oneroso", "complexo", "revoga", "exclui"]),
+    ("CAUTELA", ["ambíguo", "incerto", "cautela", "duvidoso", "interpretação"]),
+), rotulo_padrao="NEUTRO")
+
+LEXICO_IMPACTO_FISCAL = LexicoCompilado((
+    ("CARGA_TRIBUTARIA", ["alíquota", "base de cálculo", "tributo", "substituição tributária"]),
+    ("OBRIGACOES", ["obrigação acessória", "sped", "efd", "prazo", "recolhimento"]),
+    ("BENEFICIOS", ["benefício fiscal", "isenção", "regime especial"]),
+    ("PENALIDADES", ["penalidade", "multa"]),
+), rotulo_padrao="SEM_IMPACTO")
+
+
+def avaliar_sentimentos(textos: Sequence[str], minusculo: bool = False) -> List[ResultadoLexico]:
+    return LEXICO_SENTIMENTO.avaliar_lote(textos, minusculo)
+
+
+def avaliar_impactos_fiscais(textos: Sequence[str], minusculo: bool = False) -> List[ResultadoLexico]:
+    return LEXICO_IMPACTO_FISCAL.avaliar_lote(textos, minusculo)
@@ -31,12 +31,17 @@ class ContabeisNewsProcessor:
         Gera resumo coeso para notícia do Contabeis, priorizando clareza e contexto fiscal/contábil.
         """
         paragrafos_filtrados = ContabeisNewsProcessor.filtrar_paragrafos_noticia(texto)
-        principais = sorted(paragrafos_filtrados, key=len, reverse=True)[:5]
-        resumo = "\n\n".join(principais)
-        if len(resumo) > 1500:
-            corte = resumo.rfind('.', 0, 1500)
-            resumo = resumo[:corte+1] if corte > 0 else resumo[:1500]
-            resumo = resumo.rstrip() + '...'
+        try:
+            from .sumarizador import resumir
+            resumo = resumir("\n\n".join(paragrafos_filtrados), max_sentencas=5, max_caracteres=1500)
+        except ImportError:
+            logger.warning("numpy/scipy não instalados. Resumo pelos parágrafos mais longos.")
+            principais = sorted(paragrafos_filtrados, key=len, reverse=True)[:5]
+            resumo = "\n\n".join(principais)
+            if len(resumo) > 1500:
+                corte = resumo.rfind('.', 0, 1500)
+                resumo = resumo[:corte+1] if corte > 0 else resumo[:1500]
+                resumo = resumo.rstrip() + '...'
         if not resumo.strip():
             principais = sorted(paragrafos_filtrados, key=len, reverse=True)[:3]
             resumo = "\n\n".join(principais)
@@ -69,22 +74,30 @@ import logging
 import traceback
 # Remova requests se não for mais usado diretamente aqui
 from io import StringIO # Se ainda for usada em algum lugar
-from typing import Tuple, List, Dict, Optional
+from typing import Any, Tuple, List, Dict, Optional
 from datetime import datetime
-import spacy
-from spacy.matcher import Matcher
-from spacy.language import Language
+# spaCy é carregado sob demanda (PDFProcessor.nlp / monitor.utils.spacy_normas)
+import multiprocessing
 # Remova PyPDF2 se não for usado aqui e sim no scraper
 from pdfminer.high_level import extract_text as extract_text_to_fp # Verifique se é este ou o extract_text do scraper
 from pdfminer.layout import LAParams
 from django.conf import settings
-from django.core.exceptions import SuspiciousFileOperation, ValidationError # Adicionado ValidationError
+from django.core.exceptions import SuspiciousFileOperation
 from django.db import transaction
 from django.db.models import Q
-from monitor.models import Documento, NormaVigente, TermoMonitorado
+from monitor.models import Documento
 from .enriquecedor import enriquecer_documento_dict
+from .cache_worker import obter_termos_ativos
+from .busca_termos import normalizar_texto, obter_motor_termos
+from .indice_termos import registrar_ocorrencias
+from .classificador_local import classificar_paragrafos
+from .analise_documento import AnaliseDocumento, dividir_paragrafos, limitar_texto
+from .lexico import LEXICO_IMPACTO_FISCAL, LEXICO_SENTIMENTO, ResultadoLexico
+from .boilerplate import obter_impressoes_boilerplate, registrar_paragrafos
+from .duplicatas import calcular_simhash, encontrar_canonico, reaproveitar_analise, registrar_assinatura
+from . import extrator_normas
+from .persistencia_normas import registrar_normas_citadas
 from django.utils import timezone
-from collections import defaultdict
 
 # Importe a biblioteca da Anthropic
 import anthropic # Importe a biblioteca da Anthropic
@@ -92,57 +105,59 @@ import time # Para retries
 
 logger = logging.getLogger(__name__)
 
+MAX_ENTIDADES_METADATA = 50  # entidades nomeadas guardadas em Documento.metadata
+
+# Contagem dos resultados de process_document por execução (monitor.tasks)
+BALDES_STATUS = {
+    'SUCESSO': 'sucesso',
+    'SUCESSO_SEFAZ': 'sucesso',
+    'SUCESSO_CONTABEIS': 'sucesso',
+    'IGNORADO_IRRELEVANTE': 'irrelevantes',
+    'DUPLICATA': 'duplicatas',
+}
+BALDES = ('sucesso', 'irrelevantes', 'duplicatas', 'falha')
+
+
+def balde_do_status(status: Optional[str]) -> str:
+    """'sucesso', 'irrelevantes', 'duplicatas' ou 'falha' (ERRO, FALHA e desconhecidos)."""
+    return BALDES_STATUS.get(status, 'falha')
+
+
+_TITULOS_NORMA_IMPACTO = re.compile(r'(?i)\b(DECRETOS?|PORTARIAS?|_DECRETOS_|_PORTARIAS_|LEIS|_LEIS_)\b\s*')
+_NOTA_TRANSCRICAO = re.compile(r'\(Transcrição da nota.*?\)', re.IGNORECASE)
+_ATOS_PESSOAL = re.compile(r'(Policial Penal|Agente de Polícia Civil|SD PM|Sargento QPPM|Professor Adjunto|Comunicadora Social|Assistente Social|Secretária Municipal|Secretaria da Justiça|Secretaria da Segurança Pública|Secretaria de Estado da Educação|Fundação Universidade Estadual|Hospital Getúlio Vargas|Secretaria do Desenvolvimento e Assistência Social|Secretaria de Comunicação Social|Secretaria de Estado da Saúde|Assembleia Legislativa do Estado do Piauí|Gabinete da Deputada Ana Paula|CB PM|RGPM|CPF|Matrícula|Quadro de pessoal)[^\.\n]*[\.\n]', re.IGNORECASE)
+_LINHAS_MAIUSCULAS = re.compile(r'^[A-Z\s]{8,}$', re.MULTILINE)
+_TERMOS_FISCAIS = re.compile(r'(ICMS|CFOP|benefício fiscal|crédito fiscal|apuração|tributação|imposto|EFD|NF-e|Decreto|Portaria|Lei Complementar|Convênio ICMS|alíquota|base de cálculo|penalidade|incentivo fiscal|regulamentar|homologação|prazo|operações|apuração|tributos)', re.IGNORECASE)
+
 
 class ClaudeProcessor:
     def extrair_paragrafos_relevantes_local(self, texto: str) -> str:
         """
         Fallback usando modelo local HuggingFace Transformers para seleção de parágrafos relevantes.
-        Seleciona os parágrafos mais prováveis de conter termos contábeis/fiscais monitorados.
+        O modelo fica residente no worker e os parágrafos são classificados em lotes.
         """
+        paragrafos_texto = [p.strip() for p in re.split(r'\n{2,}', texto) if p.strip()]
         try:
-            from transformers import pipeline
+            scores = classificar_paragrafos(paragrafos_texto)
         except ImportError:
             logger.warning("Pacote transformers não instalado. Usando fallback por termos monitorados.")
             return self.extrair_paragrafos_relevantes_termos(texto)
-
-        termos = TermoMonitorado.objects.filter(ativo=True)
-        termos_busca = set(termo.termo.lower() for termo in termos)
-        paragrafos_texto = [p.strip() for p in re.split(r'\n{2,}', texto) if p.strip()]
-
-        # Cria um prompt para cada parágrafo
-        perguntas = [
-            f"Este parágrafo é relevante para contabilidade/fiscal? Termos: {', '.join(termos_busca)}\nParágrafo: {p}" for p in paragrafos_texto
-        ]
-
-        # Usa zero-shot-classification
-        try:
-            classifier = pipeline("zero-shot-classification", model="pierreguillou/bert-base-cased-pt-br")
         except Exception as e:
             logger.warning(f"Erro ao carregar modelo local transformers: {e}. Usando fallback por termos.")
             return self.extrair_paragrafos_relevantes_termos(texto)
 
-        candidate_labels = ["relevante", "irrelevante"]
-        resultados = []
-        for pergunta, paragrafo in zip(perguntas, paragrafos_texto):
-            try:
-                output = classifier(pergunta, candidate_labels)
-                score_relevante = output['scores'][output['labels'].index("relevante")]
-                resultados.append((score_relevante, paragrafo))
-            except Exception as e:
-                resultados.append((0, paragrafo))
-
         # Seleciona os 5 parágrafos mais relevantes
-        relevantes = [p for _, p in sorted(resultados, key=lambda x: x[0], reverse=True)[:5]]
+        resultados = sorted(zip(scores, paragrafos_texto), key=lambda x: x[0], reverse=True)
+        relevantes = [p for _, p in resultados[:5]]
         return "\n\n".join(relevantes)[:10000]
 
     def extrair_paragrafos_relevantes_termos(self, texto: str) -> str:
         """
         Fallback simples por termos monitorados.
         """
-        termos = TermoMonitorado.objects.filter(ativo=True)
-        termos_busca = set(termo.termo.lower() for termo in termos)
+        motor = obter_motor_termos()
         paragrafos_texto = [p.strip() for p in re.split(r'\n{2,}', texto) if p.strip()]
-        relevantes = [p for p in paragrafos_texto if any(termo in p.lower() for termo in termos_busca)]
+        relevantes = [p for p in paragrafos_texto if motor.contem(p)]
         if not relevantes:
             relevantes = sorted(paragrafos_texto, key=len, reverse=True)[:5]
         return "\n\n".join(relevantes)[:10000]
@@ -153,47 +168,76 @@ class ClaudeProcessor:
         self.default_temperature = 0.2
         self.default_max_tokens = 2048
 
-    def gerar_resumo_contabil(self, texto_relevante: str, termos_monitorados: Optional[List[str]] = None) -> str:
+    def gerar_resumo_contabil(self, texto_relevante: str, termos_monitorados: Optional[List[str]] = None,
+                              analise: Optional[AnaliseDocumento] = None) -> str:
         """
-        Gera um resumo contábil/fiscal usando apenas IA local (transformers) e termos monitorados.
+        Gera um resumo contábil/fiscal local (extrativo, TF-IDF + TextRank) a partir dos
+        parágrafos que citam termos monitorados. Com `analise`, reaproveita os parágrafos já selecionados.
         """
-        relevantes_termos = self.extrair_paragrafos_relevantes_termos(texto_relevante)
-        if relevantes_termos and len(relevantes_termos.strip()) > 0:
-            texto_para_analise = relevantes_termos[:15000]
-        else:
-            texto_para_analise = texto_relevante[:15000]
-        # IA local: seleciona os 5 parágrafos mais longos e relevantes
-        paragrafos = [p.strip() for p in re.split(r'\n{2,}', texto_para_analise) if p.strip()]
-        paragrafos_ordenados = sorted(paragrafos, key=len, reverse=True)[:5]
-        resumo = "\n\n".join(paragrafos_ordenados)
-        if not resumo:
-            resumo = texto_para_analise[:700] + "..."
-        return resumo[:1500]
+        if analise is not None:
+            return self._resumir_textos([(analise.paragrafos_relevantes or analise.texto_limitado)[:15000]])[0]
+        return self.gerar_resumos_contabeis([texto_relevante])[0]
+
+    def gerar_resumos_contabeis(self, textos: List[str]) -> List[str]:
+        """
+        Versão em lote de gerar_resumo_contabil: o TextRank roda para todos os textos de uma vez.
+        """
+        textos_para_analise = []
+        for texto_relevante in textos:
+            relevantes_termos = self.extrair_paragrafos_relevantes_termos(texto_relevante)
+            if relevantes_termos and len(relevantes_termos.strip()) > 0:
+                textos_para_analise.append(relevantes_termos[:15000])
+            else:
+                textos_para_analise.append(texto_relevante[:15000])
+        return self._resumir_textos(textos_para_analise)
+
+    def _resumir_textos(self, textos_para_analise: List[str]) -> List[str]:
+        try:
+            from .sumarizador import resumir_lote
+            resumos = resumir_lote(textos_para_analise, max_sentencas=5, max_caracteres=1500)
+        except ImportError:
+            logger.warning("numpy/scipy não instalados. Resumo pelos parágrafos mais longos.")
+            resumos = []
+            for texto_para_analise in textos_para_analise:
+                paragrafos = [p.strip() for p in re.split(r'\n{2,}', texto_para_analise) if p.strip()]
+                resumos.append("\n\n".join(sorted(paragrafos, key=len, reverse=True)[:5]))
+        return [
+            (resumo or texto_para_analise[:700] + "...")[:1500]
+            for resumo, texto_para_analise in zip(resumos, textos_para_analise)
+        ]
 
-    def analisar_sentimento_contabil(self, texto_relevante: str) -> str:
+    def analisar_sentimento_contabil(self, texto_relevante: str, analise: Optional[AnaliseDocumento] = None) -> str:
         """
         Analisa o sentimento do texto de forma local, sem IA externa.
+        Com `analise`, usa a visão minúscula dos parágrafos relevantes já calculada.
+        """
+        texto = "\n\n".join(analise.paragrafos_relevantes_minusculos) if analise is not None else texto_relevante.lower()
+        return LEXICO_SENTIMENTO.avaliar(texto, minusculo=True).rotulo
+
+    def analisar_sentimentos_contabeis(self, textos: List[str]) -> List[ResultadoLexico]:
+        """
+        Versão em lote: rótulo, contagem e score de cada classe de sentimento por texto.
         """
-        texto = texto_relevante.lower()
-        if any(palavra in texto for palavra in ["benefício", "redução", "simplifica", "incentivo", "isenção", "facilita"]):
-            return "POSITIVO"
-        if any(palavra in texto for palavra in ["obriga", "penalidade", "multa", "aumenta", "restrição", "oneroso", "complexo", "revoga", "exclui"]):
-            return "NEGATIVO"
-        if any(palavra in texto for palavra in ["ambíguo", "incerto", "cautela", "duvidoso", "interpretação"]):
-            return "CAUTELA"
-        return "NEUTRO"
+        return LEXICO_SENTIMENTO.avaliar_lote(textos)
 
-    def identificar_impacto_fiscal(self, texto_relevante: str, termos_monitorados: Optional[List[str]] = None) -> str:
+    def identificar_impacto_fiscal(self, texto_relevante: str, termos_monitorados: Optional[List[str]] = None,
+                                   analise: Optional[AnaliseDocumento] = None) -> str:
         """
         Identifica o impacto fiscal usando apenas IA local (transformers) e regras heurísticas.
+        Com `analise`, reaproveita os parágrafos relevantes (e a visão minúscula) já calculados.
         """
-        relevantes_termos = self.extrair_paragrafos_relevantes_termos(texto_relevante)
-        texto_para_analise = relevantes_termos[:8000] if relevantes_termos and len(relevantes_termos.strip()) > 0 else texto_relevante[:8000]
-        paragrafos = [p.strip() for p in re.split(r'\n{2,}', texto_para_analise) if p.strip()]
-        topicos = []
-        for p in paragrafos:
-            if any(palavra in p.lower() for palavra in ["alíquota", "base de cálculo", "tributo", "obrigação acessória", "sped", "efd", "prazo", "recolhimento", "benefício fiscal", "isenção", "penalidade", "multa", "regime especial", "substituição tributária"]):
-                topicos.append("- " + p[:200])
+        if analise is not None:
+            texto_para_analise = (analise.paragrafos_relevantes or analise.texto_limitado)[:8000]
+        else:
+            relevantes_termos = self.extrair_paragrafos_relevantes_termos(texto_relevante)
+            texto_para_analise = relevantes_termos[:8000] if relevantes_termos and len(relevantes_termos.strip()) > 0 else texto_relevante[:8000]
+        paragrafos = dividir_paragrafos(texto_para_analise)
+        if analise is not None and analise.paragrafos_relevantes and len(analise.paragrafos_relevantes) <= 8000:
+            minusculos = analise.paragrafos_relevantes_minusculos
+        else:
+            minusculos = [p.lower() for p in paragrafos]
+        avaliacoes = LEXICO_IMPACTO_FISCAL.avaliar_lote(minusculos, minusculo=True)
+        topicos = ["- " + p[:200] for p, avaliacao in zip(paragrafos, avaliacoes) if avaliacao.total]
         if not topicos:
             return "Nenhum impacto fiscal direto identificado neste documento."
         return "\n".join(topicos[:7])
@@ -211,29 +255,42 @@ class ClaudeProcessor:
         return self.extrair_paragrafos_relevantes_local(texto)
 
 
-@Language.component("norma_matcher")
-def norma_matcher_component(doc):
-    return doc
-
 class PDFProcessor:
+    def __init__(self):
+        self.claude_processor = ClaudeProcessor()
+        self.norma_type_choices_map = self._get_norma_type_choices_map()
+        self._nlp = None
+        self._spacy_indisponivel = False
+        self.matcher = None
+
+    @property
+    def nlp(self):
+        """
+        Modelo spaCy carregado apenas no primeiro uso; processos que nunca extraem
+        entidades não pagam o custo de import/carga do modelo.
+        """
+        if self._nlp is None and not self._spacy_indisponivel:
+            self._setup_spacy()
+        return self._nlp
+
     def preparar_para_ia(self, documento, limite_paginas: int = 3, limite_texto: int = 20000) -> dict:
         """
         Prepara o documento para consumo por IA, retornando um dicionário estruturado com os principais campos.
         """
         texto = getattr(documento, 'texto_completo', '') or ''
-        paginas = re.split(r'\f|\n{3,}', texto)
-        texto_limitado = '\n'.join(paginas[:limite_paginas]) if len(paginas) > 1 else texto
-        texto_limitado = texto_limitado[:limite_texto]
-        paragrafos_relevantes = self._extrair_paragrafos_relevantes(texto_limitado)
-        resumo = self.claude_processor.gerar_resumo_contabil(paragrafos_relevantes)
-        sentimento = self.claude_processor.analisar_sentimento_contabil(paragrafos_relevantes)
-        impacto_fiscal = self.claude_processor.identificar_impacto_fiscal(paragrafos_relevantes)
-        normas_extraidas = self.extrair_normas(texto_limitado)
-        relevante_contabil = self.is_relevante_contabil(texto_limitado)
+        texto_limitado = limitar_texto(texto, limite_paginas, limite_texto)
+        analise = self.analisar(texto_limitado, texto_limitado)
+        paragrafos_relevantes = analise.paragrafos_relevantes
+        resumo = self.claude_processor.gerar_resumo_contabil(paragrafos_relevantes, analise=analise)
+        sentimento = self.claude_processor.analisar_sentimento_contabil(paragrafos_relevantes, analise=analise)
+        impacto_fiscal = self.claude_processor.identificar_impacto_fiscal(paragrafos_relevantes, analise=analise)
+        normas_extraidas = analise.normas
+        relevante_contabil = self.is_relevante_contabil(texto_limitado, analise=analise)
         metadados = {
             'ia_modelo_usado': self.claude_processor.default_model,
             'ia_relevancia_justificativa': "Analisado como relevante pela IA e/ou termos monitorados.",
-            'ia_pontos_criticos': ["Verificar detalhes no resumo e impacto fiscal gerados pela IA."]
+            'ia_pontos_criticos': ["Verificar detalhes no resumo e impacto fiscal gerados pela IA."],
+            'tempos_analise_ms': analise.tempos,
         }
         return {
             'id': getattr(documento, 'id', None),
@@ -249,155 +306,128 @@ class PDFProcessor:
         }
 
 
+    def analisar(self, texto: str, texto_limitado: Optional[str] = None) -> AnaliseDocumento:
+        """
+        Cria a análise compartilhada do documento (parágrafos, termos, normas),
+        calculada uma única vez e consumida pelas heurísticas abaixo.
+        Parágrafos de boilerplate conhecidos são descartados.
+        """
+        return AnaliseDocumento(
+            texto,
+            texto_limitado,
+            motor=obter_motor_termos(),
+            extrator_normas=self.contar_normas,
+            seletor_local=self.claude_processor.extrair_paragrafos_relevantes_local,
+            boilerplate=obter_impressoes_boilerplate() if getattr(settings, 'MONITOR_BOILERPLATE_ATIVO', True) else None,
+        )
+
     def _setup_spacy(self): #
         try: #
-            self.nlp = spacy.load("pt_core_news_sm") #
+            from .spacy_normas import carregar_nlp #
+            self._nlp = carregar_nlp() #
             self._configure_matchers() #
-            logger.info("Modelo spaCy 'pt_core_news_sm' carregado com sucesso para uso.") #
-        except OSError: #
-            logger.warning("Modelo spaCy 'pt_core_news_sm' não encontrado. Baixando...") #
-            spacy.cli.download("pt_core_news_sm") #
-            self.nlp = spacy.load("pt_core_news_sm") #
-            self._configure_matchers() #
-            logger.info("Modelo spaCy 'pt_core_news_sm' baixado e carregado com sucesso para uso.") #
         except Exception as e: #
             logger.error(f"Erro ao carregar ou configurar spaCy: {e}", exc_info=True) #
-            self.nlp = None #
+            self._nlp = None #
+            self._spacy_indisponivel = True #
 
     def _get_norma_type_choices_map(self): #
-        mapping = defaultdict(lambda: 'OUTROS') #
-        map_data = { #
-            'lei': 'LEI', 'leis': 'LEI', 'lei complementar': 'LEI', #
-            'leis complementares': 'LEI', 'lc': 'LEI', #
-            'decreto': 'DECRETO', 'decretos': 'DECRETO', 'decreto-lei': 'DECRETO', #
-            'portaria': 'PORTARIA', 'portarias': 'PORTARIA', #
-            'resolucao': 'RESOLUCAO', 'resolucoes': 'RESOLUCAO', 'resolução': 'RESOLUCAO', #
-            'instrucao normativa': 'INSTRUCAO', 'instrução normativa': 'INSTRUCAO', #
-            'instrucao': 'INSTRUCAO', 'in': 'INSTRUCAO', #
-            'ato normativo': 'ATO_NORMATIVO' #
-        } #
-        for key, value in map_data.items(): #
-            mapping[key] = value #
-
-        for choice_key, _ in NormaVigente.TIPO_CHOICES: #
-            mapping[choice_key.lower()] = choice_key #
-        return mapping #
+        return extrator_normas.mapa_tipos_norma() #
     
     def _get_norma_type_for_model(self, extracted_type_string: str) -> str: # Não usado no código atual, mas mantido.
         return self.norma_type_choices_map.get(extracted_type_string.lower().strip(), 'OUTROS') #
 
     def _configure_matchers(self): #
-        if not self.nlp: #
+        if not self._nlp: #
             logger.warning("spaCy (nlp) não está carregado. Matchers não serão configurados.") #
             self.matcher = None #
             return #
-            
-        self.matcher = Matcher(self.nlp.vocab) #
-        logger.info("Matchers spaCy configurados (ou tentativa de configurar, se padrões fossem adicionados).") #
+        # Os padrões de citação de normas ficam no componente "norma_matcher" (spacy_normas.PADROES_NORMA)
+        self.matcher = self._nlp.get_pipe("norma_matcher").matcher #
+        logger.info("Matcher spaCy de citações de normas configurado.") #
 
     def _padronizar_numero_norma(self, numero: str) -> str: #
-        numero_input = str(numero) #
-        numero_limpo = re.sub(r'[^\d./-]', '', numero_input) #
-
-        if not numero_limpo or not re.search(r'\d', numero_limpo): #
-            return "" #
-
-        parts = re.split(r'([./-])', numero_limpo) #
-        final_parts = [] #
-        for part in parts: #
-            if part.isdigit(): #
-                stripped_part = part.lstrip('0') #
-                final_parts.append(stripped_part if stripped_part else '0') #
-            elif part in ('/', '.', '-'): #
-                final_parts.append(part) #
-        
-        numero_processado = "".join(final_parts) #
-        numero_final = numero_processado.strip('./-') #
-        return numero_final #
-    
-    def _extrair_ano_norma(self, numero_norma: str) -> Optional[int]: #
-        match_ano_4_digitos = re.search(r'/(\d{4})\b', numero_norma) #
-        if match_ano_4_digitos: #
-            return int(match_ano_4_digitos.group(1)) #
-        
-        match_ano_2_digitos = re.search(r'/(\d{2})\b', numero_norma) #
-        if match_ano_2_digitos: #
-            ano_curto = int(match_ano_2_digitos.group(1)) #
-            return 2000 + ano_curto if ano_curto < 50 else 1900 + ano_curto #
-        return None #
+        return extrator_normas.padronizar_numero(numero) #
 
+    def _extrair_ano_norma(self, numero_norma: str) -> Optional[int]: #
+        return extrator_normas.extrair_ano(numero_norma) #
 
+    def _normalizar_citacao(self, tipo_bruto: str, numero_bruto: str) -> Optional[Tuple[str, str]]:
+        """
+        Converte tipo/número brutos de uma citação em (tipo do modelo, número/ano).
+        Retorna None para citações sem ano de 4 dígitos.
+        """
+        return extrator_normas.normalizar_citacao(tipo_bruto, numero_bruto)
 
     def extrair_normas(self, texto: str) -> List[Tuple[str, str]]:
-        normas_encontradas_set = set()
-        
-        # Regex ajustado para melhor separação de tipo e número
-        # group(1) = tipo da norma
-        # group(2) = número completo da norma, incluindo ano se junto
-        padrao_norma = re.compile(
-            r'(?i)\b(lei\scomplementar|lei\sordin[áa]ria|lei|decreto-lei|decreto|portaria|resolu[cç][ãa]o|instru[cç][ãa]o\snormativa|ato\snormativo|IN\b|LC\b|EC\b|MP\b|ADE\b)\s+'
-            r'(?:n[º°\.\s]*|n[º°]?\s*)?' # Permite "nº ", "n. ", "n ", ou só o número
-            r'([\d]+(?:[\.,\/\-]\d+)*[\w]*)', # Número: dígitos, pontos, barras, hífens, opcionalmente terminando com letra
-            re.IGNORECASE
-        )
-        for match in padrao_norma.finditer(texto):
-            tipo_bruto = match.group(1).strip()
-            numero_bruto = match.group(2).strip()
-            tipo_normalizado = self.norma_type_choices_map.get(tipo_bruto.lower(), 'OUTROS')
-            numero_padronizado = self._padronizar_numero_norma(numero_bruto)
-            ano_norma = self._extrair_ano_norma(numero_padronizado)
-            valid_tipos = [choice[0] for choice in NormaVigente.TIPO_CHOICES]
-            if tipo_normalizado not in valid_tipos:
-                logger.warning(f"Tipo de norma '{tipo_bruto}' normalizado para '{tipo_normalizado}' não é um TIPO_CHOICES válido. Marcando como OUTROS ou ignorando. Número: {numero_padronizado}")
-            # Só considera normas com número e ano (ano com 4 dígitos)
-            if numero_padronizado and ano_norma and len(str(ano_norma)) == 4:
-                # Remove todos os anos de 4 dígitos do final para evitar duplicidade
-                numero_sem_ano = re.sub(r'(\/\d{4})+$', '', numero_padronizado)
-                # Só adiciona o ano se o número não terminar com /ano
-                if not re.search(rf'/({ano_norma})$', numero_padronizado):
-                    normas_encontradas_set.add((tipo_normalizado, f"{numero_sem_ano}/{ano_norma}"))
-                else:
-                    normas_encontradas_set.add((tipo_normalizado, numero_padronizado))
-            else:
-                # Ignora normas sem ano ou com número muito curto
-                logger.warning(f"Norma ignorada por não conter ano válido ou número muito curto: tipo={tipo_normalizado}, numero='{numero_padronizado}', ano={ano_norma}")
-
-        # ... (resto da lógica com TermoMonitorado permanece igual)
-        termos_normas_db = TermoMonitorado.objects.filter(ativo=True, tipo='NORMA') #
-        for termo_db in termos_normas_db: #
-            if termo_db.variacoes: #
-                numeros_especificos = [self._padronizar_numero_norma(n.strip()) for n in termo_db.variacoes.split(',')] #
-                for num_esp in numeros_especificos: #
-                    if not num_esp: continue #
-                    padrao_especifico = rf'(?i)\b{re.escape(num_esp)}\b' #
-                    if re.search(padrao_especifico, texto): #
-                        # Garante que o tipo do TermoMonitorado seja um tipo válido do modelo
-                        tipo_termo_normalizado = self.norma_type_choices_map.get(termo_db.termo.lower(), 'OUTROS')
-                        normas_encontradas_set.add((tipo_termo_normalizado, num_esp))
-        
-        logger.info(f"Extração por regex encontrou {len(normas_encontradas_set)} normas únicas.") #
-        return list(normas_encontradas_set) #
-
-
-
-    def is_relevante_contabil(self, texto: str, termos_monitorados: Optional[List[str]] = None) -> bool:
+        """
+        Citações de normas por regex e números dos termos NORMA (monitor.utils.extrator_normas).
+        """
+        normas = extrator_normas.extrair_normas(texto)
+        logger.info(f"Extração por regex encontrou {len(normas)} normas únicas.") #
+        return normas
+
+    def contar_normas(self, texto: str) -> Dict[Tuple[str, str], int]:
+        """Como extrair_normas, com o número de menções de cada norma (arestas documento→norma)."""
+        contagem = extrator_normas.contar_normas(texto)
+        logger.info(f"Extração por regex encontrou {len(contagem)} normas únicas.")
+        return contagem
+
+    def extrair_normas_e_entidades_lote(self, textos: List[str], batch_size: Optional[int] = None,
+                                        n_process: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Extrai citações de normas (Matcher de tokens) e entidades nomeadas de vários
+        textos via nlp.pipe, usando vários processos quando configurado. As variações
+        dos termos NORMA entram nos dois caminhos, então spaCy e o fallback por regex
+        (extrator_normas.extrair_normas_lote) devolvem as mesmas normas das variações.
+        Retorna, para cada texto, {'normas': [(tipo, numero)], 'entidades': [(texto, rótulo)]}.
+        """
+        nlp = self.nlp
+        if nlp is None:
+            logger.warning("spaCy indisponível. Usando apenas a extração de normas por regex.")
+            return [{'normas': normas, 'entidades': []} for normas in extrator_normas.extrair_normas_lote(textos)]
+        from .spacy_normas import citacoes_normas
+        batch_size = batch_size or getattr(settings, 'MONITOR_SPACY_BATCH_SIZE', 50)
+        n_process = n_process or getattr(settings, 'MONITOR_SPACY_N_PROCESS', 1)
+        if n_process > 1 and multiprocessing.current_process().daemon:
+            # Workers prefork do Celery são daemônicos e não podem criar processos filhos
+            logger.info("Processo daemônico: nlp.pipe executado com n_process=1.")
+            n_process = 1
+        textos_limitados = [(t or '')[:nlp.max_length] for t in textos]
+        variacoes = extrator_normas.obter_variacoes_norma()
+        resultados = []
+        for texto, doc in zip(textos_limitados, nlp.pipe(textos_limitados, batch_size=batch_size, n_process=n_process)):
+            normas = set(variacoes.buscar(texto))
+            for tipo_bruto, numero_bruto in citacoes_normas(doc):
+                citacao = self._normalizar_citacao(tipo_bruto, numero_bruto)
+                if citacao:
+                    normas.add(citacao)
+            resultados.append({
+                'normas': sorted(normas),
+                'entidades': [(ent.text, ent.label_) for ent in doc.ents],
+            })
+        return resultados
+
+    def is_relevante_contabil(self, texto: str, termos_monitorados: Optional[List[str]] = None,
+                              analise: Optional[AnaliseDocumento] = None) -> bool:
         """
         Verifica se o texto é relevante usando explicitamente os termos monitorados como parâmetro.
-        Se não fornecido, busca os termos monitorados ativos do banco.
+        Se não fornecido, usa o motor de termos (TEXTO e REGEX) do cache do worker,
+        ou as ocorrências já calculadas em `analise`.
+        A comparação ignora acentos, caixa e espaçamento.
         """
-        texto_lower = texto.lower()
         if termos_monitorados is None:
-            termos_objs = TermoMonitorado.objects.filter(ativo=True, tipo='TEXTO')
-            termos_monitorados = [termo.termo for termo in termos_objs]
-            variacoes = []
-            for termo in termos_objs:
-                if termo.variacoes:
-                    variacoes.extend([v.strip() for v in termo.variacoes.split(",") if v.strip()])
-            termos_monitorados.extend(variacoes)
+            resultado = analise.resultado_termos if analise is not None else obter_motor_termos().buscar(texto)
+            encontrados = resultado.termos(tipos=('TEXTO', 'REGEX'))
+            if encontrados:
+                logger.debug(f"Documento relevante encontrado pelos termos monitorados: {[o.termo for o in encontrados]}")
+                return True
+            return False
 
         # Busca direta por termos monitorados e variações
+        texto_normalizado = normalizar_texto(texto)
         for termo in termos_monitorados:
-            if termo.lower() in texto_lower:
+            if normalizar_texto(termo) in texto_normalizado:
                 logger.debug(f"Documento relevante encontrado pelo termo monitorado: {termo}")
                 return True
 
@@ -410,19 +440,27 @@ class PDFProcessor:
         """
         return self.claude_processor._extrair_paragrafos_relevantes(texto)
 
+    @staticmethod
+    def _medir(analise: AnaliseDocumento, etapa: str, funcao, *args, **kwargs):
+        """Executa uma heurística e registra seu tempo (ms) em analise.tempos."""
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            analise.tempos[etapa] = round((time.perf_counter() - inicio) * 1000, 2)
+
 
     def _limpar_e_cortar_impacto(self, texto, limite=500):
         """
         Limpa e corta o texto do impacto fiscal para garantir qualidade e tamanho adequado.
         """
-        texto = re.sub(r'(?i)\b(DECRETOS?|PORTARIAS?|_DECRETOS_|_PORTARIAS_|LEIS|_LEIS_)\b\s*', '', texto)
-        texto = re.sub(r'\(Transcrição da nota.*?\)', '', texto, flags=re.IGNORECASE)
-        texto = re.sub(r'(Policial Penal|Agente de Polícia Civil|SD PM|Sargento QPPM|Professor Adjunto|Comunicadora Social|Assistente Social|Secretária Municipal|Secretaria da Justiça|Secretaria da Segurança Pública|Secretaria de Estado da Educação|Fundação Universidade Estadual|Hospital Getúlio Vargas|Secretaria do Desenvolvimento e Assistência Social|Secretaria de Comunicação Social|Secretaria de Estado da Saúde|Assembleia Legislativa do Estado do Piauí|Gabinete da Deputada Ana Paula|CB PM|RGPM|CPF|Matrícula|Quadro de pessoal)[^\.\n]*[\.\n]', '', texto, flags=re.IGNORECASE)
-        texto = re.sub(r'^[A-Z\s]{8,}$', '', texto, flags=re.MULTILINE)
+        texto = _TITULOS_NORMA_IMPACTO.sub('', texto)
+        texto = _NOTA_TRANSCRICAO.sub('', texto)
+        texto = _ATOS_PESSOAL.sub('', texto)
+        texto = _LINHAS_MAIUSCULAS.sub('', texto)
         texto = re.sub(r'\n{2,}', '\n', texto)
-        termos_fiscais = r'(ICMS|CFOP|benefício fiscal|crédito fiscal|apuração|tributação|imposto|EFD|NF-e|Decreto|Portaria|Lei Complementar|Convênio ICMS|alíquota|base de cálculo|penalidade|incentivo fiscal|regulamentar|homologação|prazo|operações|apuração|tributos)'
         paragrafos = [p.strip() for p in re.split(r'\n{1,}', texto) if p.strip()]
-        relevantes = [p for p in paragrafos if re.search(termos_fiscais, p, re.IGNORECASE)]
+        relevantes = [p for p in paragrafos if _TERMOS_FISCAIS.search(p)]
         if not relevantes:
             relevantes = sorted(paragrafos, key=len, reverse=True)[:3]
         texto_final = '\n'.join(relevantes)
@@ -458,9 +496,13 @@ class PDFProcessor:
         }
 
 
-    def process_document(self, documento: Documento, limite_paginas: int = 3, limite_texto: int = 20000) -> Dict[str, any]:
+    def process_document(self, documento: Documento, limite_paginas: int = 3, limite_texto: int = 20000,
+                         extracao: Optional[Dict[str, Any]] = None) -> Dict[str, any]:
         """
         Processa um documento PDF ou notícia, escolhendo o processamento conforme o tipo/fonte do documento.
+        `extracao` é o item de extrair_normas_e_entidades_lote para o texto limitado do
+        documento (lote processado via nlp.pipe): as normas somam-se às do regex e as
+        entidades vão para metadata.
         """
         logger.info(f"Processando documento ID: {getattr(documento, 'id', 'N/A')}, Título: {getattr(documento, 'titulo', '')[:50]}...")
         if not getattr(documento, 'texto_completo', None):
@@ -474,73 +516,65 @@ class PDFProcessor:
             return {'status': 'FALHA', 'message': 'Texto completo ausente.'}
         try:
             texto = documento.texto_completo
-            paginas = re.split(r'\f|\n{3,}', texto)
-            texto_limitado = '\n'.join(paginas[:limite_paginas]) if len(paginas) > 1 else texto
-            texto_limitado = texto_limitado[:limite_texto]
+            texto_limitado = limitar_texto(texto, limite_paginas, limite_texto)
             fonte = (getattr(documento, 'fonte_documento', '') or '').lower()
             tipo = (getattr(documento, 'tipo_documento', '') or '').upper()
             if fonte == 'contabeis':
                 return self.processar_documento_contabeis(documento, texto_limitado)
-            elif fonte == 'sefaz' or tipo == 'SEFAZ_ICMS':
+            if getattr(settings, 'MONITOR_DUPLICATAS_ATIVO', True) and documento.pk:
+                # Mesmo ato vindo de outra fonte: reaproveita a análise do documento canônico
+                simhash = calcular_simhash(texto)
+                registrar_assinatura(documento, simhash)
+                canonico = encontrar_canonico(simhash, excluir_id=documento.pk)
+                if canonico:
+                    return reaproveitar_analise(documento, *canonico)
+            if fonte == 'sefaz' or tipo == 'SEFAZ_ICMS':
                 return self.processar_sefaz_icms(documento)
             elif tipo == 'OUTRO' or fonte == 'noticia':
                 return self.processar_noticia_outro(documento)
             # ...existing code for normas, boletins, etc. pode ser expandido aqui...
             # Fallback: processamento padrão
             # ...existing code...
-            normas_extraidas_tuplas = self.extrair_normas(texto_limitado)
-            normas_objs_para_relacionar = []
-            normas_strings_para_resumo = []
-            for tipo_norma_ext, numero_norma_processado in normas_extraidas_tuplas:
-                if not numero_norma_processado or len(numero_norma_processado) < 1:
-                    logger.warning(f"Norma ignorada (em process_document) por número inválido ou muito curto: tipo={tipo_norma_ext}, numero='{numero_norma_processado}'")
-                    continue
-                ano_norma = self._extrair_ano_norma(numero_norma_processado)
-                valid_tipos = [choice[0] for choice in NormaVigente.TIPO_CHOICES]
-                tipo_final = tipo_norma_ext if tipo_norma_ext in valid_tipos else 'OUTROS'
-                ementa_modelo_default_field = NormaVigente._meta.get_field('ementa')
-                ementa_para_defaults = ementa_modelo_default_field.default
-                if callable(ementa_para_defaults):
-                    ementa_para_defaults = ementa_para_defaults()
-                try:
-                    norma_obj = NormaVigente.objects.filter(
-                        tipo=tipo_final,
-                        numero=numero_norma_processado,
-                        ano=ano_norma
-                    ).first()
-                    if not norma_obj:
-                        norma_obj = NormaVigente.objects.create(
-                            tipo=tipo_final,
-                            numero=numero_norma_processado,
-                            ano=ano_norma,
-                            data_ultima_mencao=getattr(documento, 'data_publicacao', None),
-                            ementa=ementa_para_defaults,
-                            situacao='A_VERIFICAR'
-                        )
-                        norma_obj.ementa = f"Extraída do documento '{getattr(documento, 'titulo', '')}'"
-                        norma_obj.save(update_fields=['ementa'])
-                    elif getattr(documento, 'data_publicacao', None):
-                        if not norma_obj.data_ultima_mencao or getattr(documento, 'data_publicacao', None) > norma_obj.data_ultima_mencao:
-                            norma_obj.data_ultima_mencao = getattr(documento, 'data_publicacao', None)
-                            norma_obj.save(update_fields=['data_ultima_mencao'])
-                    normas_objs_para_relacionar.append(norma_obj)
-                    normas_strings_para_resumo.append(f"{norma_obj.get_tipo_display()} {norma_obj.numero}" + (f"/{norma_obj.ano}" if norma_obj.ano else ""))
-                except ValidationError as e_val:
-                    logger.error(f"Erro de VALIDAÇÃO ao criar/obter NormaVigente para tipo={tipo_final}, numero={numero_norma_processado}, ano={ano_norma}: {e_val.message_dict if hasattr(e_val, 'message_dict') else e_val}", exc_info=False)
-                    continue
-                except Exception as e_norma:
-                    logger.error(f"Erro GENÉRICO ao criar/obter NormaVigente para tipo={tipo_final}, numero={numero_norma_processado}, ano={ano_norma}: {e_norma}", exc_info=True)
-                    continue
-            termos_monitorados_ativos = list(TermoMonitorado.objects.filter(ativo=True, tipo='TEXTO').values_list('termo', flat=True))
-            relevante_contabil = self.is_relevante_contabil(texto_limitado, termos_monitorados_ativos)
+            # Análise única do documento: cada etapa roda uma vez e tem o tempo registrado
+            analise = self.analisar(texto, texto_limitado)
+            # Normas citadas: busca/criação em lote, relações e contagem de menções (CitacaoNorma)
+            contagem_normas = dict(analise.contagem_normas)
+            for citacao in (extracao or {}).get('normas', ()):
+                contagem_normas.setdefault(tuple(citacao), 1)
+            try:
+                normas_objs_para_relacionar = registrar_normas_citadas([(documento, contagem_normas)]).get(documento.pk, [])
+            except Exception as e_norma:
+                logger.error(f"Erro ao registrar normas citadas pelo documento ID {getattr(documento, 'id', 'N/A')}: {e_norma}", exc_info=True)
+                normas_objs_para_relacionar = []
+            normas_strings_para_resumo = [
+                f"{norma_obj.get_tipo_display()} {norma_obj.numero}" + (f"/{norma_obj.ano}" if norma_obj.ano else "")
+                for norma_obj in normas_objs_para_relacionar
+            ]
+            termos_monitorados_ativos = obter_termos_ativos().termos_texto
+            # Passada única do motor de termos: relevância, score e índice de ocorrências
+            resultado_termos = analise.resultado_termos
+            score_relevancia = analise.score_relevancia
+            relevante_contabil = score_relevancia > 0
             documento.relevante_contabil = relevante_contabil
+            documento.score_relevancia = score_relevancia
+            documento.score_classificador = None  # reclassificado pela etapa em lote
             documento.assunto = "Contábil/Fiscal" if relevante_contabil else "Geral"
-            if relevante_contabil:
+            score_minimo = getattr(settings, 'MONITOR_SCORE_MINIMO_RESUMO', 1.0)
+            if relevante_contabil and score_relevancia < score_minimo:
+                logger.info(f"Documento ID {getattr(documento, 'id', 'N/A')} é relevante, mas o score {score_relevancia} está abaixo de {score_minimo}. Resumo IA pulado.")
+                documento.resumo_ia = "Documento relevante com score abaixo do limiar para análise detalhada."
+                documento.sentimento_ia = "NEUTRO"
+                documento.impacto_fiscal = "Não analisado."
+                documento.metadata = {
+                    'ia_relevancia_justificativa': "Termos monitorados encontrados, score abaixo do limiar de resumo.",
+                    'score_minimo_resumo': score_minimo,
+                }
+            elif relevante_contabil:
                 logger.info(f"Documento ID {getattr(documento, 'id', 'N/A')} é relevante. Prosseguindo com análise IA detalhada.")
-                paragrafos_relevantes = self._extrair_paragrafos_relevantes(texto_limitado)
-                documento.resumo_ia = self.claude_processor.gerar_resumo_contabil(paragrafos_relevantes, termos_monitorados_ativos)
-                documento.sentimento_ia = self.claude_processor.analisar_sentimento_contabil(paragrafos_relevantes)
-                impacto_fiscal_texto = self.claude_processor.identificar_impacto_fiscal(paragrafos_relevantes, termos_monitorados_ativos)
+                paragrafos_relevantes = analise.paragrafos_relevantes
+                documento.resumo_ia = self._medir(analise, 'resumo', self.claude_processor.gerar_resumo_contabil, paragrafos_relevantes, termos_monitorados_ativos, analise=analise)
+                documento.sentimento_ia = self._medir(analise, 'sentimento', self.claude_processor.analisar_sentimento_contabil, paragrafos_relevantes, analise=analise)
+                impacto_fiscal_texto = self._medir(analise, 'impacto_fiscal', self.claude_processor.identificar_impacto_fiscal, paragrafos_relevantes, termos_monitorados_ativos, analise=analise)
                 documento.impacto_fiscal = self._limpar_e_cortar_impacto(impacto_fiscal_texto) if impacto_fiscal_texto else None
                 documento.metadata = {
                     'ia_modelo_usado': self.claude_processor.default_model,
@@ -560,18 +594,37 @@ class PDFProcessor:
             for k, v in doc_dict.items():
                 if hasattr(documento, k):
                     setattr(documento, k, v)
+            documento.metadata = {
+                **(documento.metadata or {}),
+                'tempos_analise_ms': analise.tempos,
+                'paragrafos_boilerplate_descartados': analise.paragrafos_descartados,
+            }
+            if extracao and extracao.get('entidades'):
+                documento.metadata['entidades'] = [list(entidade) for entidade in extracao['entidades'][:MAX_ENTIDADES_METADATA]]
             documento.save()
-            if normas_objs_para_relacionar:
-                documento.normas_relacionadas.set(normas_objs_para_relacionar)
-            logger.info(f"Documento ID {getattr(documento, 'id', 'N/A')} processado. Relevante: {relevante_contabil}. Normas relacionadas: {len(normas_objs_para_relacionar)}")
+            try:
+                # Índice de ocorrências sobre o texto completo (não só o trecho analisado)
+                registrar_ocorrencias(documento, resultado_termos)
+            except Exception as e_indice:
+                logger.error(f"Erro ao indexar ocorrências de termos do documento ID {getattr(documento, 'id', 'N/A')}: {e_indice}", exc_info=True)
+            if getattr(settings, 'MONITOR_BOILERPLATE_ATIVO', True):
+                try:
+                    registrar_paragrafos(dividir_paragrafos(texto), documento_id=documento.id)
+                    documento.paragrafos_registrados = True
+                except Exception as e_boilerplate:
+                    logger.error(f"Erro ao registrar parágrafos recorrentes do documento ID {getattr(documento, 'id', 'N/A')}: {e_boilerplate}", exc_info=True)
+            logger.info(f"Documento ID {getattr(documento, 'id', 'N/A')} processado. Relevante: {relevante_contabil} (score {score_relevancia}). Normas relacionadas: {len(normas_objs_para_relacionar)}")
+            logger.debug(f"Tempos da análise do documento ID {getattr(documento, 'id', 'N/A')} (ms): {analise.tempos} | total {analise.tempo_total}")
             return {
                 'status': 'SUCESSO' if relevante_contabil else 'IGNORADO_IRRELEVANTE',
                 'message': 'Documento processado.',
                 'relevante_contabil': relevante_contabil,
+                'score_relevancia': score_relevancia,
                 'normas_extraidas': normas_strings_para_resumo,
                 'resumo_ia': documento.resumo_ia,
                 'sentimento_ia': documento.sentimento_ia,
                 'impacto_fiscal': documento.impacto_fiscal,
+                'tempos_analise_ms': analise.tempos,
             }
         except Exception as e:
             logger.error(f"Erro crítico ao processar documento ID {getattr(documento, 'id', 'N/A')}: {e}", exc_info=True)
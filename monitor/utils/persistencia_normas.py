@@ -0,0 +1,223 @@
+# monitor/utils/persistencia_normas.py
+"""
+Gravação em lote das normas citadas pelos documentos.
+
+Em vez de filter().first() + create() + save() por norma e um .set() por
+documento, todas as citações de um ou vários documentos são resolvidas com
+um número fixo de consultas:
+
+    1. SELECT ... WHERE numero IN (...)            normas já existentes
+    2. INSERT (bulk_create, ignore_conflicts)       normas novas
+    3. SELECT ... WHERE numero IN (...)            ids das novas (MySQL não os devolve)
+    4. UPDATE ... WHERE data_ultima_mencao < data   maior data de publicação por norma
+    5. DELETE + INSERT na tabela intermediária      Documento.normas_relacionadas
+    6. DELETE + INSERT em CitacaoNorma              mesmas arestas, com o número de menções
+
+Com MONITOR_INDICE_NORMAS_ATIVO, as consultas 1 e 3 passam antes pelo índice
+de identidade do worker (indice_normas) e só as chaves ausentes vão ao banco;
+o UPDATE da etapa 4 é pulado quando o índice já conhece uma data igual ou maior.
+O que foi lido ou criado só entra no índice depois do commit: um rollback não
+deixa ids de normas inexistentes no índice.
+
+Como bulk_create não chama save()/full_clean(), as regras de NormaVigente.clean()
+(tipo e número obrigatórios, número com pelo menos 3 caracteres) são aplicadas aqui.
+"""
+import logging
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from monitor.models import CitacaoNorma, Documento, NormaVigente
+
+logger = logging.getLogger(__name__)
+
+Chave = Tuple[str, str, Optional[int]]  # (tipo, numero, ano)
+
+TAMANHO_MINIMO_NUMERO = 3
+TAMANHO_MAXIMO_NUMERO = NormaVigente._meta.get_field('numero').max_length
+TIPOS_VALIDOS = frozenset(choice[0] for choice in NormaVigente.TIPO_CHOICES)
+
+
+def chave_norma(tipo: str, numero: str) -> Optional[Chave]:
+    """
+    (tipo, numero, ano) de uma citação já normalizada, ou None se ela não passaria
+    em NormaVigente.clean().
+    """
+    from .extrator_normas import extrair_ano
+    tipo_final = tipo if tipo in TIPOS_VALIDOS else 'OUTROS'
+    if not numero or len(numero) < TAMANHO_MINIMO_NUMERO or len(numero) > TAMANHO_MAXIMO_NUMERO:
+        logger.warning(f"Norma ignorada por número inválido ou muito curto: tipo={tipo_final}, numero='{numero}'")
+        return None
+    return (tipo_final, numero, extrair_ano(numero))
+
+
+def _indice():
+    if not getattr(settings, 'MONITOR_INDICE_NORMAS_ATIVO', True):
+        return None
+    from .indice_normas import obter_indice_normas
+    try:
+        return obter_indice_normas()
+    except Exception as e:
+        logger.warning(f"Índice de normas indisponível, consultando o banco: {e}")
+        return None
+
+
+def _buscar(chaves: Iterable[Chave]) -> Dict[Chave, NormaVigente]:
+    """
+    Normas existentes por chave. As que estão no índice do worker viram instâncias
+    montadas sem consulta (só id, tipo, numero, ano e data_ultima_mencao); as demais
+    são buscadas no banco e entram no índice.
+    """
+    chaves = set(chaves)
+    if not chaves:
+        return {}
+    encontradas = {}
+    indice = _indice()
+    if indice is not None:
+        for chave in chaves:
+            registro = indice.obter(chave)
+            if registro is not None:
+                tipo, numero, ano = chave
+                encontradas[chave] = NormaVigente(id=registro[0], tipo=tipo, numero=numero, ano=ano, data_ultima_mencao=registro[1])
+    faltantes = chaves.difference(encontradas)
+    if not faltantes:
+        return encontradas
+    numeros = {numero for _, numero, _ in faltantes}
+    do_banco = {}
+    for norma in NormaVigente.objects.filter(numero__in=numeros):
+        chave = (norma.tipo, norma.numero, norma.ano)
+        if chave in faltantes:
+            do_banco.setdefault(chave, norma)
+    if indice is not None and do_banco:
+        from .indice_normas import registrar_normas
+        registros = [(chave, norma.pk, norma.data_ultima_mencao) for chave, norma in do_banco.items()]
+        transaction.on_commit(lambda: registrar_normas(registros))
+    encontradas.update(do_banco)
+    return encontradas
+
+
+def _avancar_mencoes(normas: Sequence[NormaVigente]) -> None:
+    """
+    Grava data_ultima_mencao com um UPDATE por data distinta, condicionado a a data
+    gravada ser menor: uma data desatualizada no índice nunca faz o banco regredir.
+    """
+    ids_por_data: Dict[object, List[int]] = {}
+    for norma in normas:
+        ids_por_data.setdefault(norma.data_ultima_mencao, []).append(norma.pk)
+    for data, ids in ids_por_data.items():
+        NormaVigente.objects.filter(
+            Q(data_ultima_mencao__isnull=True) | Q(data_ultima_mencao__lt=data), pk__in=ids
+        ).update(data_ultima_mencao=data)
+    indice = _indice()
+    if indice is not None:
+        from .indice_normas import registrar_normas
+        registros = [((n.tipo, n.numero, n.ano), n.pk, n.data_ultima_mencao) for n in normas]
+        transaction.on_commit(lambda: registrar_normas(registros))
+
+
+def obter_ou_criar_normas(mencoes: Dict[Chave, dict]) -> Dict[Chave, NormaVigente]:
+    """
+    `mencoes` mapeia cada chave para {'data': maior data de menção, 'titulo': título
+    do documento que a citou}. Cria as normas que faltam e avança
+    data_ultima_mencao das existentes. Retorna chave -> NormaVigente (com id).
+    """
+    if not mencoes:
+        return {}
+    existentes = _buscar(mencoes)
+    novas = [
+        NormaVigente(
+            tipo=tipo,
+            numero=numero,
+            ano=ano,
+            data_ultima_mencao=mencoes[(tipo, numero, ano)].get('data'),
+            ementa=f"Extraída do documento '{mencoes[(tipo, numero, ano)].get('titulo', '')}'",
+            situacao='A_VERIFICAR',
+        )
+        for tipo, numero, ano in mencoes if (tipo, numero, ano) not in existentes
+    ]
+    if novas:
+        NormaVigente.objects.bulk_create(novas, ignore_conflicts=True)
+        existentes.update(_buscar(chave for chave in mencoes if chave not in existentes))
+
+    atualizar = []
+    for chave, norma in existentes.items():
+        data = mencoes[chave].get('data')
+        if data and (not norma.data_ultima_mencao or data > norma.data_ultima_mencao):
+            norma.data_ultima_mencao = data
+            atualizar.append(norma)
+    if atualizar:
+        _avancar_mencoes(atualizar)
+    logger.debug(f"Normas citadas: {len(mencoes)} ({len(novas)} novas, {len(atualizar)} com data de menção atualizada).")
+    return existentes
+
+
+def relacionar_normas(normas_por_documento: Dict[int, Union[Mapping[int, int], Sequence[int]]]) -> int:
+    """
+    Substitui Documento.normas_relacionadas dos documentos informados (mesmo efeito
+    de .set()) com um DELETE e um INSERT em lote na tabela intermediária, e grava
+    as mesmas arestas em CitacaoNorma. Cada documento mapeia para os ids das normas
+    ou para {id da norma: menções}.
+    """
+    Relacao = Documento.normas_relacionadas.through
+    if not normas_por_documento:
+        return 0
+    mencoes_por_documento = {
+        documento_id: dict(normas) if isinstance(normas, Mapping) else dict.fromkeys(normas, 1)
+        for documento_id, normas in normas_por_documento.items()
+    }
+    documentos_ids = list(mencoes_por_documento)
+    Relacao.objects.filter(documento_id__in=documentos_ids).delete()
+    CitacaoNorma.objects.filter(documento_id__in=documentos_ids).delete()
+    linhas = [
+        Relacao(documento_id=documento_id, normavigente_id=norma_id)
+        for documento_id, mencoes in mencoes_por_documento.items()
+        for norma_id in mencoes
+    ]
+    Relacao.objects.bulk_create(linhas, ignore_conflicts=True)
+    CitacaoNorma.objects.bulk_create([
+        CitacaoNorma(documento_id=documento_id, norma_id=norma_id, mencoes=max(quantidade, 1))
+        for documento_id, mencoes in mencoes_por_documento.items()
+        for norma_id, quantidade in mencoes.items()
+    ], ignore_conflicts=True)
+    return len(linhas)
+
+
+def registrar_normas_citadas(
+    citacoes_por_documento: Sequence[Tuple[Documento, Union[Mapping[Tuple[str, str], int], Iterable[Tuple[str, str]]]]]
+) -> Dict[int, List[NormaVigente]]:
+    """
+    Grava as normas citadas por vários documentos de uma vez.
+    Recebe [(documento, {(tipo, numero): menções} ou [(tipo, numero), ...]), ...]
+    e retorna documento.id -> normas.
+    """
+    mencoes: Dict[Chave, dict] = {}
+    chaves_por_documento: Dict[int, Dict[Chave, int]] = {}
+    for documento, citacoes in citacoes_por_documento:
+        data = getattr(documento, 'data_publicacao', None)
+        itens = citacoes.items() if isinstance(citacoes, Mapping) else ((citacao, 1) for citacao in citacoes)
+        chaves: Dict[Chave, int] = {}
+        for (tipo, numero), quantidade in itens:
+            chave = chave_norma(tipo, numero)
+            if chave is None:
+                continue
+            # Citações diferentes podem cair na mesma chave (ex.: tipo inválido -> OUTROS)
+            chaves[chave] = chaves.get(chave, 0) + quantidade
+            mencao = mencoes.setdefault(chave, {'data': data, 'titulo': getattr(documento, 'titulo', '')})
+            if data and (not mencao['data'] or data > mencao['data']):
+                mencao['data'] = data
+        chaves_por_documento[documento.pk] = chaves
+
+    with transaction.atomic():
+        normas = obter_ou_criar_normas(mencoes)
+        resultado = {
+            documento_id: [normas[c] for c in chaves if c in normas]
+            for documento_id, chaves in chaves_por_documento.items()
+        }
+        # Como antes, documentos sem normas válidas mantêm as relações que já tinham
+        relacionar_normas({
+            documento_id: {normas[c].pk: quantidade for c, quantidade in chaves.items() if c in normas}
+            for documento_id, chaves in chaves_por_documento.items() if resultado[documento_id]
+        })
+    return resultado
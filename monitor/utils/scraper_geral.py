@@ -269,72 +269,83 @@ class DiarioOficialScraper:
                 return True
         return False
 
-    def coletar_e_salvar_documentos(self):
-        # Coleta apenas documentos do dia da execução e filtra pela data de publicação no texto.
-        documentos_salvos = []
-        hoje = datetime.now().date()
+    def iterar_documentos(self, ignorar=(), data=None):
+        """
+        Gera, um por vez, os PDFs do dia que passam nos filtros (data de publicação no texto
+        e termos prioritários): dict com url_original, data_publicacao, assunto, conteudo
+        (bytes) e texto. O PDF seguinte só é baixado quando o consumidor pede o próximo.
+        URLs em `ignorar` (ex.: já concluídas numa execução retomada) não são baixadas.
+        `data` troca o dia coletado (padrão: hoje), ex.: o dia em que a execução retomada começou.
+        """
+        hoje = data or datetime.now().date()
         hoje_str = hoje.strftime('%d de %B de %Y').lower()
         logger.info(f"Processando diário para a data: {hoje.strftime('%Y-%m-%d')}")
         url_diario = f"{self.BASE_URL}?data={hoje.strftime('%d-%m-%Y')}"
-        links_pdf_para_data = self._extrair_links_pdf(url_diario)
+        try:
+            links_pdf_para_data = self._extrair_links_pdf(url_diario)
+        finally:
+            self._fechar_webdriver()
         if not links_pdf_para_data:
             logger.info(f"Nenhum PDF encontrado para a data {hoje.strftime('%Y-%m-%d')}")
-        else:
-            for index, pdf_url in enumerate(links_pdf_para_data):
-                logger.info(f"Baixando PDF {index + 1}/{len(links_pdf_para_data)}: {pdf_url}")
-                pdf_content = self._baixar_pdf(pdf_url)
-                if pdf_content:
-                    logger.info(f"Iniciando extração de texto de PDF: {pdf_url.split('/')[-1]}")
-                    texto_extraido = self._extrair_texto_de_pdf(pdf_content)
-                    if texto_extraido:
-                        texto_lower = texto_extraido.lower()
-                        if hoje_str not in texto_lower:
-                            logger.info(f"PDF ignorado (data de publicação diferente do dia atual): {pdf_url}")
-                            continue
-                        if not self._contem_termos_prioritarios(texto_extraido):
-                            logger.info(f"PDF não contém termos monitorados. Ignorando.")
-                            continue
-                        assunto_geral = "Contábil/Fiscal"
-                        try:
-                            file_name = pdf_url.split('/')[-1]
-                            # Salva PDF e texto localmente
-                            pasta_destino = "pdfs_diario_oficial"
-                            os.makedirs(pasta_destino, exist_ok=True)
-                            caminho_pdf = os.path.join(pasta_destino, file_name)
-                            with open(caminho_pdf, "wb") as f:
-                                f.write(pdf_content)
-                            caminho_txt = os.path.join(pasta_destino, file_name.replace('.pdf', '.txt'))
-                            with open(caminho_txt, "w", encoding="utf-8") as f:
-                                f.write(texto_extraido)
-                            documentos_salvos.append({
-                                "arquivo_pdf": caminho_pdf,
-                                "arquivo_txt": caminho_txt,
-                                "url_original": pdf_url,
-                                "data_publicacao": str(hoje),
-                                "assunto": assunto_geral
-                            })
-                            logger.info(f"Documento '{file_name}' salvo localmente.")
-                        except Exception as db_e:
-                            logger.error(f"Erro ao salvar documento {pdf_url}: {db_e}", exc_info=True)
-                    else:
-                        logger.warning(f"Não foi possível extrair texto de {pdf_url}.")
-                else:
-                    logger.warning(f"Não foi possível baixar o PDF de {pdf_url}.")
-        self._fechar_webdriver()
+            return
+        for index, pdf_url in enumerate(links_pdf_para_data):
+            if pdf_url in ignorar:
+                continue
+            logger.info(f"Baixando PDF {index + 1}/{len(links_pdf_para_data)}: {pdf_url}")
+            pdf_content = self._baixar_pdf(pdf_url)
+            if not pdf_content:
+                logger.warning(f"Não foi possível baixar o PDF de {pdf_url}.")
+                continue
+            logger.info(f"Iniciando extração de texto de PDF: {pdf_url.split('/')[-1]}")
+            texto_extraido = self._extrair_texto_de_pdf(pdf_content)
+            if not texto_extraido:
+                logger.warning(f"Não foi possível extrair texto de {pdf_url}.")
+                continue
+            if hoje_str not in texto_extraido.lower():
+                logger.info(f"PDF ignorado (data de publicação diferente do dia atual): {pdf_url}")
+                continue
+            if not self._contem_termos_prioritarios(texto_extraido):
+                logger.info(f"PDF não contém termos monitorados. Ignorando.")
+                continue
+            yield {
+                "url_original": pdf_url,
+                "data_publicacao": str(hoje),
+                "assunto": "Contábil/Fiscal",
+                "conteudo": pdf_content,
+                "texto": texto_extraido,
+            }
+
+    def coletar_e_salvar_documentos(self):
+        # Coleta apenas documentos do dia da execução e filtra pela data de publicação no texto.
+        documentos_salvos = []
+        for documento in self.iterar_documentos():
+            pdf_url = documento["url_original"]
+            try:
+                file_name = pdf_url.split('/')[-1]
+                # Salva PDF e texto localmente
+                pasta_destino = "pdfs_diario_oficial"
+                os.makedirs(pasta_destino, exist_ok=True)
+                caminho_pdf = os.path.join(pasta_destino, file_name)
+                with open(caminho_pdf, "wb") as f:
+                    f.write(documento["conteudo"])
+                caminho_txt = os.path.join(pasta_destino, file_name.replace('.pdf', '.txt'))
+                with open(caminho_txt, "w", encoding="utf-8") as f:
+                    f.write(documento["texto"])
+                documentos_salvos.append({
+                    "arquivo_pdf": caminho_pdf,
+                    "arquivo_txt": caminho_txt,
+                    "url_original": pdf_url,
+                    "data_publicacao": documento["data_publicacao"],
+                    "assunto": documento["assunto"]
+                })
+                logger.info(f"Documento '{file_name}' salvo localmente.")
+            except Exception as db_e:
+                logger.error(f"Erro ao salvar documento {pdf_url}: {db_e}", exc_info=True)
         return documentos_salvos
 
     def _log_termos_encontrados(self, texto: str):
-        from monitor.models import TermoMonitorado
-        termos_encontrados = []
-        termos = TermoMonitorado.objects.filter(ativo=True)
-        for termo_obj in termos:
-            termos_verificar = [termo_obj.termo]
-            if termo_obj.variacoes:
-                termos_verificar.extend([v.strip() for v in termo_obj.variacoes.split(',')])
-            for termo in termos_verificar:
-                if termo.upper() in texto.upper():
-                    termos_encontrados.append(termo_obj.termo)
-                    break
+        from monitor.utils.busca_termos import obter_motor_termos
+        termos_encontrados = [o.termo for o in obter_motor_termos().buscar(texto).termos()]
         if termos_encontrados:
             logger.info(f"Termos encontrados no documento: {', '.join(termos_encontrados)}")
 
@@ -442,19 +453,10 @@ class SEFAZScraper:
 
     def _contem_termos_prioritarios(self, texto: str) -> bool:
         try:
-            from monitor.models import TermoMonitorado
+            from monitor.utils.busca_termos import obter_motor_termos
         except ImportError:
             return False
-        termos = TermoMonitorado.objects.filter(ativo=True).order_by('-prioridade')
-        texto_upper = texto.upper()
-        for termo_obj in termos:
-            termos_verificar = [termo_obj.termo]
-            if termo_obj.variacoes:
-                termos_verificar.extend([v.strip() for v in termo_obj.variacoes.split(',')])
-            for termo in termos_verificar:
-                if termo.upper() in texto_upper:
-                    return True
-        return False
+        return obter_motor_termos().contem(texto)
 
     @contextmanager
     def browser_session(self):
@@ -498,13 +500,14 @@ class SEFAZScraper:
     def _clean_number(self, number):
         return re.sub(r'[^0-9/]', '', number).lower()
 
-    def coletar_documentos(self, data_inicio=None, data_fim=None):
-        # Coleta apenas documentos cuja data de publicação seja igual ao dia de execução.
-        documentos_salvos = []
-        hoje = datetime.now().date()
+    def iterar_documentos(self, data_inicio=None, data_fim=None, ignorar=(), data=None):
+        """Gera, um por vez, os PDFs publicados em `data` (padrão: hoje) com relevância fiscal (ver DiarioOficialScraper.iterar_documentos)."""
+        hoje = data or datetime.now().date()
         hoje_str = hoje.strftime('%d de %B de %Y').lower()
         lista_urls = self._obter_lista_pdfs(data_inicio, data_fim)
         for pdf_url in lista_urls:
+            if pdf_url in ignorar:
+                continue
             try:
                 pdf_content = self._baixar_pdf(pdf_url)
                 if not pdf_content:
@@ -512,28 +515,44 @@ class SEFAZScraper:
                 texto_extraido = self._extrair_texto_de_pdf(pdf_content)
                 if not texto_extraido:
                     continue
-                texto_lower = texto_extraido.lower()
-                if hoje_str not in texto_lower:
-                    self.logger.info(f"PDF ignorado (data de publicação diferente do dia atual): {pdf_url}")
-                    continue
-                if not self._contem_termos_prioritarios(texto_extraido):
-                    self.logger.info(f"PDF ignorado (sem relevância fiscal/contábil): {pdf_url}")
-                    continue
+            except Exception as e:
+                self.logger.error(f"Erro ao baixar documento {pdf_url}: {e}", exc_info=True)
+                continue
+            if hoje_str not in texto_extraido.lower():
+                self.logger.info(f"PDF ignorado (data de publicação diferente do dia atual): {pdf_url}")
+                continue
+            if not self._contem_termos_prioritarios(texto_extraido):
+                self.logger.info(f"PDF ignorado (sem relevância fiscal/contábil): {pdf_url}")
+                continue
+            yield {
+                "url_original": pdf_url,
+                "data_publicacao": str(hoje),
+                "assunto": "Contábil/Fiscal",
+                "conteudo": pdf_content,
+                "texto": texto_extraido,
+            }
+
+    def coletar_documentos(self, data_inicio=None, data_fim=None):
+        # Coleta apenas documentos cuja data de publicação seja igual ao dia de execução.
+        documentos_salvos = []
+        for documento in self.iterar_documentos(data_inicio, data_fim):
+            pdf_url = documento["url_original"]
+            try:
                 file_name = pdf_url.split('/')[-1]
                 pasta_destino = "pdfs_sefaz"
                 os.makedirs(pasta_destino, exist_ok=True)
                 caminho_pdf = os.path.join(pasta_destino, file_name)
                 with open(caminho_pdf, "wb") as f:
-                    f.write(pdf_content)
+                    f.write(documento["conteudo"])
                 caminho_txt = os.path.join(pasta_destino, file_name.replace('.pdf', '.txt'))
                 with open(caminho_txt, "w", encoding="utf-8") as f:
-                    f.write(texto_extraido)
+                    f.write(documento["texto"])
                 documentos_salvos.append({
                     "arquivo_pdf": caminho_pdf,
                     "arquivo_txt": caminho_txt,
                     "url_original": pdf_url,
-                    "data_publicacao": str(hoje),
-                    "assunto": "Contábil/Fiscal"
+                    "data_publicacao": documento["data_publicacao"],
+                    "assunto": documento["assunto"]
                 })
                 self.logger.info(f"Documento '{file_name}' salvo localmente.")
             except Exception as e:
@@ -707,7 +726,18 @@ class SEFAZScraper:
                 "erro": "Tipo ou número da norma inválidos",
                 "vigente": False
             }
-        details = self.get_norm_details(norm_type, norm_number)
+        details = None
+        origem = 'PORTAL'
+        try:
+            # Espelho local do catálogo (catalogo_sefaz); o portal ao vivo só em caso de falta
+            from monitor.utils.catalogo_sefaz import consultar_catalogo
+            details = consultar_catalogo(norm_type, norm_number)
+            if details:
+                origem = 'CATALOGO'
+        except Exception as e:
+            self.logger.warning(f"Falha ao consultar o catálogo local para {norm_type} {norm_number}: {e}")
+        if not details:
+            details = self.get_norm_details(norm_type, norm_number)
         if not details:
             return {
                 "status": "NAO_ENCONTRADA",
@@ -722,10 +752,16 @@ class SEFAZScraper:
             status = "VIGENTE"
         else:
             status = "NAO_VIGENTE"
+        try:
+            from monitor.utils.grafo_normas import registrar_detalhes_sefaz
+            registrar_detalhes_sefaz(norm_type, norm_number, details)
+        except Exception as e:
+            self.logger.warning(f"Não foi possível registrar as relações de {norm_type} {norm_number}: {e}")
         return {
             "status": status,
             "vigente": status == "VIGENTE",
-            "fonte": self.driver.current_url if self.driver else None,
+            "fonte": details.get('url') if origem == 'CATALOGO' else (self.driver.current_url if self.driver else None),
+            "origem": origem,
             "dados": details
         }
 
@@ -760,85 +796,101 @@ class SEFAZICMSScraper:
         self.chrome_options.add_argument('--disable-gpu')
         self.chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
 
-    def coletar_documentos(self):
+    def descobrir_documentos(self, data=None):
+        return list(self.iterar_descobertos(data))
+
+    def iterar_descobertos(self, data=None):
+        """
+        Navega pelas "Últimas Normas ICMS" e gera os cards publicados em `data` (padrão: hoje)
+        (titulo, data_publicacao, url_original, resumo) à medida que são abertos,
+        sem baixar os PDFs. O navegador é fechado quando o gerador termina ou é fechado.
+        """
         from selenium import webdriver
         from selenium.webdriver.common.by import By
         from selenium.webdriver.common.action_chains import ActionChains
         import time
-        import requests
-        import os
         import re
         from datetime import datetime
-        # Removido dependência do Django. Salvando dados localmente.
 
         driver = webdriver.Chrome(options=self.chrome_options)
         driver.get("https://portaldalegislacao.sefaz.pi.gov.br/inicio")
         time.sleep(5)
 
-        documentos_salvos = []
-        hoje = datetime.now().date()
+        hoje = data or datetime.now().date()
         hoje_str = hoje.strftime('%d de %B de %Y').lower()
-        elementos = driver.find_elements(By.CSS_SELECTOR, "div.text-title-content.cursor-pointer")
-        norma_icms = None
-        for el in elementos:
-            if "Últimas Normas ICMS" in el.text:
-                norma_icms = el
-                break
-
-        if norma_icms:
-            ActionChains(driver).move_to_element(norma_icms).click(norma_icms).perform()
-            time.sleep(3)
-
-            cards = driver.find_elements(By.CSS_SELECTOR, "h1.cursor-pointer")
-            for card in cards:
-                titulo = card.text.strip()
-                ActionChains(driver).move_to_element(card).click(card).perform()
-                time.sleep(5)
-                try:
-                    publicacao = driver.find_element(By.XPATH, "//*[contains(text(),'Publicação')]").text
-                    match = re.search(r'(\d{2} de [a-zç]+ de \d{4})', publicacao.lower())
-                    data_publicacao = None
-                    if match:
-                        data_str = match.group(1)
-                        data_publicacao = data_str
-                    if not data_publicacao or hoje_str != data_publicacao:
-                        continue
-                    ementa = driver.find_element(By.XPATH, "//*[contains(text(),'Ementa')]").text
-                    div_baixar = driver.find_element(By.XPATH, "//div[contains(@class, 'button-text') and text()='Baixar']")
-                    link_baixar = div_baixar.find_element(By.XPATH, "..")
-                    href_baixar = link_baixar.get_attribute("href")
-                    pdf_links = driver.find_elements(By.XPATH, "//a[contains(@href, '.pdf')]")
-                    href_baixar = None
-                    for link in pdf_links:
-                        if link.is_displayed():
-                            href_baixar = link.get_attribute("href")
-                            break
-                    if href_baixar:
-                        response = requests.get(href_baixar)
-                        if response.status_code == 200:
-                            nome_arquivo = href_baixar.split('/')[-1]
-                            caminho_arquivo = os.path.join('pdfs_sefaz', nome_arquivo)
-                            os.makedirs('pdfs_sefaz', exist_ok=True)
-                            with open(caminho_arquivo, 'wb') as f:
-                                f.write(response.content)
-                            documentos_salvos.append({
-                                "titulo": titulo,
-                                "data_publicacao": data_publicacao,
-                                "url_original": href_baixar,
-                                "arquivo_pdf": caminho_arquivo,
-                                "resumo": ementa
-                            })
-                        else:
-                            pass
-                except Exception as e:
-                    pass
-                try:
-                    btn_fechar = driver.find_element(By.CSS_SELECTOR, "button.p-dialog-header-close")
-                    btn_fechar.click()
-                    time.sleep(1)
-                except Exception as e:
-                    pass
-        driver.quit()
+        try:
+            elementos = driver.find_elements(By.CSS_SELECTOR, "div.text-title-content.cursor-pointer")
+            norma_icms = None
+            for el in elementos:
+                if "Últimas Normas ICMS" in el.text:
+                    norma_icms = el
+                    break
+
+            if norma_icms:
+                ActionChains(driver).move_to_element(norma_icms).click(norma_icms).perform()
+                time.sleep(3)
+
+                cards = driver.find_elements(By.CSS_SELECTOR, "h1.cursor-pointer")
+                for card in cards:
+                    titulo = card.text.strip()
+                    ActionChains(driver).move_to_element(card).click(card).perform()
+                    time.sleep(5)
+                    try:
+                        publicacao = driver.find_element(By.XPATH, "//*[contains(text(),'Publicação')]").text
+                        match = re.search(r'(\d{2} de [a-zç]+ de \d{4})', publicacao.lower())
+                        data_publicacao = None
+                        if match:
+                            data_str = match.group(1)
+                            data_publicacao = data_str
+                        if not data_publicacao or hoje_str != data_publicacao:
+                            continue
+                        ementa = driver.find_element(By.XPATH, "//*[contains(text(),'Ementa')]").text
+                        div_baixar = driver.find_element(By.XPATH, "//div[contains(@class, 'button-text') and text()='Baixar']")
+                        link_baixar = div_baixar.find_element(By.XPATH, "..")
+                        href_baixar = link_baixar.get_attribute("href")
+                        pdf_links = driver.find_elements(By.XPATH, "//a[contains(@href, '.pdf')]")
+                        href_baixar = None
+                        for link in pdf_links:
+                            if link.is_displayed():
+                                href_baixar = link.get_attribute("href")
+                                break
+                        encontrado = {
+                            "titulo": titulo,
+                            "data_publicacao": data_publicacao,
+                            "url_original": href_baixar,
+                            "resumo": ementa
+                        } if href_baixar else None
+                    except Exception as e:
+                        encontrado = None
+                    try:
+                        btn_fechar = driver.find_element(By.CSS_SELECTOR, "button.p-dialog-header-close")
+                        btn_fechar.click()
+                        time.sleep(1)
+                    except Exception as e:
+                        pass
+                    if encontrado:
+                        yield encontrado
+        finally:
+            driver.quit()
+
+    def coletar_documentos(self):
+        import requests
+        import os
+        # Removido dependência do Django. Salvando dados localmente.
+        documentos_salvos = []
+        for encontrado in self.iterar_descobertos():
+            href_baixar = encontrado["url_original"]
+            try:
+                response = requests.get(href_baixar)
+            except Exception as e:
+                continue
+            if response.status_code == 200:
+                nome_arquivo = href_baixar.split('/')[-1]
+                caminho_arquivo = os.path.join('pdfs_sefaz', nome_arquivo)
+                os.makedirs('pdfs_sefaz', exist_ok=True)
+                with open(caminho_arquivo, 'wb') as f:
+                    f.write(response.content)
+                documentos_salvos.append({**encontrado, "arquivo_pdf": caminho_arquivo})
         return documentos_salvos
 
 
@@ -0,0 +1,178 @@
+# monitor/utils/situacao_normas.py
+"""
+Histórico de situação das normas e reprocessamento dirigido por mudanças.
+
+Toda mudança de NormaVigente.situacao gravada por save() vira um
+HistoricoSituacaoNorma (post_save). Depois do commit, a tarefa
+reavaliar_mudanca_situacao reavalia só o que a mudança atinge:
+
+- documentos que citam a norma ou normas que dependem dela (grafo_normas):
+  metadata['normas_nao_vigentes'] é recalculada e a mudança entra em
+  metadata['alertas_situacao_normas'];
+- relatórios gerados antes da mudança que cobrem essa norma, esses documentos
+  ou o período da mudança: parametros['desatualizado'] = True.
+"""
+import logging
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SITUACOES_NAO_VIGENTES = ('REVOGADA', 'IRREGULAR')
+MAX_ALERTAS_POR_DOCUMENTO = 20
+TAMANHO_LOTE = 500
+
+
+def atualizar_situacao(norma, situacao: str, fonte: str = 'SEFAZ', **campos) -> bool:
+    """
+    Grava a situação da norma (e campos extras, ex.: data_verificacao) informando a
+    fonte que vai para o histórico. Retorna True se a situação mudou.
+    """
+    from monitor.models import NormaVigente
+    if getattr(norma, '_situacao_carregada', None) is None and norma.pk:
+        # Instância montada fora do banco (ex.: índice de normas): lê a situação atual
+        norma._situacao_carregada = NormaVigente.objects.filter(pk=norma.pk).values_list('situacao', flat=True).first()
+    mudou = norma._situacao_carregada != situacao
+    norma.situacao = situacao
+    for campo, valor in campos.items():
+        setattr(norma, campo, valor)
+    norma._fonte_situacao = fonte
+    norma.save()
+    return mudou
+
+
+def registrar_mudanca(norma, criada: bool = False):
+    """post_save de NormaVigente: grava o histórico e agenda a reavaliação após o commit."""
+    from monitor.models import HistoricoSituacaoNorma
+    anterior = getattr(norma, '_situacao_carregada', None)
+    nova = norma.situacao
+    norma._situacao_carregada = nova
+    if criada:
+        if nova == 'A_VERIFICAR':
+            return None
+        anterior = ''
+    elif anterior is None or anterior == nova:
+        return None
+    historico = HistoricoSituacaoNorma.objects.create(
+        norma=norma,
+        situacao_anterior=anterior,
+        situacao_nova=nova,
+        fonte=getattr(norma, '_fonte_situacao', 'MANUAL'),
+    )
+    logger.info(f"Situação da norma {norma} mudou: {anterior or '-'} -> {nova}.")
+    transaction.on_commit(lambda: agendar_reavaliacao(historico.pk))
+    return historico
+
+
+def agendar_reavaliacao(historico_id: int) -> None:
+    if getattr(settings, 'MONITOR_REAVALIACAO_ASSINCRONA', True):
+        try:
+            from monitor.tasks import reavaliar_mudanca_situacao
+            reavaliar_mudanca_situacao.delay(historico_id)
+            return
+        except Exception as e:
+            logger.warning(f"Não foi possível enfileirar a reavaliação do histórico {historico_id}: {e}. Executando agora.")
+    reavaliar_mudanca(historico_id)
+
+
+def reavaliar_documentos(documentos_ids: Sequence[int], historico=None) -> int:
+    """
+    Recalcula metadata['normas_nao_vigentes'] dos documentos (um SELECT na tabela de
+    citações e um bulk_update por lote) e registra o alerta da mudança, se houver.
+    """
+    from monitor.models import CitacaoNorma, Documento
+    alerta = None
+    if historico is not None:
+        alerta = {
+            'historico': historico.pk,
+            'norma': historico.norma_id,
+            'descricao': str(historico.norma),
+            'anterior': historico.situacao_anterior,
+            'nova': historico.situacao_nova,
+            'data': historico.data.isoformat(),
+        }
+    atualizados = 0
+    for inicio in range(0, len(documentos_ids), TAMANHO_LOTE):
+        lote = list(documentos_ids[inicio:inicio + TAMANHO_LOTE])
+        nao_vigentes: Dict[int, List[dict]] = {documento_id: [] for documento_id in lote}
+        citacoes = (
+            CitacaoNorma.objects
+            .filter(documento_id__in=lote, norma__situacao__in=SITUACOES_NAO_VIGENTES)
+            .values_list('documento_id', 'norma_id', 'norma__tipo', 'norma__numero', 'norma__situacao')
+        )
+        for documento_id, norma_id, tipo, numero, situacao in citacoes:
+            nao_vigentes[documento_id].append({'id': norma_id, 'norma': f"{tipo} {numero}", 'situacao': situacao})
+        documentos = list(Documento.objects.filter(id__in=lote).only('id', 'metadata'))
+        for documento in documentos:
+            metadata = documento.metadata or {}
+            metadata['normas_nao_vigentes'] = nao_vigentes.get(documento.id, [])
+            if alerta is not None:
+                alertas = [a for a in metadata.get('alertas_situacao_normas', []) if a.get('historico') != alerta['historico']]
+                metadata['alertas_situacao_normas'] = (alertas + [alerta])[-MAX_ALERTAS_POR_DOCUMENTO:]
+            documento.metadata = metadata
+        Documento.objects.bulk_update(documentos, ['metadata'])
+        atualizados += len(documentos)
+    return atualizados
+
+
+def _periodo_cobre(parametros: dict, dia: date) -> bool:
+    try:
+        inicio = date.fromisoformat(str(parametros['data_inicio'])[:10]) if parametros.get('data_inicio') else None
+        fim = date.fromisoformat(str(parametros['data_fim'])[:10]) if parametros.get('data_fim') else None
+    except ValueError:
+        return True
+    return (inicio is None or inicio <= dia) and (fim is None or dia <= fim)
+
+
+def _relatorio_afetado(relatorio, historico, normas_ids: set, documentos_ids: set) -> bool:
+    parametros = relatorio.parametros or {}
+    if normas_ids.intersection(parametros.get('normas') or ()):
+        return True
+    if documentos_ids.intersection(parametros.get('documentos') or ()):
+        return True
+    return relatorio.tipo == 'MUDANCAS' and _periodo_cobre(parametros, timezone.localtime(historico.data).date())
+
+
+def marcar_relatorios_afetados(historico, normas_ids: Iterable[int], documentos_ids: Iterable[int]) -> int:
+    """Marca como desatualizados os relatórios gerados antes da mudança que ela atinge."""
+    from monitor.models import RelatorioGerado
+    dias = getattr(settings, 'MONITOR_REAVALIACAO_RELATORIOS_DIAS', 90)
+    normas_ids, documentos_ids = set(normas_ids), set(documentos_ids)
+    relatorios = RelatorioGerado.objects.filter(
+        data_criacao__lt=historico.data,
+        data_criacao__gte=historico.data - timedelta(days=dias),
+    ).only('id', 'tipo', 'parametros')
+    afetados = []
+    for relatorio in relatorios:
+        if not _relatorio_afetado(relatorio, historico, normas_ids, documentos_ids):
+            continue
+        parametros = relatorio.parametros or {}
+        parametros['desatualizado'] = True
+        parametros['mudancas_normas'] = sorted(set(parametros.get('mudancas_normas', [])) | {historico.pk})
+        relatorio.parametros = parametros
+        afetados.append(relatorio)
+    RelatorioGerado.objects.bulk_update(afetados, ['parametros'])
+    return len(afetados)
+
+
+def reavaliar_mudanca(historico_id: int) -> Optional[dict]:
+    """Reavalia os documentos e relatórios atingidos por uma mudança de situação."""
+    from monitor.models import HistoricoSituacaoNorma
+    from .grafo_normas import documentos_afetados, normas_afetadas
+    historico = HistoricoSituacaoNorma.objects.select_related('norma').filter(pk=historico_id).first()
+    if historico is None:
+        return None
+    normas = normas_afetadas([historico.norma_id])
+    documentos = documentos_afetados([historico.norma_id])
+    resultado = {
+        'historico': historico_id,
+        'normas_afetadas': len(normas),
+        'documentos_reavaliados': reavaliar_documentos(sorted(documentos), historico),
+        'relatorios_desatualizados': marcar_relatorios_afetados(historico, normas, documentos),
+    }
+    logger.info(f"Mudança de situação {historico}: {resultado}")
+    return resultado
@@ -0,0 +1,85 @@
+# monitor/utils/spacy_normas.py
+"""
+Pipeline spaCy para citações de normas e entidades.
+
+Este módulo importa o spaCy no topo e por isso só deve ser importado sob
+demanda (PDFProcessor.nlp). O componente "norma_matcher" é uma factory
+registrada, o que permite usá-lo em nlp.pipe(n_process > 1).
+"""
+import logging
+from typing import List, Tuple
+
+import spacy
+from spacy.language import Language
+from spacy.matcher import Matcher
+
+logger = logging.getLogger(__name__)
+
+MODELO_SPACY = "pt_core_news_sm"
+# Só tokenizer, tok2vec e ner são usados (Matcher + entidades)
+PIPES_NAO_USADOS = ["parser", "lemmatizer", "morphologizer", "attribute_ruler"]
+
+_NUMERO = {"TEXT": {"REGEX": r"^\d[\d./-]*$"}}
+_NUMERO_CONTINUACAO = {"TEXT": {"REGEX": r"^[\d./-]+$"}, "OP": "*"}
+_INDICADOR_NUMERO = [
+    {"LOWER": {"IN": ["n", "nº", "n°", "n.", "no", "n.º", "nro", "número", "numero"]}, "OP": "?"},
+    {"TEXT": {"IN": ["º", "°", ".", ":"]}, "OP": "?"},
+]
+_TIPOS_SIMPLES = [
+    "lei", "leis", "decreto", "decretos", "decreto-lei", "portaria", "portarias",
+    "resolução", "resolucao", "resoluções", "resolucoes", "lc", "in", "ec", "mp", "ade",
+]
+_TIPOS_COMPOSTOS = [
+    [{"LOWER": "lei"}, {"LOWER": {"IN": ["complementar", "ordinária", "ordinaria"]}}],
+    [{"LOWER": {"IN": ["instrução", "instrucao"]}}, {"LOWER": "normativa"}],
+    [{"LOWER": "ato"}, {"LOWER": "normativo"}],
+    [{"LOWER": "decreto"}, {"TEXT": "-"}, {"LOWER": "lei"}],
+]
+PADROES_NORMA = [
+    [{"LOWER": {"IN": _TIPOS_SIMPLES}}] + _INDICADOR_NUMERO + [_NUMERO, _NUMERO_CONTINUACAO],
+] + [tipo + _INDICADOR_NUMERO + [_NUMERO, _NUMERO_CONTINUACAO] for tipo in _TIPOS_COMPOSTOS]
+
+
+@Language.factory("norma_matcher")
+class NormaMatcher:
+    """Marca as citações de normas em doc.spans['normas']."""
+    def __init__(self, nlp: Language, name: str):
+        self.matcher = Matcher(nlp.vocab)
+        self.matcher.add("NORMA", PADROES_NORMA, greedy="LONGEST")
+
+    def __call__(self, doc):
+        doc.spans["normas"] = self.matcher(doc, as_spans=True)
+        return doc
+
+
+def carregar_nlp() -> Language:
+    """Carrega o modelo com os pipes não usados excluídos e o matcher de normas no fim."""
+    try:
+        nlp = spacy.load(MODELO_SPACY, exclude=PIPES_NAO_USADOS)
+    except OSError:
+        logger.warning(f"Modelo spaCy '{MODELO_SPACY}' não encontrado. Baixando...")
+        spacy.cli.download(MODELO_SPACY)
+        nlp = spacy.load(MODELO_SPACY, exclude=PIPES_NAO_USADOS)
+    nlp.add_pipe("norma_matcher", last=True)
+    logger.info(f"Modelo spaCy '{MODELO_SPACY}' carregado com pipes: {nlp.pipe_names}")
+    return nlp
+
+
+def citacoes_normas(doc) -> List[Tuple[str, str]]:
+    """
+    Converte os spans de normas em pares (tipo bruto, número bruto).
+    Ex.: "Decreto nº 21.866/2023" -> ("decreto", "21.866/2023")
+    """
+    citacoes = []
+    for span in doc.spans.get("normas", []):
+        tipo_tokens = []
+        numero_tokens = []
+        for token in span:
+            if numero_tokens or (token.text[:1].isdigit()):
+                numero_tokens.append(token.text)
+            elif token.lower_ not in ("n", "nº", "n°", "n.", "no", "n.º", "nro", "número", "numero", "º", "°", ".", ":"):
+                tipo_tokens.append(token.lower_)
+        if tipo_tokens and numero_tokens:
+            tipo = " ".join(tipo_tokens).replace(" - ", "-")
+            citacoes.append((tipo, "".join(numero_tokens)))
+    return citacoes
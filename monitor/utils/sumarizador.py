@@ -0,0 +1,135 @@
+# monitor/utils/sumarizador.py
+"""
+Sumarizador extrativo local (TF-IDF + TextRank) sem acesso à rede.
+
+Todas as sentenças de um lote de documentos entram em uma única matriz esparsa
+TF (vocabulário compartilhado). O IDF e a similaridade de cosseno são calculados
+por documento, as matrizes de transição são montadas em bloco diagonal e o
+PageRank roda para o lote inteiro com uma multiplicação esparsa por iteração.
+"""
+import logging
+import re
+from collections import Counter
+from typing import List, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from .busca_termos import normalizar_texto
+
+logger = logging.getLogger(__name__)
+
+AMORTECIMENTO = 0.85
+MAX_ITERACOES = 50
+TOLERANCIA = 1e-6
+TAMANHO_MINIMO_SENTENCA = 30
+MAX_SENTENCAS_POR_DOCUMENTO = 400
+
+_FIM_SENTENCA = re.compile(r'(?<=[.!?;])\s+(?=[A-ZÀ-Ý0-9"“(§])|\n{2,}')
+_TOKEN = re.compile(r'[a-z0-9]{3,}')
+STOPWORDS = frozenset("""
+    que para com nao uma por mais como mas foi ao ele das tem seu sua ser quando muito nos ja esta
+    eu tambem so pelo pela ate isso ela entre era depois sem mesmo aos ter seus quem nas me esse eles
+    estao voce tinha foram essa num nem suas meu minha numa pelos elas havia seja qual sera tenho lhe
+    deles essas esses pelas este fosse dele dos art inciso paragrafo alinea sobre onde cada desta deste
+    nesta neste conforme seguinte seguintes presente forma termos bem ainda outros outras
+""".split())
+
+
+def dividir_sentencas(texto: str) -> List[str]:
+    sentencas = [s.strip() for s in _FIM_SENTENCA.split(texto or '') if s and s.strip()]
+    return sentencas[:MAX_SENTENCAS_POR_DOCUMENTO]
+
+
+def _tokens(sentenca: str) -> List[str]:
+    return [t for t in _TOKEN.findall(normalizar_texto(sentenca)) if t not in STOPWORDS]
+
+
+def _matriz_tf(sentencas_por_doc: Sequence[List[str]]):
+    vocabulario = {}
+    indices, dados, indptr = [], [], [0]
+    for sentencas in sentencas_por_doc:
+        for sentenca in sentencas:
+            contagem = Counter(_tokens(sentenca))
+            for token, qtd in contagem.items():
+                indices.append(vocabulario.setdefault(token, len(vocabulario)))
+                dados.append(qtd)
+            indptr.append(len(indices))
+    linhas = len(indptr) - 1
+    return sparse.csr_matrix(
+        (np.asarray(dados, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+        shape=(linhas, max(len(vocabulario), 1)),
+    )
+
+
+def _transicao_documento(tf: sparse.csr_matrix) -> sparse.csr_matrix:
+    """TF-IDF normalizado -> similaridade de cosseno -> matriz de transição (linhas somam 1)."""
+    n = tf.shape[0]
+    x = tf.tocsr(copy=True)
+    if x.nnz:
+        # df por coluna = nº de sentenças (linhas) em que o termo aparece
+        _, inverso, df = np.unique(x.indices, return_inverse=True, return_counts=True)
+        x.data = (1 + np.log(x.data)) * (np.log((n + 1) / (df[inverso] + 1)) + 1)
+        normas = np.sqrt(np.asarray(x.multiply(x).sum(axis=1)).ravel())
+        normas[normas == 0] = 1
+        x = sparse.diags(1 / normas) @ x
+    similaridade = (x @ x.T).tolil()
+    similaridade.setdiag(0)
+    similaridade = similaridade.tocsr()
+    similaridade.eliminate_zeros()
+    somas = np.asarray(similaridade.sum(axis=1)).ravel()
+    somas[somas == 0] = 1
+    return sparse.diags(1 / somas) @ similaridade
+
+
+def _textrank_lote(transicoes: List[sparse.csr_matrix]) -> np.ndarray:
+    tamanhos = np.array([t.shape[0] for t in transicoes])
+    if not tamanhos.sum():
+        return np.zeros(0)
+    matriz_t = sparse.block_diag(transicoes, format='csr').T.tocsr()
+    teleporte = np.repeat((1 - AMORTECIMENTO) / np.maximum(tamanhos, 1), tamanhos)
+    scores = np.repeat(1 / np.maximum(tamanhos, 1), tamanhos)
+    for _ in range(MAX_ITERACOES):
+        novos = teleporte + AMORTECIMENTO * (matriz_t @ scores)
+        if np.abs(novos - scores).max() < TOLERANCIA:
+            return novos
+        scores = novos
+    return scores
+
+
+def _montar_resumo(sentencas: List[str], scores: np.ndarray, max_sentencas: int, max_caracteres: int) -> str:
+    candidatos = [i for i, s in enumerate(sentencas) if len(s) >= TAMANHO_MINIMO_SENTENCA] or list(range(len(sentencas)))
+    # Maior score primeiro; empates favorecem sentenças anteriores
+    escolhidas = sorted(sorted(candidatos, key=lambda i: (-scores[i], i))[:max_sentencas])
+    resumo = ""
+    for i in escolhidas:
+        proximo = (resumo + " " + sentencas[i]).strip()
+        if len(proximo) > max_caracteres:
+            if not resumo:
+                corte = proximo.rfind(' ', 0, max_caracteres)
+                resumo = proximo[:corte if corte > 0 else max_caracteres].rstrip() + '...'
+            break
+        resumo = proximo
+    return resumo
+
+
+def resumir_lote(textos: Sequence[str], max_sentencas: int = 5, max_caracteres: int = 1500) -> List[str]:
+    """
+    Resume vários textos de uma vez. As sentenças escolhidas mantêm a ordem original.
+    """
+    sentencas_por_doc = [dividir_sentencas(t) for t in textos]
+    tf = _matriz_tf(sentencas_por_doc)
+    limites = np.cumsum([0] + [len(s) for s in sentencas_por_doc])
+    transicoes = [_transicao_documento(tf[limites[i]:limites[i + 1]]) for i in range(len(textos))]
+    scores = _textrank_lote(transicoes)
+    resumos = []
+    for i, sentencas in enumerate(sentencas_por_doc):
+        if not sentencas:
+            resumos.append("")
+            continue
+        resumos.append(_montar_resumo(sentencas, scores[limites[i]:limites[i + 1]], max_sentencas, max_caracteres))
+    return resumos
+
+
+def resumir(texto: str, max_sentencas: int = 5, max_caracteres: int = 1500) -> str:
+    return resumir_lote([texto], max_sentencas, max_caracteres)[0]
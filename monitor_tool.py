@@ -10,6 +10,7 @@ Comandos disponíveis:
     - coletar_receita: Coleta dados da Receita Federal
     - pipeline_auto: Executa pipeline automático (coleta/processa/verifica tudo)
     - pipeline_manual: Executa pipeline manual (datas customizadas)
+    - coletar_tudo: Coleta e processa todas as fontes (--resume <log_id> retoma uma execução interrompida)
     - gerar_relatorio: Gera relatório contábil avançado
     - start_celery: Inicia o worker do Celery em um novo terminal
     - start_api: Inicia a API (calculadora) via WSL em um novo terminal
@@ -28,16 +29,9 @@ import logging
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'diario_oficial.settings')
 django.setup()
 
-from monitor.tasks import (
-    coletar_diario_oficial_task,
-    processar_documentos_pendentes_task,
-    verificar_normas_sefaz_task,
-    coletar_dados_receita_task,
-    pipeline_coleta_e_processamento_automatica,
-    pipeline_manual_completo,
-    gerar_relatorio_task
-    # Os comandos start_celery, start_api e status_task não são tasks Celery, são utilitários implementados diretamente no CLI
-)
+# As tasks são importadas dentro de cada comando: uma task ausente em monitor.tasks
+# quebra só o comando que a usa, não o CLI inteiro (start_celery, start_api e
+# status_task não são tasks Celery, são utilitários implementados diretamente no CLI)
 
 logger = logging.getLogger(__name__)
 
@@ -73,6 +67,11 @@ def main():
     sp_pipe_manual.add_argument('--inicio', required=True, help='Data início (YYYY-MM-DD)')
     sp_pipe_manual.add_argument('--fim', required=True, help='Data fim (YYYY-MM-DD)')
 
+    # Coleta e processamento de todas as fontes, com retomada por checkpoints
+    sp_coletar_tudo = subparsers.add_parser('coletar_tudo', help='Coleta e processa todas as fontes (Diário Oficial, SEFAZ, SEFAZ ICMS)')
+    sp_coletar_tudo.add_argument('--resume', type=int, metavar='LOG_ID', help='Retoma a execução interrompida do LogExecucao informado')
+    sp_coletar_tudo.add_argument('--fluxo', action='store_true', help='Coleta em fluxo num único processo (ignorado com --resume)')
+
     # Gerar relatório
     subparsers.add_parser('gerar_relatorio', help='Gera relatório contábil avançado')
 
@@ -92,7 +91,7 @@ def main():
         print("Iniciando Celery Worker em um novo terminal...")
         subprocess.Popen([
             'start', 'cmd', '/k',
-            f"cd /d {os.getcwd()} && venv311\\Scripts\\activate && celery -A diario_oficial worker -l info"
+            f"cd /d {os.getcwd()} && venv311\\Scripts\\activate && celery -A diario_oficial worker -Q celery,io,cpu -l info"
         ], shell=True)
         print("Iniciando Celery Beat em um novo terminal...")
         subprocess.Popen([
@@ -107,6 +106,7 @@ def main():
         print("Todos os serviços foram iniciados!")
         return
     if args.comando == 'coletar_diario':
+        from monitor.tasks import coletar_diario_oficial_task
         res = coletar_diario_oficial_task.apply_async(kwargs={'dias_retroativos': args.dias})
         print(f"Task coletar_diario_oficial_task disparada! Task ID: {res.id}")
     elif args.comando == 'coletar_diario_todos':
@@ -126,21 +126,35 @@ def main():
         documentos = scraper.coletar_e_salvar_documentos(data_inicio=data_inicio, data_fim=data_fim, dias_retroativos=dias)
         print(f"Total de documentos salvos: {len(documentos)}")
     elif args.comando == 'processar_documentos':
+        from monitor.tasks import processar_documentos_pendentes_task
         res = processar_documentos_pendentes_task.apply_async()
         print(f"Task processar_documentos_pendentes_task disparada! Task ID: {res.id}")
     elif args.comando == 'verificar_normas':
+        from monitor.tasks import verificar_normas_sefaz_task
         res = verificar_normas_sefaz_task.apply_async()
         print(f"Task verificar_normas_sefaz_task disparada! Task ID: {res.id}")
     elif args.comando == 'coletar_receita':
+        from monitor.tasks import coletar_dados_receita_task
         res = coletar_dados_receita_task.apply_async()
         print(f"Task coletar_dados_receita_task disparada! Task ID: {res.id}")
     elif args.comando == 'pipeline_auto':
+        from monitor.tasks import pipeline_coleta_e_processamento_automatica
         res = pipeline_coleta_e_processamento_automatica.apply_async(args=[args.dias])
         print(f"Pipeline automático disparado! Task ID: {res.id}")
     elif args.comando == 'pipeline_manual':
+        from monitor.tasks import pipeline_manual_completo
         res = pipeline_manual_completo.apply_async(args=[args.inicio, args.fim])
         print(f"Pipeline manual disparado! Task ID: {res.id}")
+    elif args.comando == 'coletar_tudo':
+        from monitor.tasks import coletar_e_processar_tudo
+        if args.resume:
+            res = coletar_e_processar_tudo.apply_async(kwargs={'retomar_log_id': args.resume})
+            print(f"Retomada da execução {args.resume} disparada! Task ID: {res.id}")
+        else:
+            res = coletar_e_processar_tudo.apply_async(kwargs={'em_fluxo': True if args.fluxo else None})
+            print(f"Coleta e processamento disparados! Task ID: {res.id}")
     elif args.comando == 'gerar_relatorio':
+        from monitor.tasks import gerar_relatorio_task
         res = gerar_relatorio_task.apply_async()
         print(f"Task gerar_relatorio_task disparada! Task ID: {res.id}")
     elif args.comando == 'start_celery':
@@ -149,7 +163,7 @@ def main():
         print("Iniciando o worker do Celery em um novo terminal...")
         subprocess.Popen([
             'start', 'cmd', '/k',
-            f"cd /d {os.getcwd()} && venv311\\Scripts\\activate && celery -A diario_oficial worker -l info"
+            f"cd /d {os.getcwd()} && venv311\\Scripts\\activate && celery -A diario_oficial worker -Q celery,io,cpu -l info"
         ], shell=True)
         print("Worker do Celery iniciado!")
     elif args.comando == 'start_api':
@@ -0,0 +1,87 @@
+# Compara acurácia x throughput dos backends do classificador local (torch, int8, onnx)
+# sobre uma amostra rotulada de parágrafos nossos.
+#
+# Formato da amostra (CSV com cabeçalho): texto,rotulo
+#   rotulo = 1/relevante ou 0/irrelevante
+#
+# Uso:
+#   python scripts/benchmark_backends_classificador.py --amostra amostra_rotulada.csv
+#   python scripts/benchmark_backends_classificador.py --amostra amostra.csv --backends torch int8 --limiar 0.6
+import argparse
+import csv
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'diario_oficial.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from monitor.utils.classificador_local import BACKENDS, carregar_classificador, classificar_paragrafos
+
+
+def carregar_amostra(caminho):
+    textos, rotulos = [], []
+    with open(caminho, encoding='utf-8', newline='') as f:
+        for linha in csv.DictReader(f):
+            texto = (linha.get('texto') or '').strip()
+            if not texto:
+                continue
+            rotulo = (linha.get('rotulo') or '').strip().lower()
+            textos.append(texto)
+            rotulos.append(rotulo in ('1', 'relevante', 'sim', 'true'))
+    return textos, rotulos
+
+
+def metricas(scores, rotulos, limiar):
+    previstos = [s >= limiar for s in scores]
+    vp = sum(1 for p, r in zip(previstos, rotulos) if p and r)
+    fp = sum(1 for p, r in zip(previstos, rotulos) if p and not r)
+    fn = sum(1 for p, r in zip(previstos, rotulos) if not p and r)
+    acuracia = sum(1 for p, r in zip(previstos, rotulos) if p == r) / len(rotulos)
+    precisao = vp / (vp + fp) if vp + fp else 0.0
+    revocacao = vp / (vp + fn) if vp + fn else 0.0
+    return acuracia, precisao, revocacao
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos backends do classificador local')
+    parser.add_argument('--amostra', required=True, help='CSV com colunas texto,rotulo')
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--lote', type=int, default=settings.MONITOR_CLASSIFICADOR_LOTE)
+    parser.add_argument('--limiar', type=float, default=0.5, help='Score mínimo para considerar relevante')
+    parser.add_argument('--repeticoes', type=int, default=1, help='Passadas medidas (após uma de aquecimento)')
+    args = parser.parse_args()
+
+    textos, rotulos = carregar_amostra(args.amostra)
+    if not textos:
+        print("Amostra vazia.")
+        return
+    print(f"Amostra: {len(textos)} parágrafos ({sum(rotulos)} relevantes) | lote: {args.lote} | limiar: {args.limiar}")
+    print(f"{'backend':8} {'carga(s)':>9} {'parag/s':>9} {'acurácia':>9} {'precisão':>9} {'revocação':>10} {'concord.':>9}")
+
+    referencia = None
+    for backend in args.backends:
+        inicio = time.perf_counter()
+        classificador = carregar_classificador(backend)
+        carga = time.perf_counter() - inicio
+        classificar_paragrafos(textos[:args.lote], tamanho_lote=args.lote, classificador=classificador)  # aquecimento
+        inicio = time.perf_counter()
+        for _ in range(args.repeticoes):
+            scores = classificar_paragrafos(textos, tamanho_lote=args.lote, classificador=classificador)
+        tempo = (time.perf_counter() - inicio) / args.repeticoes
+        acuracia, precisao, revocacao = metricas(scores, rotulos, args.limiar)
+        if referencia is None:
+            referencia = scores
+        # Concordância das decisões com o primeiro backend medido (normalmente torch float32)
+        concordancia = sum(1 for a, b in zip(scores, referencia) if (a >= args.limiar) == (b >= args.limiar)) / len(scores)
+        print(f"{backend:8} {carga:9.2f} {len(textos) / tempo:9.2f} {acuracia:9.3f} {precisao:9.3f} {revocacao:10.3f} {concordancia:9.3f}")
+        del classificador
+
+
+if __name__ == '__main__':
+    main()
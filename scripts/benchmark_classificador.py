@@ -0,0 +1,85 @@
+# Compara parágrafos/segundo do classificador zero-shot local:
+#   antes  -> pipeline carregado a cada chamada, um parágrafo por vez, lista de termos em cada prompt
+#   depois -> pipeline residente no processo, lotes ordenados por tamanho
+#
+# Uso:
+#   python scripts/benchmark_classificador.py --arquivo paragrafos.txt
+#   python scripts/benchmark_classificador.py --documentos 20 --lote 32 --threads 4
+import argparse
+import os
+import re
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'diario_oficial.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+
+
+def carregar_paragrafos(args):
+    if args.arquivo:
+        with open(args.arquivo, encoding='utf-8') as f:
+            texto = f.read()
+    else:
+        from monitor.models import Documento
+        textos = Documento.objects.exclude(texto_completo='').values_list('texto_completo', flat=True)[:args.documentos]
+        texto = "\n\n".join(textos)
+    paragrafos = [p.strip() for p in re.split(r'\n{2,}', texto) if p.strip()]
+    return paragrafos[:args.limite]
+
+
+def medir_antes(paragrafos):
+    from transformers import pipeline
+    from monitor.utils.cache_worker import obter_termos_ativos
+    termos = ', '.join(obter_termos_ativos().termos_busca)
+    inicio = time.perf_counter()
+    # Comportamento anterior: o pipeline era criado a cada documento
+    classificador = pipeline("zero-shot-classification", model=settings.MONITOR_CLASSIFICADOR_MODELO)
+    for p in paragrafos:
+        pergunta = f"Este parágrafo é relevante para contabilidade/fiscal? Termos: {termos}\nParágrafo: {p}"
+        classificador(pergunta, ["relevante", "irrelevante"])
+    return time.perf_counter() - inicio
+
+
+def medir_depois(paragrafos, lote):
+    from monitor.utils.classificador_local import classificar_paragrafos, obter_classificador
+    inicio_carga = time.perf_counter()
+    obter_classificador()
+    carga = time.perf_counter() - inicio_carga
+    inicio = time.perf_counter()
+    classificar_paragrafos(paragrafos, tamanho_lote=lote)
+    return carga, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do classificador zero-shot local')
+    parser.add_argument('--arquivo', help='Arquivo de texto com parágrafos separados por linha em branco')
+    parser.add_argument('--documentos', type=int, default=10, help='Quantidade de documentos do banco (sem --arquivo)')
+    parser.add_argument('--limite', type=int, default=200, help='Máximo de parágrafos')
+    parser.add_argument('--lote', type=int, default=settings.MONITOR_CLASSIFICADOR_LOTE, help='Tamanho do lote')
+    parser.add_argument('--threads', type=int, help='torch.set_num_threads')
+    parser.add_argument('--sem-antes', action='store_true', help='Não mede o comportamento anterior (lento)')
+    args = parser.parse_args()
+
+    if args.threads:
+        settings.MONITOR_TORCH_THREADS = args.threads
+    paragrafos = carregar_paragrafos(args)
+    if not paragrafos:
+        print("Nenhum parágrafo encontrado.")
+        return
+    print(f"Parágrafos: {len(paragrafos)} | lote: {args.lote} | threads: {settings.MONITOR_TORCH_THREADS or 'padrão'}")
+
+    if not args.sem_antes:
+        tempo = medir_antes(paragrafos)
+        print(f"Antes : {tempo:8.2f}s  ({len(paragrafos) / tempo:8.2f} parágrafos/s, incluindo carga do modelo)")
+    carga, tempo = medir_depois(paragrafos, args.lote)
+    print(f"Depois: {tempo:8.2f}s  ({len(paragrafos) / tempo:8.2f} parágrafos/s, carga única de {carga:.2f}s fora da medição)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+# Compara o extrator de normas antigo (padrão compilado a cada chamada, um re.search
+# por variação dos termos NORMA) com monitor.utils.extrator_normas, sobre um
+# diário de ~300 páginas, e confere se os resultados são iguais.
+#
+# Uso:
+#   python scripts/benchmark_extrator_normas.py                      # diário sintético de 300 páginas
+#   python scripts/benchmark_extrator_normas.py --arquivo diario.pdf # PDF ou .txt real
+#   python scripts/benchmark_extrator_normas.py --paginas 300 --variacoes 200 --repeticoes 5
+import argparse
+import logging
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'diario_oficial.settings')
+
+import django
+django.setup()
+
+from monitor.models import NormaVigente
+from monitor.utils import extrator_normas
+
+TIPOS_CITACAO = ["Lei", "Lei Complementar", "Decreto", "Portaria", "Resolução", "Instrução Normativa", "LC", "IN", "Ato Normativo"]
+FRASES = [
+    "O GOVERNADOR DO ESTADO DO PIAUÍ, no uso das atribuições que lhe confere o inciso XIII do art. 102 da Constituição Estadual,",
+    "Fica alterado o Regulamento do ICMS, aprovado pelo",
+    "Nomear o servidor para exercer o cargo em comissão, símbolo DAS-3, da Secretaria da Fazenda.",
+    "Esta norma entra em vigor na data de sua publicação, produzindo efeitos a partir do primeiro dia do mês subsequente.",
+    "conforme disposto no",
+    "Ficam revogadas as disposições em contrário, em especial o",
+]
+
+
+# --- implementação anterior (referência) ---
+
+def _mapa_antigo():
+    mapa = defaultdict(lambda: 'OUTROS')
+    mapa.update(extrator_normas._MAPA_TIPOS_BASE)
+    for choice_key, _ in NormaVigente.TIPO_CHOICES:
+        mapa[choice_key.lower()] = choice_key
+    return mapa
+
+
+def _padronizar_antigo(numero):
+    numero_limpo = re.sub(r'[^\d./-]', '', str(numero))
+    if not numero_limpo or not re.search(r'\d', numero_limpo):
+        return ""
+    final_parts = []
+    for part in re.split(r'([./-])', numero_limpo):
+        if part.isdigit():
+            final_parts.append(part.lstrip('0') or '0')
+        elif part in ('/', '.', '-'):
+            final_parts.append(part)
+    return "".join(final_parts).strip('./-')
+
+
+def _ano_antigo(numero_norma):
+    m = re.search(r'/(\d{4})\b', numero_norma)
+    if m:
+        return int(m.group(1))
+    m = re.search(r'/(\d{2})\b', numero_norma)
+    if m:
+        ano_curto = int(m.group(1))
+        return 2000 + ano_curto if ano_curto < 50 else 1900 + ano_curto
+    return None
+
+
+def extrair_normas_antigo(texto, termos_norma, mapa):
+    encontradas = set()
+    padrao_norma = re.compile(
+        r'(?i)\b(lei\scomplementar|lei\sordin[áa]ria|lei|decreto-lei|decreto|portaria|resolu[cç][ãa]o|instru[cç][ãa]o\snormativa|ato\snormativo|IN\b|LC\b|EC\b|MP\b|ADE\b)\s+'
+        r'(?:n[º°\.\s]*|n[º°]?\s*)?'
+        r'([\d]+(?:[\.,\/\-]\d+)*[\w]*)',
+        re.IGNORECASE
+    )
+    for match in padrao_norma.finditer(texto):
+        tipo_normalizado = mapa.get(match.group(1).strip().lower(), 'OUTROS')
+        numero_padronizado = _padronizar_antigo(match.group(2).strip())
+        ano_norma = _ano_antigo(numero_padronizado)
+        valid_tipos = [choice[0] for choice in NormaVigente.TIPO_CHOICES]
+        if tipo_normalizado not in valid_tipos:
+            pass
+        if numero_padronizado and ano_norma and len(str(ano_norma)) == 4:
+            numero_sem_ano = re.sub(r'(\/\d{4})+$', '', numero_padronizado)
+            if not re.search(rf'/({ano_norma})$', numero_padronizado):
+                encontradas.add((tipo_normalizado, f"{numero_sem_ano}/{ano_norma}"))
+            else:
+                encontradas.add((tipo_normalizado, numero_padronizado))
+    for termo in termos_norma:
+        for num_esp in (_padronizar_antigo(n) for n in termo.variacoes):
+            if num_esp and re.search(rf'(?i)\b{re.escape(num_esp)}\b', texto):
+                encontradas.add((mapa.get(termo.termo.lower(), 'OUTROS'), num_esp))
+    return sorted(encontradas)
+
+
+# --- dados ---
+
+def _numero_aleatorio(rnd):
+    numero = f"{rnd.randint(1, 30)}.{rnd.randint(0, 999):03d}" if rnd.random() < 0.6 else str(rnd.randint(1, 999))
+    ano = rnd.choice([str(rnd.randint(1990, 2025)), f"{rnd.randint(0, 99):02d}", ""])
+    return f"{numero}/{ano}" if ano else numero
+
+
+def diario_sintetico(paginas, rnd):
+    blocos = []
+    for _ in range(paginas):
+        pagina = []
+        while sum(len(p) for p in pagina) < 4000:
+            frase = rnd.choice(FRASES)
+            if rnd.random() < 0.35:
+                frase += f" {rnd.choice(TIPOS_CITACAO)} nº {_numero_aleatorio(rnd)},"
+            pagina.append(frase)
+        blocos.append(" ".join(pagina))
+    return "\f".join(blocos)
+
+
+def termos_sinteticos(quantidade, rnd):
+    termos = []
+    for i in range(quantidade):
+        variacoes = tuple(_numero_aleatorio(rnd) for _ in range(rnd.randint(1, 4)))
+        termos.append(SimpleNamespace(id=i, termo=rnd.choice(["Decreto", "Lei", "Portaria"]), tipo='NORMA', variacoes=variacoes))
+    return termos
+
+
+def ler_arquivo(caminho):
+    if caminho.lower().endswith('.pdf'):
+        from pdfminer.high_level import extract_text
+        return extract_text(caminho)
+    with open(caminho, encoding='utf-8') as f:
+        return f.read()
+
+
+def medir(funcao, repeticoes):
+    funcao()  # aquecimento (caches/lru)
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return (time.perf_counter() - inicio) / repeticoes, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do extrator de normas')
+    parser.add_argument('--arquivo', help='PDF ou .txt do diário (padrão: diário sintético)')
+    parser.add_argument('--paginas', type=int, default=300)
+    parser.add_argument('--variacoes', type=int, default=100, help='Termos NORMA sintéticos com variações')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+    logging.getLogger('monitor.utils.extrator_normas').setLevel(logging.ERROR)  # avisos de normas sem ano
+
+    rnd = random.Random(args.semente)
+    texto = ler_arquivo(args.arquivo) if args.arquivo else diario_sintetico(args.paginas, rnd)
+    termos = termos_sinteticos(args.variacoes, rnd)
+    print(f"Texto: {len(texto):,} caracteres | termos NORMA: {len(termos)}")
+
+    mapa = _mapa_antigo()
+    variacoes = extrator_normas.VariacoesNorma(termos)
+    tempo_antigo, antigo = medir(lambda: extrair_normas_antigo(texto, termos, mapa), args.repeticoes)
+    tempo_novo, novo = medir(lambda: extrator_normas.extrair_normas(texto, variacoes), args.repeticoes)
+    paginas = texto.split('\f')
+    tempo_lote, lote = medir(
+        lambda: [n for normas in (extrator_normas.extrair_normas(p, variacoes) for p in paginas) for n in normas],
+        args.repeticoes,
+    )
+
+    print(f"{'implementação':22} {'tempo(ms)':>10} {'normas':>7}")
+    print(f"{'anterior':22} {tempo_antigo * 1000:10.1f} {len(antigo):7}")
+    print(f"{'compilada':22} {tempo_novo * 1000:10.1f} {len(novo):7}")
+    print(f"{'compilada por página':22} {tempo_lote * 1000:10.1f} {len(set(lote)):7}")
+    print(f"Speedup: {tempo_antigo / tempo_novo:.1f}x | resultados idênticos: {antigo == novo}")
+    if antigo != novo:
+        print("Só na anterior:", sorted(set(antigo) - set(novo))[:20])
+        print("Só na compilada:", sorted(set(novo) - set(antigo))[:20])
+
+
+if __name__ == '__main__':
+    main()